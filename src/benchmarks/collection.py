@@ -0,0 +1,74 @@
+"""
+Benchmark de la extracción de la tabla con `SELECT *` frente a la consulta con
+proyección de columnas y tipos compactos de `build_query`.
+
+Para cada consulta se informa de los bytes transferidos desde SQLite, la memoria
+del DataFrame resultante y el tiempo de lectura.
+
+Uso (desde el directorio `src`):
+    python -m benchmarks.collection --rows 500000
+"""
+import argparse
+import tempfile
+import time
+import pandas as pd
+from pathlib import Path
+from sqlalchemy import create_engine, select
+from loguru import logger
+from benchmarks.synthetic import write_database
+from databases.db_model import RentApartments
+from model.pipeline.collection import build_query
+from config.db_settings import get_db_settings
+
+
+def transferred_bytes(connection, query) -> int:
+    """
+    Suma el tamaño de los valores devueltos por una consulta: la longitud UTF-8 de
+    los textos y 8 bytes por cada número.
+    """
+    total = 0
+    for row in connection.execute(query):
+        for value in row:
+            if isinstance(value, str):
+                total += len(value.encode('utf-8'))
+            elif value is not None:
+                total += 8
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--rows', type=int, default=0,
+        help='Filas de la base sintética; 0 usa la base de datos configurada'
+    )
+    args = parser.parse_args()
+    logger.remove()
+
+    db_path = get_db_settings().db_path
+    if args.rows:
+        db_path = Path(tempfile.mkdtemp()) / 'bench.sqlite'
+        write_database(db_path, args.rows, RentApartments.__tablename__)
+    engine = create_engine(f'sqlite:///{db_path}')
+
+    projected_query, dtypes = build_query()
+    queries = {
+        'SELECT *': (select(RentApartments), None),
+        'proyección': (projected_query, dtypes),
+    }
+
+    print(f'{"consulta":<11} {"transferido (MB)":>17} {"DataFrame (MB)":>15} '
+          f'{"lectura (s)":>12}')
+    with engine.connect() as connection:
+        for name, (query, query_dtypes) in queries.items():
+            transferred = transferred_bytes(connection, query)
+            start = time.perf_counter()
+            data = pd.read_sql(query, connection, dtype=query_dtypes)
+            elapsed = time.perf_counter() - start
+            memory = data.memory_usage(deep=True).sum()
+            print(f'{name:<11} {transferred / 1e6:>17.2f} {memory / 1e6:>15.2f} '
+                  f'{elapsed:>12.3f}')
+
+
+if __name__ == '__main__':
+    main()
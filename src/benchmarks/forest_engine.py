@@ -0,0 +1,57 @@
+"""
+Benchmark de latencia del bosque compilado frente a `RandomForestRegressor.predict`.
+
+Antes de medir se verifica que ambos motores dan las mismas predicciones sobre
+datos sintéticos.
+
+Uso (desde el directorio `src`):
+    python -m benchmarks.forest_engine --parity-rows 100000
+"""
+import argparse
+import pickle
+import time
+from loguru import logger
+from benchmarks.synthetic import make_features
+from config.model_settings import get_model_settings
+from model.pipeline.artifact import FlatForest
+
+BATCH_SIZES = (1, 10, 100, 1_000, 10_000)
+
+
+def best_time(func, repeat: int) -> float:
+    """Devuelve el menor tiempo en segundos de `repeat` ejecuciones de `func`."""
+    timings = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--parity-rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    logger.remove()
+
+    with get_model_settings().model_path.open('rb') as file:
+        model = pickle.load(file)
+    forest = FlatForest.from_model(model)
+
+    data = make_features(max(args.parity_rows, max(BATCH_SIZES)))
+    forest.check_parity(model, data.head(args.parity_rows))
+    print(f'paridad verificada sobre {args.parity_rows} filas')
+
+    print(f'{"filas":>8} {"sklearn (ms)":>13} {"compiled (ms)":>14} {"aceleración":>12}')
+    for batch_size in BATCH_SIZES:
+        frame = data.head(batch_size)
+        matrix = frame.to_numpy()
+        sklearn_s = best_time(lambda: model.predict(frame), args.repeat)
+        compiled_s = best_time(lambda: forest.predict(matrix), args.repeat)
+        print(f'{batch_size:>8} {sklearn_s * 1000:>13.2f} {compiled_s * 1000:>14.2f} '
+              f'{sklearn_s / compiled_s:>11.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark del tiempo de importación de los puntos de entrada.
+
+Cada punto de entrada se importa en un proceso nuevo con `python -X importtime` y
+se toma el menor tiempo acumulado de varias repeticiones. El benchmark falla si
+algún punto de entrada supera su presupuesto o importa al arrancar paquetes
+pesados que sólo deben cargarse en el primer uso.
+
+Uso (desde el directorio `src`):
+    python -m benchmarks.import_time --budget-ms 600
+"""
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+
+ENTRY_POINTS = ('inference', 'builder', 'server')
+
+# Paquetes que no deben importarse al cargar el módulo del punto de entrada
+DEFERRED_PACKAGES = ('pandas', 'sklearn', 'sqlalchemy', 'yaml', 'joblib', 'scipy')
+
+
+def import_profile(module: str) -> dict[str, int]:
+    """
+    Importa un módulo en un proceso nuevo y devuelve el tiempo acumulado de cada
+    módulo importado.
+
+    Args:
+        module (str): Nombre del módulo a importar.
+
+    Returns:
+        dict[str, int]: Tiempo acumulado en microsegundos de cada módulo.
+    """
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True
+    ).stderr
+
+    profile = dict()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def heaviest_packages(profile: dict[str, int], top: int) -> list[tuple[str, int]]:
+    """Devuelve los paquetes raíz con mayor tiempo acumulado de importación."""
+    packages = defaultdict(int)
+    for name, cumulative in profile.items():
+        if '.' not in name:
+            packages[name] += cumulative
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=600.0)
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+
+    failures = list()
+    print(f'{"punto de entrada":<17} {"importación (ms)":>17} {"presupuesto (ms)":>17}')
+    for entry_point in ENTRY_POINTS:
+        profiles = [import_profile(entry_point) for _ in range(args.repeat)]
+        best = min(profiles, key=lambda profile: profile[entry_point])
+        elapsed_ms = best[entry_point] / 1000
+        print(f'{entry_point:<17} {elapsed_ms:>17.1f} {args.budget_ms:>17.1f}')
+
+        for package, cumulative in heaviest_packages(best, args.top):
+            if package != entry_point:
+                print(f'    {package:<25} {cumulative / 1000:>9.1f} ms')
+
+        if elapsed_ms > args.budget_ms:
+            failures.append(f'{entry_point} supera el presupuesto ({elapsed_ms:0.1f} ms)')
+        eager = [package for package in DEFERRED_PACKAGES if package in best]
+        if eager:
+            failures.append(f'{entry_point} importa al arrancar: {", ".join(eager)}')
+
+    for failure in failures:
+        print(f'ERROR: {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark de la latencia de `predict` según el modo de logging.
+
+Cada modo se mide en un proceso nuevo que escribe el log sólo en un archivo de
+un directorio temporal, sin la salida de error: escritura síncrona del archivo,
+escritura desde un hilo en segundo plano (`LOG_ENQUEUE`), formato JSON
+(`LOG_SERIALIZE`) y muestreo de los mensajes por predicción (`REQUEST_LOG_SAMPLE`).
+
+Uso (desde el directorio `src`):
+    python -m benchmarks.log_overhead --rows 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+MODES = {
+    'síncrono': {'LOG_ENQUEUE': 'false'},
+    'síncrono json': {'LOG_ENQUEUE': 'false', 'LOG_SERIALIZE': 'true'},
+    'en cola': {'LOG_ENQUEUE': 'true'},
+    'en cola json': {'LOG_ENQUEUE': 'true', 'LOG_SERIALIZE': 'true'},
+    'en cola 1/100': {'LOG_ENQUEUE': 'true', 'REQUEST_LOG_SAMPLE': '100'},
+    'sin mensajes': {'LOG_ENQUEUE': 'true', 'REQUEST_LOG_LEVEL': 'DEBUG'},
+}
+
+
+def run_worker(rows: int) -> None:
+    """Mide la latencia de cada predicción con el logging configurado por entorno."""
+    from benchmarks.synthetic import make_features
+    from config.logger_settings import configure_logging
+    from model.model_inference import ModelInferenceService
+
+    configure_logging()
+    ml_svc = ModelInferenceService()
+    ml_svc.load_model()
+    data = make_features(rows).to_numpy().tolist()
+
+    for row in data[:100]:  # Calentamiento
+        ml_svc.predict(row)
+
+    latencies = np.empty(len(data))
+    for i, row in enumerate(data):
+        start = time.perf_counter()
+        ml_svc.predict(row)
+        latencies[i] = time.perf_counter() - start
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+    print(json.dumps({'p50_us': p50, 'p99_us': p99, 'mean_us': latencies.mean() * 1e6}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2_000)
+    parser.add_argument('--worker', action='store_true')
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.rows)
+        return
+
+    print(f'{"modo":<15} {"p50 (µs)":>10} {"p99 (µs)":>10} {"media (µs)":>11}')
+    for mode, overrides in MODES.items():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            env = dict(
+                os.environ, LOG_LEVEL='INFO', LOG_PATH=os.path.join(tmp_dir, 'app.log'),
+                LOG_SERIALIZE='false', LOG_STDERR='false', REQUEST_LOG_LEVEL='INFO',
+                REQUEST_LOG_SAMPLE='1'
+            )
+            env.update(overrides)
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.log_overhead',
+                 '--worker', '--rows', str(args.rows)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f'{mode:<15} {result["p50_us"]:>10.1f} {result["p99_us"]:>10.1f} '
+              f'{result["mean_us"]:>11.1f}')
+
+
+if __name__ == '__main__':
+    main()
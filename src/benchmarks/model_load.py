@@ -0,0 +1,95 @@
+"""
+Benchmark del tiempo de carga y la memoria residente de cada motor de inferencia.
+
+Cada motor se mide en un proceso nuevo. La memoria anónima es privada de cada
+proceso, mientras que la memoria respaldada por archivo (el artefacto mapeado)
+se comparte entre todos los procesos que lo cargan.
+
+Uso (desde el directorio `src`):
+    python -m benchmarks.model_load
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from loguru import logger
+
+ENGINES = ('sklearn', 'compiled')
+
+
+def memory_kb(pid: int | str = 'self') -> dict:
+    """
+    Lee la memoria residente de un proceso desde `/proc/<pid>/smaps_rollup`.
+
+    Args:
+        pid (int | str): PID del proceso, o 'self' para el proceso actual.
+
+    Returns:
+        dict: Memoria residente total, proporcional (PSS), anónima y respaldada por
+            archivo, en KiB.
+    """
+    fields = dict()
+    with open(f'/proc/{pid}/smaps_rollup') as file:
+        for line in file:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss', 'Anonymous'):
+                fields[key] = int(rest.split()[0])
+    return {
+        'rss': fields['Rss'],
+        'pss': fields['Pss'],
+        'anonymous': fields['Anonymous'],
+        'file': fields['Rss'] - fields['Anonymous'],
+    }
+
+
+def run_worker(rows: int) -> None:
+    """Carga el modelo en este proceso y escribe las medidas como JSON."""
+    logger.remove()
+    from benchmarks.synthetic import make_features
+    from model.model_inference import ModelInferenceService
+
+    data = make_features(rows)
+    ml_svc = ModelInferenceService()
+    before = memory_kb()
+
+    start = time.perf_counter()
+    ml_svc.load_model()
+    load_s = time.perf_counter() - start
+
+    # Una predicción recorre los árboles y trae a memoria las páginas usadas
+    ml_svc.predict_batch(data)
+    after = memory_kb()
+
+    result = {'load_s': load_s}
+    result.update({f'{key}_kb': after[key] - before[key] for key in after})
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000)
+    parser.add_argument('--worker', choices=ENGINES)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.rows)
+        return
+
+    print(f'{"motor":<8} {"carga (ms)":>11} {"RSS (KiB)":>10} '
+          f'{"anónima (KiB)":>14} {"archivo (KiB)":>14}')
+    for engine in ENGINES:
+        env = dict(os.environ, INFERENCE_ENGINE=engine)
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.model_load',
+             '--worker', engine, '--rows', str(args.rows)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f'{engine:<8} {result["load_s"] * 1000:>11.1f} {result["rss_kb"]:>10} '
+              f'{result["anonymous_kb"]:>14} {result["file_kb"]:>14}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark de rendimiento de la inferencia fila a fila frente a la inferencia por lotes.
+
+Uso (desde el directorio `src`):
+    python -m benchmarks.predict_batch --rows 200000 --single-rows 200
+"""
+import argparse
+import sys
+import time
+from loguru import logger
+from benchmarks.synthetic import make_features
+from model.model_inference import ModelInferenceService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--single-rows', type=int, default=200)
+    args = parser.parse_args()
+
+    # Silencia los mensajes por predicción para no medir la escritura en consola
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    ml_svc = ModelInferenceService()
+    ml_svc.load_model()
+    data = make_features(args.rows)
+
+    rows = data.head(args.single_rows).to_numpy().tolist()
+    start = time.perf_counter()
+    for row in rows:
+        ml_svc.predict(row)
+    single_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ml_svc.predict_batch(data)
+    batch_elapsed = time.perf_counter() - start
+
+    single_rate = len(rows) / single_elapsed
+    batch_rate = len(data) / batch_elapsed
+    print(f'predict       : {len(rows):>10} filas  {single_rate:>12,.0f} filas/s')
+    print(f'predict_batch : {len(data):>10} filas  {batch_rate:>12,.0f} filas/s')
+    print(f'aceleración   : {batch_rate / single_rate:>10.1f}x')
+
+
+if __name__ == '__main__':
+    main()
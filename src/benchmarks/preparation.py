@@ -0,0 +1,70 @@
+"""
+Benchmark de `encode_cat_cols` y `parse_col` frente a su implementación celda a celda.
+
+Para cada tamaño de tabla se comprueba que ambas implementaciones producen los
+mismos valores y se compara el tiempo de ejecución.
+
+Uso (desde el directorio `src`):
+    python -m benchmarks.preparation --sizes 10000 100000 1000000 10000000
+"""
+import argparse
+import re
+import time
+import pandas as pd
+from loguru import logger
+from benchmarks.synthetic import make_raw_table
+from model.pipeline.preparation import encode_cat_cols, parse_col
+from config.features_settings import get_features_settings
+
+
+def encode_cat_cols_per_cell(data: pd.DataFrame) -> pd.DataFrame:
+    """Codificación categórica con una lambda de Python por celda."""
+    columns = get_features_settings().categorical_columns
+    data[columns] = data[columns].map(lambda x: 1 if x == 'yes' else 0)
+    return data
+
+
+def parse_col_per_cell(data: pd.DataFrame) -> pd.DataFrame:
+    """Extracción de metros cuadrados con `re.search` por celda."""
+    for column in get_features_settings().parse_columns:
+        data[column] = data[column].apply(
+            lambda x: int(re.search(r'(\d+)\s*m²', str(x)).group(1))  # type: ignore
+            if re.search(r'(\d+)\s*m²', str(x)) else 0
+        )
+    return data
+
+
+def timed(func, data: pd.DataFrame) -> tuple[pd.DataFrame, float]:
+    """Ejecuta `func` sobre una copia de `data` y devuelve el resultado y su duración."""
+    data = data.copy()
+    start = time.perf_counter()
+    result = func(data)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    logger.remove()
+
+    features_settings = get_features_settings()
+    columns = features_settings.categorical_columns + features_settings.parse_columns
+    print(f'{"filas":>10} {"celda a celda (s)":>18} {"vectorizado (s)":>16} '
+          f'{"aceleración":>12}')
+    for n_rows in args.sizes:
+        data = make_raw_table(n_rows)
+        expected, per_cell_s = timed(
+            lambda d: parse_col_per_cell(encode_cat_cols_per_cell(d)), data
+        )
+        actual, vectorized_s = timed(lambda d: parse_col(encode_cat_cols(d)), data)
+
+        pd.testing.assert_frame_equal(
+            actual[columns].astype('int64'), expected[columns].astype('int64')
+        )
+        print(f'{n_rows:>10} {per_cell_s:>18.3f} {vectorized_s:>16.3f} '
+              f'{per_cell_s / vectorized_s:>11.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+Suite de benchmarks de extremo a extremo de la construcción y la inferencia.
+
+Para cada tamaño se genera una base SQLite sintética con el esquema de
+`RentApartments` y se ejecuta en un proceso nuevo la construcción completa
+(`build_model`) seguida de la carga y la predicción del modelo, con los artefactos
+en un directorio temporal. Los tiempos de cada etapa se toman de la
+instrumentación (`model.instrumentation`) y se guarda el menor de varias
+repeticiones. Los resultados se escriben en JSON y, con `--baseline`, se comparan
+con un resultado anterior: el programa termina con error si alguna etapa es más
+lenta que la de referencia por encima del umbral.
+
+Uso (desde el directorio `src`):
+    python -m benchmarks.suite --rows 10000 50000 --output bench.json
+    python -m benchmarks.suite --rows 10000 50000 --baseline bench.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Etapas medidas y temporizador de la instrumentación del que se toma cada una
+STAGES = {
+    'collection': 'collection.load_data_from_db',
+    'preparation': 'preparation.transform_data',
+    'search': 'search.fit',
+    'fit': 'model.refit',
+    'evaluate': 'model.evaluate_model',
+    'save': 'model.save_model',
+    'register': 'model.register_model',
+    'load': 'inference.load_model',
+    'predict_single': 'inference.predict',
+    'predict_batch': 'inference.predict_batch',
+}
+
+# Búsqueda reducida para que la suite mida la pipeline y no el espacio de búsqueda
+SEARCH_SPACE = {'n_estimators': [50, 100], 'max_depth': [6, 9]}
+
+# Variables de entorno que cambiarían el camino medido
+ISOLATED_SETTINGS = (
+    'DATA_CACHE_DIR', 'READ_CHUNK_SIZE', 'FOLD_CACHE_DIR', 'PREDICTION_CACHE_SIZE',
+    'METRICS_PATH', 'COMPRESSION_MAX_R2_LOSS', 'TRAINING_MODE', 'MONITOR_ENABLED',
+    'FEATURE_INDEX_ENABLED',
+)
+
+
+def run_worker(rows: int, single_rows: int) -> None:
+    """
+    Construye el modelo sobre la base configurada por entorno, lo carga y predice,
+    y escribe el tiempo de cada etapa como JSON.
+    """
+    from loguru import logger
+    from benchmarks.synthetic import make_features
+    from model import instrumentation
+    from model.pipeline.model import build_model
+    from model.model_inference import ModelInferenceService
+
+    logger.remove()
+    instrumentation.enable()
+
+    start = time.perf_counter()
+    build_model()
+    build_s = time.perf_counter() - start
+
+    ml_svc = ModelInferenceService()
+    ml_svc.load_model()
+    data = make_features(rows)
+    for row in data.head(single_rows).to_numpy().tolist():
+        ml_svc.predict(row)
+    ml_svc.predict_batch(data)
+
+    timers = instrumentation.collector.snapshot()['timers']
+    result = {'build': build_s}
+    for stage, name in STAGES.items():
+        summary = timers.get(name, {'count': 0})
+        if summary['count']:
+            # Las predicciones individuales se miden por llamada
+            result[stage] = summary['mean_ms' if stage == 'predict_single' else 'total_ms']
+            result[stage] /= 1000
+    print(json.dumps(result))
+
+
+def run_size(rows: int, repeat: int, single_rows: int, seed: int) -> dict:
+    """
+    Ejecuta la suite para un tamaño de tabla y devuelve el menor tiempo de cada etapa.
+
+    Args:
+        rows (int): Filas de la base sintética.
+        repeat (int): Número de repeticiones.
+        single_rows (int): Predicciones individuales por repetición.
+        seed (int): Semilla de la base sintética.
+
+    Returns:
+        dict: Segundos de cada etapa y filas por segundo de la predicción por lotes.
+    """
+    from benchmarks.synthetic import write_database
+    from config.db_settings import get_db_settings
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = write_database(
+            Path(tmp_dir) / 'bench.sqlite', rows, get_db_settings().table_name, seed
+        )
+        env = {key: value for key, value in os.environ.items() if key not in ISOLATED_SETTINGS}
+        env.update(
+            DB_DIR=tmp_dir, DB_NAME=db_path.name, MODEL_DIR=str(Path(tmp_dir) / 'models'),
+            INFERENCE_ENGINE='sklearn', SEARCH_ENGINE='grid', SEARCH_CV='3',
+            SEARCH_SPACE=json.dumps(SEARCH_SPACE), LOG_ENQUEUE='false'
+        )
+
+        runs = list()
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.suite', '--worker',
+                 '--rows', str(rows), '--single-rows', str(single_rows)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    result = {stage: min(run[stage] for run in runs) for stage in runs[0]}
+    result['predict_batch_rows_per_s'] = rows / result['predict_batch']
+    return result
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_seconds: float) -> list:
+    """
+    Compara los tiempos con los de referencia.
+
+    Args:
+        results (dict): Resultados actuales por tamaño.
+        baseline (dict): Resultados de referencia por tamaño.
+        threshold (float): Aumento relativo máximo permitido (0.2 es un 20 %).
+        min_seconds (float): Las etapas más rápidas que esto en la referencia se
+            ignoran, porque su variación es ruido.
+
+    Returns:
+        list: Descripción de cada regresión.
+    """
+    regressions = list()
+    print(f'\n{"tamaño":<10} {"etapa":<16} {"referencia (s)":>15} {"actual (s)":>12} '
+          f'{"cambio":>8}')
+    for size, stages in results.items():
+        for stage, seconds in stages.items():
+            reference = baseline.get(size, dict()).get(stage)
+            if reference is None or stage.endswith('_per_s'):
+                continue
+            change = seconds / reference - 1
+            flag = ''
+            if change > threshold and reference >= min_seconds:
+                flag = '  REGRESIÓN'
+                regressions.append(f'{size} {stage}: {change:+.0%}')
+            print(f'{size:<10} {stage:<16} {reference:>15.4f} {seconds:>12.4f} '
+                  f'{change:>+8.0%}{flag}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--single-rows', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=123)
+    parser.add_argument('--output', type=Path, help='Archivo JSON de resultados')
+    parser.add_argument('--baseline', type=Path, help='Resultados de referencia')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--min-seconds', type=float, default=0.005)
+    parser.add_argument('--worker', action='store_true')
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.rows[0], args.single_rows)
+        return
+
+    results = dict()
+    for rows in args.rows:
+        results[str(rows)] = run_size(rows, args.repeat, args.single_rows, args.seed)
+        print(f'\nfilas={rows}')
+        for stage, value in results[str(rows)].items():
+            unit = 'filas/s' if stage.endswith('_per_s') else 's'
+            print(f'    {stage:<26} {value:>14.4f} {unit}')
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': args.repeat,
+            'search_space': SEARCH_SPACE,
+        },
+        'results': results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f'\nResultados guardados en: {args.output}')
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())['results']
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        for regression in regressions:
+            print(f'ERROR: regresión en {regression}')
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
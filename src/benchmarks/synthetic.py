@@ -0,0 +1,111 @@
+import sqlite3
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Columnas binarias (yes/no) de la tabla `RentApartments`
+FLAG_COLUMNS = ['balcony', 'storage', 'parking', 'furnished', 'garage']
+
+# Orientaciones usadas en la descripción del jardín
+ORIENTATIONS = ['north', 'south', 'east', 'west', 'north-east', 'south-west']
+
+
+def make_features(n_rows: int, seed: int = 123) -> pd.DataFrame:
+    """
+    Genera un DataFrame sintético con las columnas de `features_prediction`
+    ya preparadas, con rangos de valores similares a los de la tabla real.
+
+    Args:
+        n_rows (int): Número de filas a generar.
+        seed (int): Semilla del generador aleatorio.
+
+    Returns:
+        pd.DataFrame: DataFrame con una fila por apartamento sintético.
+    """
+    rng = np.random.default_rng(seed)
+    rooms = rng.integers(1, 8, n_rows)
+    data = {
+        'area': rng.uniform(20, 300, n_rows).round(),
+        'constraction_year': rng.integers(1850, 2024, n_rows),
+        'rooms': rooms,
+        'bedrooms': np.maximum(rooms - rng.integers(0, 3, n_rows), 1),
+        'bathrooms': rng.integers(1, 4, n_rows),
+    }
+    for column in FLAG_COLUMNS:
+        data[column] = rng.integers(0, 2, n_rows)
+    data['garden'] = np.where(rng.random(n_rows) < 0.1, rng.integers(1, 120, n_rows), 0)
+    return pd.DataFrame(data).astype(np.float64)
+
+
+def make_raw_table(n_rows: int, seed: int = 123) -> pd.DataFrame:
+    """
+    Genera un DataFrame sintético con el esquema de la tabla `RentApartments`, con
+    columnas 'yes'/'no' y descripciones del jardín como 'Present (47 m²)'.
+
+    Args:
+        n_rows (int): Número de filas a generar.
+        seed (int): Semilla del generador aleatorio.
+
+    Returns:
+        pd.DataFrame: DataFrame con una fila por apartamento sintético.
+    """
+    rng = np.random.default_rng(seed)
+    features = make_features(n_rows, seed)
+    data = pd.DataFrame({
+        'address': [f'{1000 + i % 9000} AB Amsterdam ({i})' for i in range(n_rows)],
+        'area': features['area'],
+        'constraction_year': features['constraction_year'].astype(np.int64),
+        'rooms': features['rooms'].astype(np.int64),
+        'bedrooms': features['bedrooms'].astype(np.int64),
+        'bathrooms': features['bathrooms'].astype(np.int64),
+    })
+    for column in FLAG_COLUMNS:
+        data[column] = np.where(features[column] == 1, 'yes', 'no').astype(object)
+
+    # Jardines con el mismo formato que los datos reales
+    gardens = features['garden'].astype(np.int64).to_numpy()
+    orientation = rng.choice(ORIENTATIONS, n_rows)
+    located = rng.random(n_rows) < 0.3
+    data['garden'] = [
+        'Not present' if area == 0
+        else f'Present ({area} m², located on the {side})' if with_side
+        else f'Present ({area} m²)'
+        for area, side, with_side in zip(gardens, orientation, located)
+    ]
+    data['energy'] = rng.choice(list('ABCDEFG'), n_rows).astype(object)
+    data['facilities'] = rng.choice(['Bath, Toilet', 'Shower, Toilet', 'Cable TV'], n_rows)
+    data['zip'] = [f'{1000 + i % 9000} AB' for i in range(n_rows)]
+    data['neighborhood'] = rng.choice(['Centrum', 'Oost', 'West', 'Zuid', 'Noord'], n_rows)
+
+    # Precio sintético aproximadamente proporcional al área
+    data['rent'] = (features['area'] * rng.uniform(15, 30, n_rows)).round().astype(np.int64)
+    return data
+
+
+def write_database(
+    path: Path,
+    n_rows: int,
+    table_name: str = 'rent_apartments',
+    seed: int = 123,
+    chunk_size: int = 100_000
+) -> Path:
+    """
+    Escribe una base de datos SQLite sintética con la tabla `RentApartments`.
+
+    Args:
+        path (Path): Ruta del archivo SQLite. Se reemplaza si ya existe.
+        n_rows (int): Número de filas a generar.
+        table_name (str): Nombre de la tabla.
+        seed (int): Semilla del generador aleatorio.
+        chunk_size (int): Filas generadas e insertadas por bloque.
+
+    Returns:
+        Path: Ruta del archivo SQLite creado.
+    """
+    path.unlink(missing_ok=True)
+    with sqlite3.connect(path) as connection:
+        for start in range(0, n_rows, chunk_size):
+            data = make_raw_table(min(chunk_size, n_rows - start), seed + start)
+            data['address'] = [f'{address} #{start}' for address in data['address']]
+            data.to_sql(table_name, connection, if_exists='append', index=False)
+    return path
@@ -0,0 +1,149 @@
+"""
+Benchmark del pico de memoria del entrenamiento con la matriz float32 ordenada por
+columnas frente al DataFrame ancho anterior.
+
+Sobre una base sintética grande se ejecutan, en un proceso nuevo por variante, la
+preparación de los datos, la separación en características y objetivo, la
+partición en entrenamiento y prueba y el ajuste de un bosque:
+
+- 'dataframe': separación con `DataFrame.loc`, que conserva columnas int64 y
+  float64 que scikit-learn convierte a float32 en cada ajuste.
+- 'float32': `split_features_target`, que materializa una sola vez la matriz
+  float32 en orden Fortran y la entrega a scikit-learn sin copias.
+- 'chunked': `load_features_target` (`READ_CHUNK_SIZE`), que además prepara la
+  tabla por bloques directamente sobre la matriz float32.
+
+Se informa del pico de cada etapa y de la memoria adicional del entrenamiento
+(partición y ajuste) sobre la memoria residente al terminar la preparación.
+
+Uso (desde el directorio `src`):
+    python -m benchmarks.training_memory --rows 500000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+VARIANTS = ('dataframe', 'float32', 'chunked')
+STAGES = ('prepare', 'split', 'partition', 'fit')
+
+
+def resident_mb() -> float:
+    """Devuelve la memoria residente actual del proceso en MiB."""
+    with open('/proc/self/status') as file:
+        for line in file:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_worker(variant: str, n_estimators: int) -> None:
+    """Ejecuta las etapas del entrenamiento y escribe su tiempo y pico de memoria."""
+    from loguru import logger
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.model_selection import train_test_split
+    from model import instrumentation
+    from model.instrumentation import stage
+    from model.pipeline.model import load_features_target, split_features_target
+    from model.pipeline.preparation import prepare_data
+
+    logger.remove()
+    instrumentation.enable()
+
+    with stage('prepare'):
+        if variant == 'chunked':
+            X, y = load_features_target(50_000)
+        else:
+            data = prepare_data()
+
+    with stage('split'):
+        if variant == 'dataframe':
+            X = data.loc[:, data.columns != 'rent']
+            y = data.loc[:, data.columns == 'rent'].squeeze()
+        elif variant == 'float32':
+            X, y = split_features_target(data)
+            del data
+    prepared_mb = resident_mb()
+
+    with stage('partition'):
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=123
+        )
+        if variant != 'dataframe':
+            del X, y
+
+    with stage('fit'):
+        model = RandomForestRegressor(
+            n_estimators=n_estimators, max_depth=12, random_state=123
+        )
+        model.fit(X_train, y_train)
+        score = model.score(X_test, y_test)
+
+    snapshot = instrumentation.collector.snapshot()
+    print(json.dumps({
+        'score': score,
+        'seconds': {name: snapshot['timers'][name]['total_ms'] / 1000 for name in STAGES},
+        'peak_mb': {name: snapshot['memory_peak_mb'][name] for name in STAGES},
+        'training_mb': max(snapshot['memory_peak_mb'][name] for name in STAGES[2:])
+        - prepared_mb,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--n-estimators', type=int, default=10)
+    parser.add_argument('--worker', choices=VARIANTS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.n_estimators)
+        return
+
+    from benchmarks.synthetic import write_database
+    from config.db_settings import get_db_settings
+
+    results = dict()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = write_database(
+            Path(tmp_dir) / 'bench.sqlite', args.rows, get_db_settings().table_name
+        )
+        env = {key: value for key, value in os.environ.items() if key != 'READ_CHUNK_SIZE'}
+        env.update(DB_DIR=tmp_dir, DB_NAME=db_path.name)
+        for variant in VARIANTS:
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.training_memory', '--worker', variant,
+                 '--rows', str(args.rows), '--n-estimators', str(args.n_estimators)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            results[variant] = json.loads(output.strip().splitlines()[-1])
+
+    print(f'{"etapa":<10} ' + ' '.join(
+        f'{variant + " (MB)":>16} {variant + " (s)":>15}' for variant in VARIANTS
+    ))
+    for name in STAGES:
+        print(f'{name:<10} ' + ' '.join(
+            f'{results[variant]["peak_mb"][name]:>16.1f} '
+            f'{results[variant]["seconds"][name]:>15.2f}'
+            for variant in VARIANTS
+        ))
+
+    print()
+    reference = results['dataframe']
+    for variant in VARIANTS:
+        peak = max(results[variant]['peak_mb'].values())
+        training = results[variant]['training_mb']
+        print(f'{variant:<10} pico total {peak:>7.1f} MB '
+              f'({1 - peak / max(reference["peak_mb"].values()):>4.0%} menos), '
+              f'adicional del entrenamiento {training:>6.1f} MB '
+              f'({1 - training / reference["training_mb"]:>4.0%} menos)')
+    print('r2: ' + ', '.join(
+        f'{variant}={results[variant]["score"]:.4f}' for variant in VARIANTS
+    ))
+
+
+if __name__ == '__main__':
+    main()
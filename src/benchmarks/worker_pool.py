@@ -0,0 +1,104 @@
+"""
+Benchmark del rendimiento del pool pre-fork de inferencia según el número de procesos.
+
+El modelo se carga una sola vez en este proceso y cada tamaño de pool se crea
+con fork a partir de él. Varios hilos cliente envían bloques de filas durante un
+tiempo fijo y se miden las peticiones y filas por segundo, junto con la memoria
+de cada proceso: la RSS cuenta las páginas compartidas en cada proceso, mientras
+que la PSS las reparte entre los procesos que las comparten.
+
+Uso (desde el directorio `src`):
+    python -m benchmarks.worker_pool --max-workers 4 --duration 5
+"""
+import argparse
+import sys
+import threading
+import time
+from loguru import logger
+from benchmarks.model_load import memory_kb
+from benchmarks.synthetic import make_features
+from model.model_batching import MicroBatcher
+from model.model_inference import ModelInferenceService
+from model.model_pool import InferencePool
+
+
+def run_clients(batcher, blocks: list, clients: int, duration: float) -> tuple[int, int]:
+    """
+    Envía bloques de filas desde varios hilos durante un tiempo fijo.
+
+    Args:
+        batcher (MicroBatcher | InferencePool): Destino de las peticiones.
+        blocks (list): Bloques de filas que envía cada cliente por turnos.
+        clients (int): Número de hilos cliente.
+        duration (float): Duración de la medida en segundos.
+
+    Returns:
+        tuple[int, int]: Peticiones y filas atendidas.
+    """
+    counts = [[0, 0] for _ in range(clients)]
+    deadline = time.perf_counter() + duration
+
+    def client(i: int) -> None:
+        while time.perf_counter() < deadline:
+            block = blocks[counts[i][0] % len(blocks)]
+            batcher.predict(block)
+            counts[i][0] += 1
+            counts[i][1] += len(block)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(count[0] for count in counts), sum(count[1] for count in counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max-workers', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--block-rows', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    ml_svc = ModelInferenceService()
+    ml_svc.load_model()
+    data = make_features(args.block_rows * 100).to_numpy()
+    blocks = [data[i:i + args.block_rows] for i in range(0, len(data), args.block_rows)]
+
+    print(f'{"procesos":<10} {"peticiones/s":>13} {"filas/s":>12} '
+          f'{"RSS/proc (KiB)":>15} {"PSS/proc (KiB)":>15} {"anónima/proc (KiB)":>19}')
+
+    batcher = MicroBatcher(ml_svc, max_batch_size=256, max_wait_ms=5.0)
+    batcher.start()
+    requests, rows = run_clients(batcher, blocks, args.clients, args.duration)
+    batcher.stop()
+    memory = memory_kb()
+    print(f'{"en proceso":<10} {requests / args.duration:>13,.0f} '
+          f'{rows / args.duration:>12,.0f} {memory["rss"]:>15} {memory["pss"]:>15} '
+          f'{memory["anonymous"]:>19}')
+
+    for n_workers in range(1, args.max_workers + 1):
+        pool = InferencePool(ml_svc, n_workers)
+        pool.start()
+        # Calentamiento: cada proceso recorre el modelo antes de medir
+        for block in blocks[:n_workers * 4]:
+            pool.predict(block)
+
+        requests, rows = run_clients(pool, blocks, args.clients, args.duration)
+        memories = [memory_kb(pid) for pid in pool.worker_pids()]
+        pool.stop()
+
+        def average(key: str) -> int:
+            return sum(memory[key] for memory in memories) // len(memories)
+
+        print(f'{n_workers:<10} {requests / args.duration:>13,.0f} '
+              f'{rows / args.duration:>12,.0f} {average("rss"):>15} '
+              f'{average("pss"):>15} {average("anonymous"):>19}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,17 @@
 from model.model_builder import ModelBuilderService
+from model.instrumentation import configure_metrics, dump_metrics
+from config.logger_settings import configure_logging
 from loguru import logger
 
 
 @logger.catch
 def main():
+    configure_logging()
     logger.info('Ejecutando la aplicación')
+    configure_metrics()
     ml_svc = ModelBuilderService()
     ml_svc.train_model()
+    dump_metrics()
 
 
 if __name__ == '__main__':
@@ -1,9 +1,6 @@
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
-from dotenv import load_dotenv, find_dotenv
-
-# Cargar el archivo .env explícitamente usando find_dotenv
-load_dotenv(find_dotenv())
 
 
 class DBSettings(BaseSettings):
@@ -14,14 +11,45 @@ class DBSettings(BaseSettings):
         db_dir (str): Directorio que contiene el archivo de la base de datos.
         db_name (str): Nombre del archivo de la base de datos.
         table_name (str): Nombre de la tabla en la base de datos.
+        read_chunk_size (int | None): Filas leídas por bloque al extraer la tabla. Si es
+            None, la tabla se lee completa de una vez.
+        data_cache_dir (str | None): Directorio de la caché local de datos preparados.
+            Si es None, los datos se extraen y preparan en cada construcción.
+        cache_block_size (int): Número de filas por bloque de la caché.
+        predictions_table_name (str): Tabla donde el trabajo de puntuación por lotes
+            escribe las predicciones.
+        scoring_chunk_size (int): Filas puntuadas y escritas por transacción.
+        sqlite_journal_mode (str): Modo de diario de las conexiones de la puntuación.
+            Con 'WAL' las lecturas no se bloquean mientras se escriben predicciones;
+            al terminar, la base de datos vuelve al modo por defecto, 'DELETE'.
+        sqlite_synchronous (str): Nivel de sincronización de las conexiones de la
+            puntuación. Con WAL, 'NORMAL' sólo sincroniza el disco en los checkpoints.
         root_dir (Path): Ruta al directorio raíz del proyecto.
     """
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).with_name('.env'),  # Se lee al instanciar, sin buscarlo
+        env_file_encoding='utf-8',
+        extra='ignore'
+    )
 
     # Atributos de directorios y archivos
     db_dir: str  # Directorio de la base de datos
     db_name: str  # Nombre de la base de datos
     table_name: str  # Nombre de la tabla en la base de datos
 
+    # Lectura por bloques de la tabla
+    read_chunk_size: int | None = None
+
+    # Caché local de datos preparados
+    data_cache_dir: str | None = None
+    cache_block_size: int = 50_000
+
+    # Puntuación por lotes
+    predictions_table_name: str = 'rent_predictions'
+    scoring_chunk_size: int = 50_000
+    sqlite_journal_mode: str = 'WAL'
+    sqlite_synchronous: str = 'NORMAL'
+
     # Atributo de directorio raíz usando pathlib
     root_dir: Path = Path(__file__).resolve().parents[1]
 
@@ -34,3 +62,26 @@ class DBSettings(BaseSettings):
             Path: Ruta completa al archivo de la base de datos.
         """
         return self.root_dir / self.db_dir / self.db_name
+
+    @property
+    def data_cache_path(self) -> Path | None:
+        """
+        Devuelve la ruta completa al directorio de la caché de datos preparados.
+
+        Returns:
+            Path | None: Ruta de la caché, o None si está desactivada.
+        """
+        if self.data_cache_dir is None:
+            return None
+        return self.root_dir / self.data_cache_dir
+
+
+@lru_cache(maxsize=1)
+def get_db_settings() -> DBSettings:
+    """
+    Devuelve la configuración de la base de datos, creándola en el primer uso.
+
+    Returns:
+        DBSettings: Instancia compartida de la configuración.
+    """
+    return DBSettings()  # type: ignore
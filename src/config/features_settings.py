@@ -1,11 +1,7 @@
-import yaml
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
 from loguru import logger
-from dotenv import load_dotenv, find_dotenv
-
-# Carga las variables de entorno desde el archivo .env
-load_dotenv(find_dotenv(), override=True)
 
 
 class FeaturesSettings(BaseSettings):
@@ -22,6 +18,11 @@ class FeaturesSettings(BaseSettings):
         features_prediction (list[str]): Columnas que se usan para predicciones.
         root_dir (Path): Directorio raíz del proyecto.
     """
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).with_name('.env'),  # Se lee al instanciar, sin buscarlo
+        env_file_encoding='utf-8',
+        extra='ignore'
+    )
 
     # Atributos específicos de los features
     features_dir: str
@@ -44,6 +45,8 @@ class FeaturesSettings(BaseSettings):
         Argumentos:
             **kwargs: Argumentos adicionales para la configuración de la clase.
         """
+        import yaml
+
         super().__init__(**kwargs)
 
         # Cargar configuraciones adicionales desde un archivo YAML automáticamente
@@ -68,3 +71,14 @@ class FeaturesSettings(BaseSettings):
             Path: Ruta completa del archivo de configuración de características.
         """
         return self.root_dir / self.features_dir / self.features_name
+
+
+@lru_cache(maxsize=1)
+def get_features_settings() -> FeaturesSettings:
+    """
+    Devuelve la configuración de características, leyendo el YAML en el primer uso.
+
+    Returns:
+        FeaturesSettings: Instancia compartida de la configuración.
+    """
+    return FeaturesSettings()
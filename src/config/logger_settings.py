@@ -1,9 +1,9 @@
-from pydantic_settings import BaseSettings
+import itertools
+import sys
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pathlib import Path
 from loguru import logger
-from dotenv import load_dotenv, find_dotenv
-
-# Cargar el archivo .env explícitamente usando find_dotenv
-load_dotenv(find_dotenv(), override=True)
 
 
 class LoggerSettings(BaseSettings):
@@ -12,27 +12,123 @@ class LoggerSettings(BaseSettings):
 
     Atributos:
         log_level (str): Nivel de log deseado para la configuración de logging.
+        log_path (str): Archivo de log, relativo a `root_dir`.
+        log_enqueue (bool): Escribe los mensajes desde un hilo en segundo plano, de modo
+            que la escritura del archivo queda fuera del camino de cada petición.
+            Compensa cuando el disco es lento y hay núcleos libres: con un solo
+            núcleo el hilo de escritura compite con las peticiones.
+        log_serialize (bool): Escribe cada mensaje como una línea JSON.
+        log_stderr (bool): Escribe también los mensajes en la salida de error, con el
+            formato por defecto de loguru.
+        request_log_level (str): Nivel de los mensajes que se emiten en cada predicción.
+        request_log_sample (int): Emite sólo uno de cada N mensajes por predicción.
+        root_dir (Path): Directorio raíz del proyecto.
     """
-    log_level: str
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).with_name('.env'),  # Se lee al instanciar, sin buscarlo
+        env_file_encoding='utf-8',
+        extra='ignore'
+    )
+
+    log_level: str = 'INFO'
+    log_path: str = 'logs/app.log'
+
+    # Escritura asíncrona y formato estructurado
+    log_enqueue: bool = False
+    log_serialize: bool = False
+    log_stderr: bool = True  # Además del archivo
 
+    # Mensajes por predicción
+    request_log_level: str = 'INFO'
+    request_log_sample: int = 1
 
-def configure_logging(log_level: str):
+    # Atributo de directorio raíz usando pathlib
+    root_dir: Path = Path(__file__).resolve().parents[1]
+
+
+class RequestLog:
+    """
+    Emisor de los mensajes que se generan en cada predicción, con el nivel y el
+    muestreo de `LoggerSettings`. Los mensajes descartados no se formatean.
     """
-    Configura el sistema de logging de la aplicación.
+
+    def __init__(self, level: str, sample: int) -> None:
+        """
+        Inicializa el emisor. El nivel se comprueba aquí, al arrancar el servicio, y
+        no en la primera predicción.
+
+        Args:
+            level (str): Nivel de los mensajes.
+            sample (int): Emite sólo uno de cada `sample` mensajes.
+
+        Raises:
+            ValueError: Si loguru no tiene el nivel `level`.
+        """
+        try:
+            logger.level(level)
+        except ValueError:
+            raise ValueError(
+                f'Nivel de log desconocido para REQUEST_LOG_LEVEL: {level!r}'
+            ) from None
+        self.level = level
+        self.sample = max(1, sample)
+        self._counter = itertools.count()  # `next` es atómico con el GIL
+
+    def __call__(self, message: str, *args) -> None:
+        """
+        Emite un mensaje si le corresponde según el muestreo.
+
+        Args:
+            message (str): Mensaje con marcadores `{}` para los argumentos.
+            *args: Argumentos que se formatean sólo si el mensaje se emite.
+        """
+        if next(self._counter) % self.sample:
+            return
+        logger.opt(depth=1).log(self.level, message, *args)
+
+
+@lru_cache(maxsize=1)
+def get_logger_settings() -> LoggerSettings:
+    """
+    Devuelve la configuración del logging, creándola en el primer uso.
+
+    Returns:
+        LoggerSettings: Instancia compartida de la configuración.
+    """
+    return LoggerSettings()
+
+
+def get_request_log() -> RequestLog:
+    """
+    Crea el emisor de mensajes por predicción según la configuración.
+
+    Returns:
+        RequestLog: Emisor con el nivel y el muestreo configurados.
+    """
+    logger_settings = get_logger_settings()
+    return RequestLog(logger_settings.request_log_level, logger_settings.request_log_sample)
+
+
+def configure_logging(log_level: str | None = None):
+    """
+    Configura el sistema de logging de la aplicación: el archivo de `log_path` y,
+    salvo que `log_stderr` lo desactive, la salida de error.
 
     Argumentos:
-        log_level (str): Nivel de log que se utilizará en la aplicación, como INFO o ERROR.
+        log_level (str | None): Nivel de log que se utilizará en la aplicación, como
+            INFO o ERROR. Por defecto, el de `LoggerSettings`.
     """
+    logger_settings = get_logger_settings()
+    level = log_level or logger_settings.log_level
     logger.remove()  # Elimina cualquier configuración previa de log
+    if logger_settings.log_stderr:
+        logger.add(sys.stderr, level=level, enqueue=logger_settings.log_enqueue)
     logger.add(
-        sink='logs/app.log',
+        sink=logger_settings.root_dir / logger_settings.log_path,
         rotation='1 day',  # Rotación de logs diaria
         retention='2 days',  # Retención de logs por 2 días
         compression='zip',  # Compresión en formato zip
-        level=log_level  # Nivel de log especificado
+        level=level,  # Nivel de log especificado
+        enqueue=logger_settings.log_enqueue,  # Escritura desde un hilo en segundo plano
+        serialize=logger_settings.log_serialize  # Una línea JSON por mensaje
     )
-
-
-# Configura el logging de la aplicación usando el nivel de log definido en LoggerSettings
-logger_settings = LoggerSettings()  # type: ignore
-configure_logging(log_level=logger_settings.log_level)
@@ -0,0 +1,54 @@
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pathlib import Path
+from typing import Literal
+
+
+class MetricsSettings(BaseSettings):
+    """
+    Configuración de la instrumentación de tiempos y memoria.
+
+    Atributos:
+        metrics_enabled (bool): Activa los temporizadores y las marcas de memoria. Con
+            False las funciones instrumentadas sólo comprueban un indicador.
+        metrics_path (str | None): Archivo, relativo a `root_dir`, donde se vuelcan las
+            métricas al terminar el entrenamiento o la inferencia. Si es None no se
+            vuelcan.
+        metrics_format (str): Formato del volcado: 'json' o 'prometheus' (texto).
+        root_dir (Path): Directorio raíz del proyecto.
+    """
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).with_name('.env'),  # Se lee al instanciar, sin buscarlo
+        env_file_encoding='utf-8',
+        extra='ignore'
+    )
+
+    metrics_enabled: bool = False
+    metrics_path: str | None = None
+    metrics_format: Literal['json', 'prometheus'] = 'json'
+
+    # Atributo de directorio raíz usando pathlib
+    root_dir: Path = Path(__file__).resolve().parents[1]
+
+    @property
+    def metrics_file_path(self) -> Path | None:
+        """
+        Devuelve la ruta completa del volcado de métricas.
+
+        Returns:
+            Path | None: Ruta del volcado, o None si está desactivado.
+        """
+        if not self.metrics_path:
+            return None
+        return self.root_dir / self.metrics_path
+
+
+@lru_cache(maxsize=1)
+def get_metrics_settings() -> MetricsSettings:
+    """
+    Devuelve la configuración de la instrumentación, creándola en el primer uso.
+
+    Returns:
+        MetricsSettings: Instancia compartida de la configuración.
+    """
+    return MetricsSettings()
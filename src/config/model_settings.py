@@ -1,9 +1,7 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
-from dotenv import load_dotenv, find_dotenv
-
-# Cargar el archivo .env explícitamente usando find_dotenv
-load_dotenv(find_dotenv())
+from typing import Literal
 
 
 class ModelSettings(BaseSettings):
@@ -13,9 +11,76 @@ class ModelSettings(BaseSettings):
     Atributos:
         model_dir (str): Directorio donde se almacenan los modelos.
         model_name (str): Nombre del archivo del modelo.
+        inference_engine (str): Motor de inferencia: 'sklearn' (modelo en pickle) o
+            'compiled' (bosque compilado en arrays planos mapeados en memoria).
+        predict_chunk_size (int): Número de filas por bloque en las predicciones por lotes.
+        prediction_cache_size (int): Número máximo de predicciones memorizadas. Con 0
+            la caché de predicciones está desactivada.
+        prediction_cache_ttl (float | None): Vida máxima en segundos de una predicción
+            memorizada. Si es None sólo se expulsan por LRU.
+        async_max_concurrency (int): Número máximo de lotes de `apredict` evaluándose
+            a la vez en el pool de hilos.
+        async_queue_size (int): Número máximo de peticiones de `apredict` en cola; con
+            la cola llena las nuevas peticiones esperan.
+        async_max_batch_size (int): Número máximo de filas agrupadas en una llamada.
+        async_max_wait_ms (float): Espera máxima en milisegundos para completar un lote.
+        async_timeout (float | None): Tiempo máximo en segundos de una petición de
+            `apredict`. Si es None esperan sin límite.
+        monitor_enabled (bool): Mantiene en la inferencia las estadísticas de las
+            características y de las predicciones, comparadas con el perfil de
+            referencia que guarda `build_model`.
+        monitor_psi_threshold (float): Índice de estabilidad (PSI) a partir del cual
+            una columna se marca como desviada.
+        monitor_min_count (int): Filas observadas necesarias para marcar desviaciones.
+        monitor_bins (int): Cubos por cuantiles de las columnas numéricas del perfil.
+        feature_index_enabled (bool): Mantiene, junto al modelo, el índice de las
+            características preparadas de cada anuncio por su dirección, con el que
+            la inferencia predice por dirección sin consultar la base de datos.
+        feature_index_block_size (int): Número de `rowid` consecutivos por bloque del
+            índice; sólo se vuelven a preparar los bloques modificados.
+        search_engine (str): Motor de búsqueda de hiperparámetros: 'grid' (exhaustiva),
+            'warm_start' (reutiliza árboles a lo largo de `n_estimators`) o 'halving'
+            (successive halving con `n_estimators` como recurso).
+        search_space (dict): Valores de cada hiperparámetro a explorar.
+        search_cv (int): Número de folds de la validación cruzada.
+        search_n_jobs (int): Procesos del pool de búsqueda (-1 para todos los núcleos).
+        search_halving_factor (int): Fracción inversa de candidatos que sobrevive a cada
+            ronda de successive halving.
+        random_state (int): Semilla de los bosques y de la partición de los datos.
+        fold_cache_dir (str | None): Directorio de la caché persistente de resultados
+            de la validación cruzada. Si es None, todos los ajustes se entrenan.
+        fold_cache_max_bytes (int): Tamaño máximo en disco de la caché de folds.
+        training_mode (str): 'full' (búsqueda y entrenamiento desde cero) o
+            'incremental' (amplía el bosque registrado con árboles entrenados sólo
+            en las filas nuevas).
+        incremental_n_estimators (int): Árboles que añade cada actualización incremental.
+        incremental_max_estimators (int): Árboles máximos del bosque actualizado; al
+            superarse se descartan los más antiguos.
+        incremental_min_rows (int): Filas nuevas de entrenamiento necesarias para
+            actualizar el modelo, además de las reservadas para evaluar.
+        incremental_min_test_rows (int): Filas nuevas mínimas reservadas para evaluar
+            la actualización.
+        incremental_max_score_loss (float): Pérdida máxima de R² del modelo ampliado
+            frente al anterior sobre las mismas filas reservadas. Si la actualización
+            queda por debajo, se reconstruye el modelo desde cero.
+        compression_max_r2_loss (float | None): Pérdida máxima de R² sobre el conjunto
+            de validación que admite la compresión del modelo tras el entrenamiento
+            (eliminación de árboles y de niveles, y cuantización del bosque
+            compilado). Si es None, el modelo se guarda sin comprimir.
+        compression_validation_size (float): Fracción del conjunto de entrenamiento
+            que se reserva para elegir la compresión, de modo que el conjunto de
+            prueba sólo se usa para el puntaje final.
+        compression_quantize (bool): Cuantiza los valores del bosque compilado a
+            float16, si la pérdida sigue dentro de `compression_max_r2_loss`.
+        registry_dir (str): Subdirectorio de `model_dir` con el registro de modelos.
+        registry_name (str): Nombre con el que `build_model` registra el modelo (por
+            ejemplo, la ciudad).
+        model_cache_size (int): Número máximo de modelos residentes en memoria.
+        model_cache_max_bytes (int): Tamaño total máximo de los modelos residentes.
         root_dir (Path): Directorio raíz del proyecto.
     """
     model_config = SettingsConfigDict(
+        env_file=Path(__file__).with_name('.env'),  # Se lee al instanciar, sin buscarlo
         env_file_encoding='utf-8',
         protected_namespaces=('settings_', 'config_'),  # Ajusta aquí para evitar el conflicto
         extra='ignore'
@@ -24,6 +89,65 @@ class ModelSettings(BaseSettings):
     # Atributos específicos del modelo obtenidos desde el .env
     model_dir: str  # Directorio de modelos
     model_name: str  # Nombre del modelo
+    inference_engine: Literal['sklearn', 'compiled'] = 'sklearn'  # Motor de inferencia
+
+    # Atributos de inferencia por lotes
+    predict_chunk_size: int = 10_000  # Filas evaluadas por bloque
+
+    # Caché de predicciones de vectores repetidos
+    prediction_cache_size: int = 0  # 0 la desactiva
+    prediction_cache_ttl: float | None = None  # Segundos
+
+    # Inferencia asíncrona
+    async_max_concurrency: int = 2  # Lotes evaluándose a la vez
+    async_queue_size: int = 1024  # Peticiones en cola
+    async_max_batch_size: int = 256  # Filas por lote
+    async_max_wait_ms: float = 2.0
+    async_timeout: float | None = 10.0  # Segundos
+
+    # Monitor de la distribución de entradas y predicciones
+    monitor_enabled: bool = False
+    monitor_psi_threshold: float = 0.2
+    monitor_min_count: int = 500
+    monitor_bins: int = 10
+
+    # Índice de características por dirección
+    feature_index_enabled: bool = False
+    feature_index_block_size: int = 50_000
+
+    # Atributos de la búsqueda de hiperparámetros
+    search_engine: Literal['grid', 'warm_start', 'halving'] = 'grid'
+    search_space: dict[str, list[int | float | str | None]] = {
+        'n_estimators': [100, 200, 300],
+        'max_depth': [3, 6, 9, 12],
+    }
+    search_cv: int = 5  # Folds de la validación cruzada
+    search_n_jobs: int = -1  # Procesos del pool de búsqueda
+    search_halving_factor: int = 3  # Fracción inversa de supervivientes por ronda
+    random_state: int = 123  # Semilla de los bosques y de la partición
+
+    # Caché persistente de la validación cruzada
+    fold_cache_dir: str | None = None
+    fold_cache_max_bytes: int = 2 * 1024 ** 3  # 2 GiB
+
+    # Reentrenamiento incremental
+    training_mode: Literal['full', 'incremental'] = 'full'
+    incremental_n_estimators: int = 20
+    incremental_max_estimators: int = 500
+    incremental_min_rows: int = 100
+    incremental_min_test_rows: int = 200
+    incremental_max_score_loss: float = 0.05
+
+    # Compresión del modelo entrenado
+    compression_max_r2_loss: float | None = None
+    compression_quantize: bool = True
+    compression_validation_size: float = 0.2
+
+    # Registro de modelos versionados y caché de modelos cargados
+    registry_dir: str = 'registry'
+    registry_name: str = 'rent'
+    model_cache_size: int = 4  # Modelos residentes
+    model_cache_max_bytes: int = 1024 ** 3  # 1 GiB
 
     # Atributo de directorio raíz utilizando pathlib
     root_dir: Path = Path(__file__).resolve().parents[1]
@@ -37,3 +161,76 @@ class ModelSettings(BaseSettings):
             Path: Ruta completa del archivo del modelo.
         """
         return self.root_dir / self.model_dir / self.model_name
+
+    @property
+    def forest_path(self) -> Path:
+        """
+        Devuelve la ruta al directorio del artefacto de arrays planos del modelo.
+
+        Returns:
+            Path: Ruta del artefacto mapeable en memoria.
+        """
+        return self.model_path.with_suffix('.forest')
+
+    @property
+    def registry_path(self) -> Path:
+        """
+        Devuelve la ruta completa al directorio del registro de modelos.
+
+        Returns:
+            Path: Ruta del registro de modelos.
+        """
+        return self.root_dir / self.model_dir / self.registry_dir
+
+    @property
+    def search_report_path(self) -> Path:
+        """
+        Devuelve la ruta del informe de la búsqueda de hiperparámetros.
+
+        Returns:
+            Path: Ruta del informe JSON con los tiempos de cada candidato.
+        """
+        return self.model_path.with_suffix('.search.json')
+
+    @property
+    def monitor_profile_path(self) -> Path:
+        """
+        Devuelve la ruta del perfil de referencia del monitor de la inferencia.
+
+        Returns:
+            Path: Ruta del perfil JSON de las características y las predicciones.
+        """
+        return self.model_path.with_suffix('.profile.json')
+
+    @property
+    def feature_index_path(self) -> Path:
+        """
+        Devuelve la ruta al directorio del índice de características por dirección.
+
+        Returns:
+            Path: Ruta del índice mapeable en memoria.
+        """
+        return self.model_path.with_suffix('.index')
+
+    @property
+    def fold_cache_path(self) -> Path | None:
+        """
+        Devuelve la ruta completa al directorio de la caché de folds.
+
+        Returns:
+            Path | None: Ruta de la caché, o None si está desactivada.
+        """
+        if self.fold_cache_dir is None:
+            return None
+        return self.root_dir / self.fold_cache_dir
+
+
+@lru_cache(maxsize=1)
+def get_model_settings() -> ModelSettings:
+    """
+    Devuelve la configuración del modelo, creándola en el primer uso.
+
+    Returns:
+        ModelSettings: Instancia compartida de la configuración.
+    """
+    return ModelSettings()  # type: ignore
@@ -0,0 +1,52 @@
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pathlib import Path
+
+
+class ServerSettings(BaseSettings):
+    """
+    Configuración del servidor HTTP de inferencia.
+
+    Atributos:
+        server_host (str): Dirección en la que escucha el servidor.
+        server_port (int): Puerto en el que escucha el servidor.
+        max_batch_size (int): Número máximo de filas agrupadas en un micro-lote.
+        max_wait_ms (float): Tiempo máximo de espera, en milisegundos, para
+            completar un micro-lote antes de evaluarlo.
+        latency_window (int): Número de latencias recientes usadas para los percentiles.
+        workers (int): Número de procesos de inferencia. Con 1 las peticiones se
+            evalúan en el propio proceso del servidor con micro-batching; con más,
+            en un pool pre-fork que comparte el modelo cargado en el padre.
+        request_timeout (float | None): Tiempo máximo en segundos que una petición de
+            predicción espera su micro-lote; al agotarse se responde con 503. Si es
+            None esperan sin límite.
+    """
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).with_name('.env'),  # Se lee al instanciar, sin buscarlo
+        env_file_encoding='utf-8',
+        extra='ignore'
+    )
+
+    # Atributos de red
+    server_host: str = '127.0.0.1'
+    server_port: int = 8000
+
+    # Atributos del micro-batching
+    max_batch_size: int = 256
+    max_wait_ms: float = 5.0
+    latency_window: int = 10_000
+    request_timeout: float | None = 30.0  # Segundos
+
+    # Atributos del pool de procesos de inferencia
+    workers: int = 1
+
+
+@lru_cache(maxsize=1)
+def get_server_settings() -> ServerSettings:
+    """
+    Devuelve la configuración del servidor, creándola en el primer uso.
+
+    Returns:
+        ServerSettings: Instancia compartida de la configuración.
+    """
+    return ServerSettings()
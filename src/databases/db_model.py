@@ -1,6 +1,6 @@
 from sqlalchemy import REAL, INTEGER, VARCHAR
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from config.db_settings import DBSettings
+from config.db_settings import get_db_settings
 
 
 class Base(DeclarativeBase):
@@ -32,7 +32,7 @@ class RentApartments(Base):
         rent (int): Monthly rent amount.
     """
 
-    __tablename__ = DBSettings().table_name  # type: ignore
+    __tablename__ = get_db_settings().table_name
 
     address: Mapped[str] = mapped_column(VARCHAR(), primary_key=True)
     area: Mapped[float] = mapped_column(REAL())
@@ -51,3 +51,22 @@ class RentApartments(Base):
     zip: Mapped[str] = mapped_column(VARCHAR())
     neighborhood: Mapped[str] = mapped_column(VARCHAR())
     rent: Mapped[int] = mapped_column(INTEGER())
+
+
+class RentPredictions(Base):
+    """
+    SQLAlchemy model for the predictions written by the batch-scoring job.
+
+    Attributes:
+        address (str): Primary key, the address of the scored apartment.
+        prediction (float): Predicted monthly rent.
+        model_version (str): Version of the model that produced the prediction.
+        scored_at (str): ISO 8601 timestamp of the scoring run.
+    """
+
+    __tablename__ = get_db_settings().predictions_table_name
+
+    address: Mapped[str] = mapped_column(VARCHAR(), primary_key=True)
+    prediction: Mapped[float] = mapped_column(REAL())
+    model_version: Mapped[str] = mapped_column(VARCHAR())
+    scored_at: Mapped[str] = mapped_column(VARCHAR())
@@ -1,15 +1,20 @@
 from model.model_inference import ModelInferenceService
+from model.instrumentation import configure_metrics, dump_metrics
+from config.logger_settings import configure_logging
 from loguru import logger
 
 
 @logger.catch
 def main():
+    configure_logging()
     logger.info('Ejecutando la aplicación')
+    configure_metrics()
     ml_svc = ModelInferenceService()
     ml_svc.load_model()
     unseen_data = [167.0, 1870.0, 3.0, 2.0, 2.0, 1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
     pred = ml_svc.predict(unseen_data)
     logger.info(f'Predicción: {pred[0]:0.2f}')
+    dump_metrics()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,355 @@
+import bisect
+import functools
+import json
+import sys
+import threading
+import time
+from collections.abc import Callable
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any
+from loguru import logger
+
+# Límites superiores en segundos de los histogramas, de 10 µs a 5 minutos
+BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0,
+)
+
+# Con la instrumentación desactivada, el valor por defecto, `timer` y `stage`
+# devuelven este contexto vacío compartido y `timed` sólo comprueba el indicador
+_DISABLED = nullcontext()
+_enabled = False
+
+
+class Histogram:
+    """
+    Histograma acumulado de duraciones con los límites de `BUCKETS`.
+
+    Atributos:
+        count (int): Número de observaciones.
+        total (float): Suma de las duraciones en segundos.
+        min (float): Duración mínima observada.
+        max (float): Duración máxima observada.
+    """
+
+    def __init__(self) -> None:
+        """Inicializa el histograma vacío."""
+        self.counts = [0] * (len(BUCKETS) + 1)  # El último cuenta lo que supera BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Añade una duración en segundos al histograma."""
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Estima un cuantil interpolando linealmente dentro del cubo que lo contiene."""
+        target = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for bound, count in zip(BUCKETS, self.counts):
+            if count and cumulative + count >= target:
+                estimate = lower + (bound - lower) * (target - cumulative) / count
+                return min(max(estimate, self.min), self.max)
+            cumulative += count
+            lower = bound
+        return self.max
+
+    def to_dict(self) -> dict:
+        """Devuelve el resumen del histograma con las duraciones en milisegundos."""
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'mean_ms': round(self.total / self.count * 1000, 3),
+            'min_ms': round(self.min * 1000, 3),
+            'p50_ms': round(self.quantile(0.5) * 1000, 3),
+            'p99_ms': round(self.quantile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class MetricsCollector:
+    """
+    Almacén de los histogramas de tiempos y de los picos de memoria por etapa.
+
+    Los temporizadores (`timer`, `timed`) agregan las duraciones por nombre y las
+    etapas (`stage`) registran además el pico de memoria residente del proceso
+    durante su ejecución.
+
+    Métodos:
+        observe: Añade una duración al histograma de un temporizador.
+        record_memory: Registra el pico de memoria de una etapa.
+        snapshot: Devuelve las métricas como diccionario.
+        to_prometheus: Devuelve las métricas en el formato de texto de Prometheus.
+        reset: Elimina todas las métricas.
+    """
+
+    def __init__(self) -> None:
+        """Inicializa el almacén vacío."""
+        self._timers: dict[str, Histogram] = dict()
+        self._memory: dict[str, int] = dict()
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Añade una duración en segundos al histograma `name`."""
+        with self._lock:
+            histogram = self._timers.get(name)
+            if histogram is None:
+                histogram = self._timers[name] = Histogram()
+            histogram.observe(seconds)
+
+    def record_memory(self, name: str, peak_bytes: int) -> None:
+        """Registra el pico de memoria residente de una etapa, conservando el mayor."""
+        with self._lock:
+            self._memory[name] = max(self._memory.get(name, 0), peak_bytes)
+
+    def snapshot(self) -> dict:
+        """
+        Devuelve una copia de las métricas actuales.
+
+        Returns:
+            dict: Resumen de cada temporizador y pico de memoria de cada etapa en MiB.
+        """
+        with self._lock:
+            return {
+                'timers': {name: h.to_dict() for name, h in sorted(self._timers.items())},
+                'memory_peak_mb': {
+                    name: round(peak / 1024 ** 2, 1)
+                    for name, peak in sorted(self._memory.items())
+                },
+            }
+
+    def to_prometheus(self, prefix: str = 'mlops') -> str:
+        """
+        Devuelve las métricas en el formato de texto de exposición de Prometheus.
+
+        Args:
+            prefix (str): Prefijo de los nombres de las métricas.
+
+        Returns:
+            str: Histogramas de duración y picos de memoria.
+        """
+        lines = [
+            f'# HELP {prefix}_duration_seconds Duración de las funciones y etapas.',
+            f'# TYPE {prefix}_duration_seconds histogram',
+        ]
+        with self._lock:
+            for name, histogram in sorted(self._timers.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f'{prefix}_duration_seconds_bucket{{name="{name}",le="{bound}"}} '
+                        f'{cumulative}'
+                    )
+                lines.append(
+                    f'{prefix}_duration_seconds_bucket{{name="{name}",le="+Inf"}} '
+                    f'{histogram.count}'
+                )
+                labels = f'{{name="{name}"}}'
+                lines.append(f'{prefix}_duration_seconds_sum{labels} {histogram.total}')
+                lines.append(f'{prefix}_duration_seconds_count{labels} {histogram.count}')
+
+            lines.append(
+                f'# HELP {prefix}_memory_peak_bytes Pico de memoria residente por etapa.'
+            )
+            lines.append(f'# TYPE {prefix}_memory_peak_bytes gauge')
+            for name, peak in sorted(self._memory.items()):
+                lines.append(f'{prefix}_memory_peak_bytes{{stage="{name}"}} {peak}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        """Elimina todas las métricas registradas."""
+        with self._lock:
+            self._timers.clear()
+            self._memory.clear()
+
+
+# Almacén compartido por todo el proceso
+collector = MetricsCollector()
+
+
+class _Timer:
+    """Contexto que añade su duración al histograma `name` al salir."""
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        collector.observe(self.name, time.perf_counter() - self.start)
+
+
+class _Stage(_Timer):
+    """
+    Contexto que, además del tiempo, registra el pico de memoria residente de una
+    etapa. El pico del proceso se reinicia al entrar y, en etapas anidadas, el pico
+    de la interior se propaga a la exterior.
+    """
+
+    __slots__ = ('peak', 'parent')
+
+    _local = threading.local()
+
+    def __enter__(self) -> '_Stage':
+        self.parent = getattr(self._local, 'current', None)
+        if self.parent is not None:
+            # El reinicio borra el pico previo de la etapa exterior: se guarda antes
+            self.parent.peak = max(self.parent.peak, _peak_rss())
+        _reset_peak_rss()
+        self.peak = 0
+        self._local.current = self
+        return super().__enter__()
+
+    def __exit__(self, *exc_info) -> None:
+        super().__exit__(*exc_info)
+        self.peak = max(self.peak, _peak_rss())
+        collector.record_memory(self.name, self.peak)
+        self._local.current = self.parent
+        if self.parent is not None:
+            self.parent.peak = max(self.parent.peak, self.peak)
+
+
+def enable(enabled: bool = True) -> None:
+    """Activa o desactiva la instrumentación en todo el proceso."""
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    """Indica si la instrumentación está activada."""
+    return _enabled
+
+
+def timer(name: str) -> Any:
+    """
+    Devuelve un contexto que mide el tiempo de un bloque.
+
+    Args:
+        name (str): Nombre del histograma.
+
+    Returns:
+        Contexto que registra la duración, o un contexto vacío si la
+            instrumentación está desactivada.
+    """
+    return _Timer(name) if _enabled else _DISABLED
+
+
+def stage(name: str) -> Any:
+    """
+    Devuelve un contexto que mide el tiempo y el pico de memoria de una etapa.
+
+    Args:
+        name (str): Nombre de la etapa.
+
+    Returns:
+        Contexto que registra la duración y la memoria, o un contexto vacío si la
+            instrumentación está desactivada.
+    """
+    return _Stage(name) if _enabled else _DISABLED
+
+
+def timed(name: str | None = None) -> Callable:
+    """
+    Decorador que mide el tiempo de cada llamada a una función.
+
+    Args:
+        name (str | None): Nombre del histograma. Por defecto, el módulo y el nombre
+            cualificado de la función.
+
+    Returns:
+        Callable: Decorador de la función.
+    """
+    def decorator(func: Callable) -> Callable:
+        metric = name or f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                collector.observe(metric, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def configure_metrics() -> None:
+    """Activa la instrumentación según `MetricsSettings`."""
+    from config.metrics_settings import get_metrics_settings
+
+    enable(get_metrics_settings().metrics_enabled)
+
+
+def dump_metrics(path: Path | None = None, fmt: str | None = None) -> Path | None:
+    """
+    Vuelca las métricas en un archivo JSON o de texto de Prometheus.
+
+    Args:
+        path (Path | None): Archivo de destino. Por defecto, `metrics_path`.
+        fmt (str | None): 'json' o 'prometheus'. Por defecto, `metrics_format`.
+
+    Returns:
+        Path | None: Archivo escrito, o None si la instrumentación está desactivada o
+            no hay destino.
+    """
+    from config.metrics_settings import get_metrics_settings
+
+    metrics_settings = get_metrics_settings()
+    path = path or metrics_settings.metrics_file_path
+    if not _enabled or path is None:
+        return None
+
+    fmt = fmt or metrics_settings.metrics_format
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == 'prometheus':
+        path.write_text(collector.to_prometheus())
+    else:
+        path.write_text(json.dumps(collector.snapshot(), indent=2))
+    logger.info(f'Métricas de instrumentación guardadas en: {path}')
+    return path
+
+
+def _peak_rss() -> int:
+    """Devuelve el pico de memoria residente del proceso (VmHWM) en bytes."""
+    try:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    import resource
+
+    # Fuera de Linux sólo se conoce el pico de toda la vida del proceso, que macOS
+    # da en bytes y el resto de sistemas en KiB
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _reset_peak_rss() -> None:
+    """Reinicia el pico de memoria residente del proceso, si el sistema lo permite."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+    except OSError:
+        pass
@@ -0,0 +1,269 @@
+import asyncio
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+from model.model_batching import BatchingStats
+from loguru import logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from model.model_inference import ModelInferenceService
+
+
+class AsyncPredictor:
+    """
+    Fachada asíncrona del servicio de inferencia para aplicaciones asyncio.
+
+    Las peticiones concurrentes se encolan en una cola acotada y una tarea del
+    bucle de eventos las agrupa en una única llamada al modelo, que se ejecuta en
+    un pool de hilos acotado para no bloquear el bucle con el cálculo ni con la
+    escritura de los logs. Cuando todos los hilos están ocupados la tarea deja de
+    vaciar la cola, y cuando la cola se llena las nuevas peticiones esperan a que
+    haya sitio (backpressure) hasta agotar su tiempo máximo.
+
+    Métodos:
+        predict: Encola un bloque de filas y espera sus predicciones.
+        metrics: Devuelve las estadísticas de latencia y tamaño de lote.
+        aclose: Detiene la tarea de agrupación y el pool de hilos, y hace fallar
+        las peticiones que aún no se han evaluado.
+    """
+
+    def __init__(
+        self,
+        ml_svc: 'ModelInferenceService',
+        max_concurrency: int,
+        queue_size: int,
+        max_batch_size: int,
+        max_wait_ms: float,
+        timeout: float | None = None,
+        latency_window: int = 10_000
+    ) -> None:
+        """
+        Inicializa la fachada sobre un servicio de inferencia con el modelo cargado.
+
+        Args:
+            ml_svc (ModelInferenceService): Servicio que evalúa los lotes.
+            max_concurrency (int): Número máximo de lotes evaluándose a la vez, que es
+                también el número de hilos del pool.
+            queue_size (int): Número máximo de peticiones esperando en la cola.
+            max_batch_size (int): Número máximo de filas agrupadas en una llamada.
+            max_wait_ms (float): Espera máxima en milisegundos para completar un lote.
+            timeout (float | None): Tiempo máximo por petición en segundos, incluida la
+                espera en la cola. Si es None las peticiones esperan sin límite.
+            latency_window (int): Número de latencias recientes para los percentiles.
+        """
+        self.ml_svc = ml_svc
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self.stats = BatchingStats(latency_window)
+        self._executor = ThreadPoolExecutor(
+            max_concurrency, thread_name_prefix='async-inference'
+        )
+        # La cola, el semáforo y las tareas pertenecen al bucle en el que se crean
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._batches: set[asyncio.Task] = set()  # Lotes en curso
+        # Lote que la tarea de agrupación está completando o esperando lanzar
+        self._pending: list = list()
+        self._closed = False
+
+    async def predict(
+        self,
+        rows: 'np.ndarray | pd.DataFrame',
+        model_id: str | None = None,
+        timeout: float | None = None
+    ) -> np.ndarray:
+        """
+        Encola un bloque de filas y espera sus predicciones sin bloquear el bucle.
+
+        Args:
+            rows (np.ndarray | pd.DataFrame): Matriz 2-D con las columnas de
+                `features_prediction`.
+            model_id (str | None): Modelo del registro, o None para el modelo por defecto.
+            timeout (float | None): Tiempo máximo en segundos. Si es None se usa el
+                configurado en la fachada.
+
+        Returns:
+            np.ndarray: Predicciones del bloque.
+
+        Raises:
+            ValueError: Si las columnas no coinciden con `features_prediction`.
+            TimeoutError: Si la petición no se resuelve a tiempo.
+            RuntimeError: Si la fachada está cerrada.
+        """
+        if self._closed:
+            raise RuntimeError('La inferencia asíncrona está cerrada')
+        # Se valida antes de encolar para que una petición inválida no afecte al lote
+        matrix = self.ml_svc.to_matrix(rows)
+        self._start()
+        return await asyncio.wait_for(
+            self._submit(matrix, model_id),
+            timeout if timeout is not None else self.timeout
+        )
+
+    def metrics(self) -> dict:
+        """
+        Devuelve las estadísticas de la fachada.
+
+        Returns:
+            dict: Latencias, histograma de tamaños de lote y peticiones en cola.
+        """
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return {**self.stats.snapshot(), 'queued': queued}
+
+    async def aclose(self) -> None:
+        """
+        Detiene la tarea de agrupación y espera a los lotes en curso. Las peticiones
+        que siguen en la cola o en un lote sin lanzar fallan con `RuntimeError`, y
+        las nuevas se rechazan.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+
+        pending = self._pending
+        self._pending = list()
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future, _, _ in pending:
+            self._reject(future)
+
+        # Los lotes en curso terminan antes de cerrar el pool
+        await asyncio.gather(*self._batches)
+        self._executor.shutdown()
+        logger.info(f'Inferencia asíncrona detenida, {len(pending)} peticiones canceladas')
+
+    def _start(self) -> None:
+        """Crea la cola y la tarea de agrupación en el bucle en ejecución."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._dispatcher is not None:
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue(self.queue_size)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._dispatcher = loop.create_task(self._dispatch(), name='async-inference')
+        logger.info(
+            f'Iniciando inferencia asíncrona (max_concurrency={self.max_concurrency}, '
+            f'queue_size={self.queue_size}, max_batch_size={self.max_batch_size})'
+        )
+
+    async def _submit(self, matrix: np.ndarray, model_id: str | None) -> np.ndarray:
+        """Encola una petición, esperando si la cola está llena, y espera su resultado."""
+        future = self._loop.create_future()
+        await self._queue.put((matrix, future, time.perf_counter(), model_id))
+        # Una petición que esperaba sitio en la cola mientras se cerraba la fachada
+        # ya no se va a evaluar
+        if self._closed:
+            self._reject(future)
+        return await future
+
+    @staticmethod
+    def _reject(future: asyncio.Future) -> None:
+        """Hace fallar una petición pendiente porque la fachada se ha cerrado."""
+        if not future.done():
+            future.set_exception(RuntimeError('La inferencia asíncrona se ha cerrado'))
+
+    async def _dispatch(self) -> None:
+        """Tarea del bucle: acumula peticiones en lotes y los lanza al pool de hilos."""
+        while True:
+            item = await self._queue.get()
+            # El lote queda visible para que `aclose` resuelva sus peticiones
+            batch = self._pending = [item]
+            n_rows = len(item[0])
+            deadline = self._loop.time() + self.max_wait
+            while n_rows < self.max_batch_size:
+                item = await self._next(deadline - self._loop.time())
+                if item is None:
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+
+            # Sin hilos libres se deja de vaciar la cola, que así se llena y frena
+            # a los llamantes
+            await self._slots.acquire()
+            task = self._loop.create_task(self._process(batch, n_rows))
+            self._pending = list()
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _next(self, remaining: float) -> tuple | None:
+        """
+        Devuelve la siguiente petición de la cola, o None si no llega ninguna en
+        `remaining` segundos.
+        """
+        try:
+            return self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            if remaining <= 0:
+                return None
+
+        # Se cancela la espera explícitamente para no perder una petición que llegue
+        # justo al agotarse el tiempo
+        getter = asyncio.ensure_future(self._queue.get())
+        done, _ = await asyncio.wait({getter}, timeout=remaining)
+        if done:
+            return getter.result()
+        getter.cancel()
+        try:
+            return await getter
+        except asyncio.CancelledError:
+            return None
+
+    async def _process(self, batch: list, n_rows: int) -> None:
+        """
+        Evalúa un lote en el pool de hilos y reparte las predicciones entre sus
+        peticiones. Las peticiones se agrupan por modelo y cada grupo se evalúa con
+        una única llamada.
+
+        Args:
+            batch (list): Peticiones del lote como tuplas (filas, futuro, instante, modelo).
+            n_rows (int): Número total de filas del lote.
+        """
+        try:
+            groups = dict()
+            for item in batch:
+                # Las peticiones que ya agotaron su tiempo no se evalúan
+                if not item[1].done():
+                    groups.setdefault(item[3], list()).append(item)
+
+            latencies = list()
+            for model_id, group in groups.items():
+                matrix = np.concatenate([rows for rows, _, _, _ in group])
+                try:
+                    predictions = await self._loop.run_in_executor(
+                        self._executor, self._predict, matrix, model_id
+                    )
+                except Exception as e:
+                    logger.error(f'Error al evaluar el lote asíncrono: {e}')
+                    for _, future, _, _ in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                offset = 0
+                for rows, future, submitted, _ in group:
+                    if not future.done():
+                        future.set_result(predictions[offset:offset + len(rows)])
+                    latencies.append(time.perf_counter() - submitted)
+                    offset += len(rows)
+            self.stats.record(latencies, n_rows)
+        finally:
+            self._slots.release()
+
+    def _predict(self, matrix: np.ndarray, model_id: str | None) -> np.ndarray:
+        """Evalúa una matriz ya validada en un hilo del pool."""
+        return self.ml_svc.predict_batch(matrix, model_id=model_id)
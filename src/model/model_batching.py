@@ -0,0 +1,248 @@
+import queue
+import threading
+import time
+import numpy as np
+from collections import Counter, deque
+from concurrent.futures import Future
+from model.model_inference import ModelInferenceService
+from loguru import logger
+
+
+class BatchingStats:
+    """
+    Estadísticas de latencia y tamaño de lote del micro-batching.
+
+    Atributos:
+        requests (int): Número de peticiones atendidas.
+        batches (int): Número de micro-lotes evaluados.
+    """
+
+    def __init__(self, latency_window: int) -> None:
+        """
+        Inicializa las estadísticas vacías.
+
+        Args:
+            latency_window (int): Número de latencias recientes que se conservan para
+                calcular los percentiles.
+        """
+        self.requests = 0
+        self.batches = 0
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self._batch_sizes: Counter[int] = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, latencies: list[float], batch_size: int) -> None:
+        """
+        Registra las latencias de las peticiones de un micro-lote y su tamaño en filas.
+
+        Args:
+            latencies (list[float]): Latencias en segundos de cada petición del lote.
+            batch_size (int): Número de filas evaluadas en el lote.
+        """
+        with self._lock:
+            self.requests += len(latencies)
+            self.batches += 1
+            self._latencies.extend(latencies)
+            self._batch_sizes[batch_size] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Devuelve una copia de las estadísticas actuales.
+
+        Returns:
+            dict: Percentiles p50/p99 de latencia en milisegundos e histograma de
+                tamaños de lote.
+        """
+        with self._lock:
+            latencies = np.array(self._latencies, dtype=np.float64)
+            batch_sizes = dict(sorted(self._batch_sizes.items()))
+            requests, batches = self.requests, self.batches
+
+        latency_ms = dict.fromkeys(['p50', 'p99', 'mean'], 0.0)
+        if latencies.size:
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+            latency_ms = {'p50': p50, 'p99': p99, 'mean': latencies.mean() * 1000}
+
+        return {
+            'requests': requests,
+            'batches': batches,
+            'latency_ms': {key: round(float(value), 3) for key, value in latency_ms.items()},
+            'batch_size_histogram': batch_sizes,
+        }
+
+
+class MicroBatcher:
+    """
+    Agrupa peticiones concurrentes en micro-lotes evaluados con una única llamada
+    a `ModelInferenceService.predict_batch`.
+
+    Un hilo en segundo plano toma la primera petición de la cola y espera como máximo
+    `max_wait_ms` a que lleguen más, hasta acumular `max_batch_size` filas.
+
+    Métodos:
+        start: Arranca el hilo que evalúa los micro-lotes.
+        stop: Detiene el hilo tras evaluar las peticiones pendientes.
+        submit: Encola un bloque de filas y devuelve un `Future` con sus predicciones.
+        predict: Encola un bloque de filas y espera sus predicciones.
+        activate: Sustituye el modelo por defecto del servicio.
+        metrics: Devuelve las estadísticas de latencia, de lotes y de la caché.
+    """
+
+    def __init__(
+        self,
+        ml_svc: ModelInferenceService,
+        max_batch_size: int,
+        max_wait_ms: float,
+        latency_window: int = 10_000
+    ) -> None:
+        """
+        Inicializa el agrupador sobre un servicio de inferencia con el modelo cargado.
+
+        Args:
+            ml_svc (ModelInferenceService): Servicio compartido por todas las peticiones.
+            max_batch_size (int): Número máximo de filas por micro-lote.
+            max_wait_ms (float): Espera máxima en milisegundos para completar un lote.
+            latency_window (int): Número de latencias recientes para los percentiles.
+        """
+        self.ml_svc = ml_svc
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = BatchingStats(latency_window)
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+
+    def start(self) -> None:
+        """Arranca el hilo que evalúa los micro-lotes."""
+        logger.info(
+            f'Iniciando micro-batching (max_batch_size={self.max_batch_size}, '
+            f'max_wait_ms={self.max_wait * 1000:g})'
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Detiene el hilo tras evaluar las peticiones que ya estaban en la cola."""
+        self._queue.put(None)
+        self._thread.join()
+        logger.info('Micro-batching detenido')
+
+    def submit(self, rows: np.ndarray, model_id: str | None = None) -> Future:
+        """
+        Encola un bloque de filas para evaluarlo en el siguiente micro-lote.
+
+        Args:
+            rows (np.ndarray): Matriz 2-D con las columnas de `features_prediction`.
+            model_id (str | None): Modelo del registro, o None para el modelo por defecto.
+
+        Returns:
+            Future: Futuro que se resuelve con las predicciones del bloque.
+
+        Raises:
+            ValueError: Si las columnas no coinciden con `features_prediction`.
+        """
+        # Se valida antes de encolar para que una petición inválida no afecte al lote
+        rows = self.ml_svc.to_matrix(rows)
+        future: Future = Future()
+        self._queue.put((rows, future, time.perf_counter(), model_id))
+        return future
+
+    def predict(
+        self,
+        rows: np.ndarray,
+        timeout: float | None = None,
+        model_id: str | None = None
+    ) -> np.ndarray:
+        """
+        Encola un bloque de filas y espera sus predicciones.
+
+        Args:
+            rows (np.ndarray): Matriz 2-D con las columnas de `features_prediction`.
+            timeout (float | None): Tiempo máximo de espera en segundos.
+            model_id (str | None): Modelo del registro, o None para el modelo por defecto.
+
+        Returns:
+            np.ndarray: Predicciones del bloque.
+        """
+        return self.submit(rows, model_id).result(timeout=timeout)
+
+    def activate(self, model_id: str) -> str:
+        """
+        Sustituye el modelo por defecto del servicio sin interrumpir los lotes en curso.
+
+        Args:
+            model_id (str): 'nombre' (versión activa) o 'nombre@versión'.
+
+        Returns:
+            str: Identificador 'nombre@versión' del modelo activado.
+        """
+        return self.ml_svc.activate(model_id)
+
+    def metrics(self) -> dict:
+        """
+        Devuelve las estadísticas del micro-batching y, si está activada, de la caché
+        de predicciones.
+
+        Returns:
+            dict: Latencias, histograma de tamaños de lote y caché de predicciones.
+        """
+        metrics = self.stats.snapshot()
+        if self.ml_svc.predictions is not None:
+            metrics['prediction_cache'] = self.ml_svc.predictions.stats()
+        return metrics
+
+    def _run(self) -> None:
+        """Bucle del hilo: acumula peticiones en micro-lotes y las evalúa."""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            n_rows = len(item[0])
+            deadline = time.perf_counter() + self.max_wait
+            while n_rows < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+
+            self._process(batch, n_rows)
+
+    def _process(self, batch: list, n_rows: int) -> None:
+        """
+        Evalúa un micro-lote y reparte las predicciones entre sus peticiones. Las
+        peticiones se agrupan por modelo y cada grupo se evalúa con una única llamada.
+
+        Args:
+            batch (list): Peticiones del lote como tuplas (filas, futuro, instante, modelo).
+            n_rows (int): Número total de filas del lote.
+        """
+        groups = dict()
+        for item in batch:
+            groups.setdefault(item[3], list()).append(item)
+
+        latencies = list()
+        for model_id, group in groups.items():
+            try:
+                matrix = np.concatenate([rows for rows, _, _, _ in group])
+                predictions = self.ml_svc.predict_batch(matrix, model_id=model_id)
+            except Exception as e:
+                logger.error(f'Error al evaluar el micro-lote: {e}')
+                for _, future, _, _ in group:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for rows, future, submitted, _ in group:
+                future.set_result(predictions[offset:offset + len(rows)])
+                latencies.append(time.perf_counter() - submitted)
+                offset += len(rows)
+        self.stats.record(latencies, n_rows)
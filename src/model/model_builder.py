@@ -1,10 +1,6 @@
-from model.pipeline.model import build_model
-from config.model_settings import ModelSettings
+from config.model_settings import get_model_settings
 from loguru import logger
 
-# Instancia de configuraciones para el modelo y las características
-model_settings = ModelSettings()  # type: ignore
-
 
 class ModelBuilderService:
     """
@@ -19,15 +15,25 @@ class ModelBuilderService:
 
     def __init__(self) -> None:
         """Inicializa el servicio del modelo, sin cargar el modelo en esta etapa."""
+        model_settings = get_model_settings()
         self.model_dir = model_settings.model_dir
         self.model_name = model_settings.model_name
 
     def train_model(self):
         """
-        Entrenar el modelo desde la ruta especificada y guardarlo.
+        Entrenar el modelo desde la ruta especificada y guardarlo. Con
+        `training_mode='incremental'` se amplía el modelo registrado con las filas
+        nuevas en lugar de reconstruirlo.
         """
+        # La pipeline importa pandas, scikit-learn y SQLAlchemy: se carga al entrenar
+        from model.pipeline.model import build_model, update_model
+
+        model_settings = get_model_settings()
         model_path = model_settings.model_path
         logger.info(
             f'Comprobando la existencia del archivo del modelo en la ruta: {model_path}'
         )
-        build_model()
+        if model_settings.training_mode == 'incremental':
+            update_model()
+        else:
+            build_model()
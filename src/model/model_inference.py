@@ -1,14 +1,24 @@
 import pickle
-import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from config.model_settings import ModelSettings
-from config.features_settings import FeaturesSettings
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+from model.pipeline.artifact import FlatForest
+from model.pipeline.feature_index import KEYS_FILE, FeatureIndex
+from model.model_registry import ModelCache, ModelRegistry
+from model.model_prediction_cache import PredictionCache
+from model.model_monitor import DriftMonitor
+from model.instrumentation import timed, timer
+from config.model_settings import get_model_settings
+from config.features_settings import get_features_settings
+from config.logger_settings import get_request_log
 from loguru import logger
 
-# Instancia de configuraciones para el modelo y las características
-model_settings = ModelSettings()  # type: ignore
-features_settings = FeaturesSettings()
+# pandas y scikit-learn sólo se importan al usarse: el motor compilado no los necesita
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.ensemble import RandomForestRegressor
+    from model.model_async import AsyncPredictor
 
 
 class ModelInferenceService:
@@ -20,19 +30,100 @@ class ModelInferenceService:
         load_model: Carga el modelo desde un archivo, construyéndolo si no existe.
         predict: Realiza predicciones usando el modelo cargado, dado un conjunto
         de características.
+        predict_batch: Realiza predicciones sobre una matriz completa de características.
+        predict_stream: Realiza predicciones sobre un iterador de bloques de filas.
+        predict_addresses: Realiza predicciones por dirección con el índice de
+        características.
+        apredict: Versión asíncrona de `predict` para aplicaciones asyncio.
+        apredict_batch: Versión asíncrona de `predict_batch` para aplicaciones asyncio.
+        aclose: Detiene la inferencia asíncrona de `apredict`.
+        to_matrix: Valida y convierte los datos de entrada en una matriz float32.
+        feature_index: Devuelve el índice de características por dirección.
+        get_model: Devuelve el modelo por defecto o una versión del registro.
+        activate: Sustituye el modelo por defecto por una versión del registro.
     """
 
     def __init__(self) -> None:
         """Inicializa el servicio del modelo, sin cargar el modelo en esta etapa."""
-        self.model: RandomForestRegressor  # Inicializa el modelo sin asignarlo
+        model_settings = get_model_settings()
+        # Modelo por defecto y su versión, sustituidos juntos en una sola asignación
+        self._default: tuple['RandomForestRegressor | FlatForest', str] | None = None
         self.model_dir = model_settings.model_dir
         self.model_name = model_settings.model_name
+        self.registry = ModelRegistry(model_settings.registry_path)
+        self.models = ModelCache(
+            model_settings.model_cache_size,
+            model_settings.model_cache_max_bytes
+        )
+        self.predictions = None
+        if model_settings.prediction_cache_size > 0:
+            self.predictions = PredictionCache(
+                model_settings.prediction_cache_size,
+                model_settings.prediction_cache_ttl
+            )
+        # Monitor del modelo por defecto y versión cuyo perfil de referencia usa,
+        # sustituidos juntos al cargar o activar otro modelo
+        self._monitored: tuple[DriftMonitor, str] | None = None
+        # Índice de características por dirección y versión de sus claves
+        self._index: tuple[FeatureIndex, int] | None = None
+        # Mensajes por predicción con el nivel y el muestreo de la configuración
+        self.request_log = get_request_log()
+        # Fachada asíncrona, creada en la primera llamada a `apredict`
+        self._async: 'AsyncPredictor | None' = None
+
+    @property
+    def model(self) -> 'RandomForestRegressor | FlatForest | None':
+        """Devuelve el modelo por defecto, o None si no está cargado."""
+        default = self._default
+        return default[0] if default else None
+
+    @property
+    def model_version(self) -> str | None:
+        """Devuelve la versión del modelo por defecto, o None si no está cargado."""
+        default = self._default
+        return default[1] if default else None
 
+    @property
+    def monitor(self) -> DriftMonitor | None:
+        """Devuelve el monitor del modelo por defecto, o None si no está activado."""
+        monitored = self._monitored
+        return monitored[0] if monitored else None
+
+    @timed('inference.load_model')
     def load_model(self):
         """
         Carga el modelo desde el archivo especificado en las configuraciones.
         Si el archivo del modelo no existe, intenta construirlo y luego cargarlo.
+
+        Con `inference_engine='compiled'` se mapea en memoria el bosque compilado,
+        recurriendo al pickle si el artefacto no existe.
+
+        Raises:
+            FileNotFoundError: Si el modelo no existe.
+            ValueError: Si el bosque compilado no usa las columnas de
+                `features_prediction` en el mismo orden.
         """
+        model_settings = get_model_settings()
+        if model_settings.inference_engine == 'compiled':
+            forest_path = model_settings.forest_path
+            if forest_path.exists():
+                forest = FlatForest.load(forest_path, mmap_mode='r')
+                # El bosque evalúa las columnas por posición: un orden distinto no
+                # fallaría al predecir, sólo daría resultados erróneos
+                features = get_features_settings().features_prediction
+                if forest.feature_names != features:
+                    raise ValueError(
+                        f'El bosque compilado {forest_path} usa otras características: '
+                        f'{forest.feature_names}'
+                    )
+                self._default = (forest, artifact_version(forest_path))
+                self._watch(self._default[1], model_settings.monitor_profile_path)
+                logger.info(f'Bosque compilado mapeado en memoria desde: {forest_path}')
+                return
+            logger.warning(
+                f'No existe el artefacto {forest_path}, se carga el modelo desde el pickle'
+            )
+
         model_path = model_settings.model_path
         logger.info(
             f'Comprobando la existencia del archivo del modelo en la ruta: {model_path}'
@@ -43,11 +134,13 @@ class ModelInferenceService:
 
         if model_path.exists():
             with model_path.open('rb') as file:
-                self.model = pickle.load(file)
+                self._default = (pickle.load(file), artifact_version(model_path))
+                self._watch(self._default[1], model_settings.monitor_profile_path)
                 logger.info('Modelo cargado exitosamente.')
         else:
             logger.error('No se pudo encontrar ni construir el modelo.')
 
+    @timed('inference.predict')
     def predict(self, features: list) -> np.ndarray:
         """
         Realiza una predicción con el modelo cargado, dado un conjunto de características.
@@ -59,15 +152,458 @@ class ModelInferenceService:
             np.ndarray: Array de numpy con los resultados de la predicción.
                         Devuelve un array vacío si el modelo no está cargado.
         """
-        features_df = pd.DataFrame(
-            data=[features],
-            columns=features_settings.features_prediction
-        )
-        logger.info('Haciendo predicción del modelo')
+        self.request_log('Haciendo predicción del modelo')
 
-        if self.model:
-            prediction = self.model.predict(features_df)
-            return np.array(prediction)
+        model, version = self._resolve(None)
+        if model:
+            return self._predict_rows(model, version, self.to_matrix([features]))
         else:
             logger.error('El modelo no está cargado. No se puede hacer la predicción.')
             return np.array([])  # Array vacío en caso de error
+
+    @timed('inference.predict_batch')
+    def predict_batch(
+        self,
+        features: 'np.ndarray | pd.DataFrame',
+        out: np.ndarray | None = None,
+        model_id: str | None = None
+    ) -> np.ndarray:
+        """
+        Realiza predicciones sobre una matriz completa de características.
+
+        El orden de las columnas se valida una sola vez y el modelo se evalúa en
+        bloques de `predict_chunk_size` filas que se escriben en un único array
+        de salida preasignado. Con la caché de predicciones activada sólo se
+        evalúan las filas que no están en caché.
+
+        Args:
+            features (np.ndarray | pd.DataFrame): Matriz 2-D con una fila por
+                observación y las columnas de `features_prediction`.
+            out (np.ndarray | None): Array de salida opcional donde escribir las
+                predicciones. Debe tener una posición por fila.
+            model_id (str | None): Modelo del registro ('nombre' o 'nombre@versión').
+                Si es None se usa el modelo por defecto.
+
+        Returns:
+            np.ndarray: Array de numpy con una predicción por fila.
+                        Devuelve un array vacío si el modelo no está cargado.
+
+        Raises:
+            ValueError: Si las columnas o el array de salida no son válidos.
+        """
+        # El modelo se resuelve una vez: todo el lote usa la misma versión aunque
+        # otra petición active una nueva mientras tanto
+        model, version = self._resolve(model_id)
+        if not model:
+            logger.error('El modelo no está cargado. No se puede hacer la predicción.')
+            return np.array([])  # Array vacío en caso de error
+
+        matrix = self.to_matrix(features)
+        n_rows = matrix.shape[0]
+
+        if out is None:
+            out = np.empty(n_rows, dtype=np.float64)
+        elif out.shape != (n_rows,):
+            raise ValueError(
+                f'El array de salida debe tener forma ({n_rows},), recibido {out.shape}'
+            )
+
+        self.request_log('Haciendo predicción por lotes de {} filas', n_rows)
+        return self._predict_rows(model, version, matrix, out)
+
+    def predict_addresses(
+        self,
+        addresses: list[str],
+        model_id: str | None = None
+    ) -> np.ndarray:
+        """
+        Realiza predicciones por dirección con las características precalculadas del
+        índice, extraídas con un único `take` y evaluadas en bloque, sin consultar
+        la base de datos ni repetir la preparación.
+
+        Args:
+            addresses (list[str]): Direcciones de los anuncios.
+            model_id (str | None): Modelo del registro ('nombre' o 'nombre@versión').
+                Si es None se usa el modelo por defecto.
+
+        Returns:
+            np.ndarray: Array de numpy con una predicción por dirección.
+                        Devuelve un array vacío si el modelo no está cargado.
+
+        Raises:
+            FileNotFoundError: Si el índice no existe.
+            KeyError: Si alguna dirección no está en el índice.
+        """
+        model, version = self._resolve(model_id)
+        if not model:
+            logger.error('El modelo no está cargado. No se puede hacer la predicción.')
+            return np.array([])
+
+        with timer('inference.index_take'):
+            matrix = self.feature_index().take(addresses)
+        self.request_log('Haciendo predicción de {} direcciones', len(addresses))
+        return self._predict_rows(model, version, matrix)
+
+    def predict_stream(
+        self,
+        chunks: 'Iterable[np.ndarray | pd.DataFrame]',
+        model_id: str | None = None
+    ) -> Iterator[np.ndarray]:
+        """
+        Realiza predicciones sobre un iterador de bloques de filas, devolviendo
+        las predicciones de cada bloque a medida que se calculan.
+
+        Args:
+            chunks (Iterable[np.ndarray | pd.DataFrame]): Bloques de filas con las
+                columnas de `features_prediction`.
+            model_id (str | None): Modelo del registro, o None para el modelo por defecto.
+
+        Yields:
+            np.ndarray: Predicciones correspondientes a cada bloque.
+        """
+        for chunk in chunks:
+            yield self.predict_batch(chunk, model_id=model_id)
+
+    async def apredict(self, features: list, model_id: str | None = None) -> np.ndarray:
+        """
+        Versión asíncrona de `predict`: las llamadas concurrentes se agrupan en una
+        única evaluación del modelo, que se ejecuta fuera del bucle de eventos.
+
+        Args:
+            features (list): Lista de características para hacer la predicción.
+            model_id (str | None): Modelo del registro, o None para el modelo por defecto.
+
+        Returns:
+            np.ndarray: Array de numpy con el resultado de la predicción.
+
+        Raises:
+            TimeoutError: Si la predicción no termina en `async_timeout` segundos.
+        """
+        return await self.apredict_batch([features], model_id=model_id)
+
+    async def apredict_batch(
+        self,
+        features: 'np.ndarray | pd.DataFrame',
+        model_id: str | None = None
+    ) -> np.ndarray:
+        """
+        Versión asíncrona de `predict_batch`, con la concurrencia, la cola y el tiempo
+        máximo de los atributos `async_*` de la configuración.
+
+        Args:
+            features (np.ndarray | pd.DataFrame): Matriz 2-D con las columnas de
+                `features_prediction`.
+            model_id (str | None): Modelo del registro, o None para el modelo por defecto.
+
+        Returns:
+            np.ndarray: Array de numpy con una predicción por fila.
+
+        Raises:
+            ValueError: Si las columnas no coinciden con `features_prediction`.
+            TimeoutError: Si la predicción no termina en `async_timeout` segundos.
+        """
+        if self._async is None:
+            from model.model_async import AsyncPredictor
+
+            model_settings = get_model_settings()
+            self._async = AsyncPredictor(
+                self,
+                max_concurrency=model_settings.async_max_concurrency,
+                queue_size=model_settings.async_queue_size,
+                max_batch_size=model_settings.async_max_batch_size,
+                max_wait_ms=model_settings.async_max_wait_ms,
+                timeout=model_settings.async_timeout
+            )
+        return await self._async.predict(features, model_id=model_id)
+
+    async def aclose(self) -> None:
+        """
+        Detiene la inferencia asíncrona, si se ha iniciado. Las peticiones pendientes
+        fallan con `RuntimeError` y una nueva llamada a `apredict` la vuelve a crear.
+        """
+        predictor, self._async = self._async, None
+        if predictor is not None:
+            await predictor.aclose()
+
+    @timed('inference.to_matrix')
+    def to_matrix(self, features: 'np.ndarray | pd.DataFrame') -> np.ndarray:
+        """
+        Valida las columnas de entrada contra `features_prediction` y las convierte
+        en una matriz float32 contigua, el tipo que usan internamente los árboles.
+
+        Args:
+            features (np.ndarray | pd.DataFrame): Datos de entrada.
+
+        Returns:
+            np.ndarray: Matriz 2-D de tipo float32.
+
+        Raises:
+            ValueError: Si las columnas no coinciden con `features_prediction`.
+        """
+        columns = get_features_settings().features_prediction
+
+        # DataFrame de pandas: se comprueba sin importar pandas para las matrices
+        if hasattr(features, 'columns'):
+            if list(features.columns) != columns:
+                missing = set(columns) - set(features.columns)
+                if missing:
+                    raise ValueError(f'Faltan columnas para la predicción: {missing}')
+                features = features[columns]  # Reordena las columnas una sola vez
+            return features.to_numpy(dtype=np.float32)
+
+        matrix = np.ascontiguousarray(features, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != len(columns):
+            raise ValueError(
+                f'Se esperaba una matriz 2-D con {len(columns)} columnas, '
+                f'recibido {matrix.shape}'
+            )
+        return matrix
+
+    def feature_index(self) -> FeatureIndex:
+        """
+        Devuelve el índice de características por dirección, cargándolo en el primer
+        uso y de nuevo cuando una actualización sustituye sus claves.
+
+        Returns:
+            FeatureIndex: Índice mapeado en memoria en sólo lectura.
+
+        Raises:
+            FileNotFoundError: Si el índice no existe.
+            ValueError: Si sus columnas no coinciden con `features_prediction`.
+        """
+        index_path = get_model_settings().feature_index_path
+        try:
+            mtime = (index_path / KEYS_FILE).stat().st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                f'No existe el índice de características {index_path}'
+            ) from None
+
+        current = self._index
+        if current is None or current[1] != mtime:
+            index = FeatureIndex.load(index_path)
+            if index.feature_names != get_features_settings().features_prediction:
+                raise ValueError('Las columnas del índice de características no coinciden '
+                                 'con features_prediction')
+            current = self._index = (index, mtime)
+            logger.info(f'Índice de características cargado: {len(index)} direcciones')
+        return current[0]
+
+    def get_model(self, model_id: str | None = None) -> 'RandomForestRegressor | FlatForest':
+        """
+        Devuelve el modelo por defecto o una versión del registro, que se mantiene en
+        la caché LRU de modelos residentes.
+
+        Args:
+            model_id (str | None): 'nombre' (versión activa), 'nombre@versión' o None
+                para el modelo por defecto.
+
+        Returns:
+            RandomForestRegressor | FlatForest: Modelo cargado, o None si no hay
+                modelo por defecto cargado.
+
+        Raises:
+            FileNotFoundError: Si el modelo o la versión no están registrados.
+            ValueError: Si el modelo usa otras características que la configuración.
+        """
+        return self._resolve(model_id)[0]
+
+    def activate(self, model_id: str) -> str:
+        """
+        Sustituye el modelo por defecto por una versión del registro. El nuevo modelo
+        se carga por completo antes de sustituir al anterior, y las predicciones en
+        curso terminan con el modelo que ya tenían. El monitor se reinicia con el
+        perfil de referencia guardado en la versión.
+
+        Args:
+            model_id (str): 'nombre' (versión activa) o 'nombre@versión'.
+
+        Returns:
+            str: Identificador 'nombre@versión' del modelo activado.
+        """
+        model, version = self._resolve(model_id)
+        self._watch(version, self.registry.profile_path(*version.split('@')))
+        self._default = (model, version)
+        logger.info(f'Modelo por defecto sustituido por {version}')
+        return version
+
+    def _resolve(self, model_id: str | None) -> tuple:
+        """
+        Devuelve a la vez un modelo y su versión, que identifica sus predicciones en
+        la caché.
+
+        Args:
+            model_id (str | None): Modelo del registro, o None para el modelo por defecto.
+
+        Returns:
+            tuple: El modelo y su versión, o (None, None) si no hay modelo por defecto.
+        """
+        if model_id is None:
+            return self._default or (None, None)
+
+        name, version = self.registry.resolve(model_id)
+        engine = get_model_settings().inference_engine
+        key = f'{name}@{version}'
+        return self.models.get(key, lambda: self._load_registered(name, version, engine)), key
+
+    def _predict_rows(
+        self,
+        model: 'RandomForestRegressor | FlatForest',
+        version: str,
+        matrix: np.ndarray,
+        out: np.ndarray | None = None
+    ) -> np.ndarray:
+        """
+        Evalúa una matriz validada consultando antes la caché de predicciones, si
+        está activada, de modo que al modelo sólo llegan las filas que faltan. Con
+        el monitor activado, las filas evaluadas con el modelo por defecto y sus
+        predicciones se añaden a sus estadísticas; las de otros modelos del registro
+        no se comparan con su perfil.
+
+        Args:
+            model (RandomForestRegressor | FlatForest): Modelo a evaluar.
+            version (str): Versión del modelo.
+            matrix (np.ndarray): Matriz float32 con las columnas en orden.
+            out (np.ndarray | None): Array de salida con una posición por fila.
+
+        Returns:
+            np.ndarray: Predicción de cada fila.
+        """
+        if out is None:
+            out = np.empty(matrix.shape[0], dtype=np.float64)
+
+        if self.predictions is None:
+            self._predict_chunks(model, matrix, out)
+        else:
+            self._predict_cached(model, version, matrix, out)
+
+        monitored = self._monitored
+        if monitored is not None and monitored[1] == version:
+            with timer('inference.monitor'):
+                monitored[0].update(matrix, out)
+        return out
+
+    def _watch(self, version: str, profile_path: Path) -> None:
+        """
+        Sustituye el monitor por uno nuevo con el perfil de referencia del modelo
+        por defecto, si el monitor está activado.
+
+        Args:
+            version (str): Versión del modelo por defecto.
+            profile_path (Path): Perfil de referencia de esa versión.
+        """
+        if not get_model_settings().monitor_enabled:
+            return
+        monitor = load_monitor(profile_path)
+        self._monitored = (monitor, version) if monitor is not None else None
+
+    def _predict_cached(
+        self,
+        model: 'RandomForestRegressor | FlatForest',
+        version: str,
+        matrix: np.ndarray,
+        out: np.ndarray
+    ) -> None:
+        """Evalúa sólo las filas que no están en la caché de predicciones."""
+        with timer('inference.cache_lookup'):
+            missing = self.predictions.lookup(version, matrix, out)
+        if missing.size:
+            # Los vectores repetidos dentro del lote se evalúan una sola vez
+            misses, inverse = np.unique(matrix[missing], axis=0, return_inverse=True)
+            predictions = np.empty(len(misses), dtype=np.float64)
+            self._predict_chunks(model, misses, predictions)
+            out[missing] = predictions[inverse.reshape(-1)]
+            self.predictions.store(version, misses, predictions)
+
+    def _predict_chunks(
+        self,
+        model: 'RandomForestRegressor | FlatForest',
+        matrix: np.ndarray,
+        out: np.ndarray
+    ) -> None:
+        """Evalúa el modelo en bloques de `predict_chunk_size` filas escritos en `out`."""
+        chunk_size = get_model_settings().predict_chunk_size
+        for start in range(0, matrix.shape[0], chunk_size):
+            stop = min(start + chunk_size, matrix.shape[0])
+            out[start:stop] = self._predict_matrix(model, matrix[start:stop])
+
+    def _load_registered(self, name: str, version: str, engine: str) -> tuple:
+        """
+        Carga una versión del registro comprobando que usa las características
+        configuradas.
+
+        Returns:
+            tuple: El modelo cargado y su tamaño estimado en bytes.
+        """
+        features = self.registry.metadata(name, version)['features']
+        if features != get_features_settings().features_prediction:
+            raise ValueError(
+                f'El modelo {name}@{version} usa otras características: {features}'
+            )
+        return self.registry.load(name, version, engine)
+
+    def _predict_matrix(
+        self,
+        model: 'RandomForestRegressor | FlatForest',
+        matrix: np.ndarray
+    ) -> np.ndarray:
+        """
+        Evalúa un modelo sobre un bloque ya validado de la matriz de características.
+
+        Args:
+            model (RandomForestRegressor | FlatForest): Modelo a evaluar.
+            matrix (np.ndarray): Bloque float32 con las columnas en orden.
+
+        Returns:
+            np.ndarray: Predicciones del bloque.
+        """
+        if isinstance(model, FlatForest):
+            with timer('inference.model_predict'):
+                return model.predict(matrix)
+
+        import pandas as pd
+
+        # El modelo se entrenó con nombres de columnas: se envuelve sin copiar
+        with timer('inference.dataframe'):
+            frame = pd.DataFrame(
+                matrix,
+                columns=get_features_settings().features_prediction,
+                copy=False
+            )
+        with timer('inference.model_predict'):
+            return model.predict(frame)
+
+
+def artifact_version(path: Path) -> str:
+    """
+    Devuelve la versión de un artefacto del modelo por defecto a partir de su fecha
+    de modificación, de modo que reconstruir el modelo cambia su versión.
+
+    Args:
+        path (Path): Ruta del pickle o del bosque compilado.
+
+    Returns:
+        str: Versión del artefacto.
+    """
+    return f'{path.name}@{path.stat().st_mtime_ns}'
+
+
+def load_monitor(profile_path: Path) -> DriftMonitor | None:
+    """
+    Crea el monitor de la inferencia con el perfil de referencia de un modelo.
+
+    Args:
+        profile_path (Path): Perfil de referencia del modelo.
+
+    Returns:
+        DriftMonitor | None: Monitor sin filas observadas, o None si el perfil no
+            existe.
+    """
+    model_settings = get_model_settings()
+    if not profile_path.exists():
+        logger.warning(f'No existe el perfil de referencia {profile_path}, '
+                       'el monitor queda desactivado')
+        return None
+    return DriftMonitor.load(
+        profile_path, model_settings.monitor_psi_threshold, model_settings.monitor_min_count
+    )
@@ -0,0 +1,265 @@
+import json
+import threading
+import numpy as np
+from pathlib import Path
+
+# Nombre de la columna de las predicciones en los perfiles
+PREDICTION_COLUMN = 'prediction'
+
+# Suavizado de las proporciones vacías en el índice de estabilidad (PSI)
+PSI_EPSILON = 1e-4
+
+# Filas procesadas a la vez al asignar los cubos, para acotar la memoria temporal
+UPDATE_BLOCK_ROWS = 1 << 14
+
+
+def build_profile(
+    matrix: np.ndarray,
+    predictions: np.ndarray,
+    columns: list[str],
+    categorical_columns: list[str],
+    bins: int = 10
+) -> dict:
+    """
+    Calcula el perfil de referencia de las características y de las predicciones
+    con el que `DriftMonitor` compara el tráfico de inferencia.
+
+    Cada columna numérica se divide en cubos por sus cuantiles (deciles con
+    `bins=10`) y cada columna categórica en sus valores 0 y 1.
+
+    Args:
+        matrix (np.ndarray): Matriz 2-D de características de referencia.
+        predictions (np.ndarray): Predicciones del modelo sobre `matrix`.
+        columns (list[str]): Nombres de las columnas de `matrix`.
+        categorical_columns (list[str]): Columnas codificadas como 0/1.
+        bins (int): Número de cubos de las columnas numéricas.
+
+    Returns:
+        dict: Número de filas y, por columna, los cortes de los cubos, la proporción
+            de filas de cada uno, la media y la desviación típica.
+    """
+    values = np.column_stack((matrix, predictions)).astype(np.float64)
+    profile = {'n_rows': len(values), 'columns': dict()}
+    for j, name in enumerate(list(columns) + [PREDICTION_COLUMN]):
+        column = values[:, j]
+        if name in categorical_columns:
+            edges = np.array([0.5])
+        else:
+            edges = np.unique(np.quantile(column, np.arange(1, bins) / bins))
+        counts = np.bincount(np.searchsorted(edges, column), minlength=len(edges) + 1)
+        profile['columns'][name] = {
+            'categorical': name in categorical_columns,
+            'edges': edges.tolist(),
+            'proportions': (counts / len(column)).tolist(),
+            'mean': float(column.mean()),
+            'std': float(column.std()),
+        }
+    return profile
+
+
+class DriftMonitor:
+    """
+    Monitor en memoria constante de la distribución de las características y de
+    las predicciones de la inferencia.
+
+    Por columna mantiene el número de filas, la media y la varianza acumuladas
+    (combinadas por lotes con el algoritmo de Chan), el mínimo, el máximo y el
+    número de filas en cada cubo del perfil de referencia. De los cubos se estiman
+    los cuantiles y el índice de estabilidad de la población (PSI) frente a la
+    referencia; las columnas con un PSI a partir de `psi_threshold` se marcan como
+    desviadas. Cada lote se procesa con operaciones vectorizadas y el estado tiene
+    un tamaño fijo, independiente del número de filas observadas.
+
+    Métodos:
+        load: Crea el monitor a partir de un perfil guardado.
+        update: Añade un lote de filas y sus predicciones.
+        snapshot: Devuelve las estadísticas y las columnas desviadas.
+        export: Escribe la instantánea en un archivo JSON.
+        reset: Descarta las filas observadas.
+    """
+
+    def __init__(
+        self,
+        baseline: dict,
+        psi_threshold: float = 0.2,
+        min_count: int = 500
+    ) -> None:
+        """
+        Inicializa el monitor.
+
+        Args:
+            baseline (dict): Perfil de referencia de `build_profile`.
+            psi_threshold (float): PSI a partir del cual una columna está desviada.
+            min_count (int): Filas observadas necesarias para marcar desviaciones.
+        """
+        self.baseline = baseline
+        self.psi_threshold = psi_threshold
+        self.min_count = min_count
+        self.columns = list(baseline['columns'])
+        profiles = list(baseline['columns'].values())
+
+        # Cortes de todas las columnas en una matriz, completada con +inf, de modo
+        # que el cubo de cada valor es el número de cortes que supera
+        self.n_bins = max(len(profile['edges']) for profile in profiles) + 1
+        self._edges = np.full((len(profiles), self.n_bins - 1), np.inf)
+        self._expected = np.zeros((len(profiles), self.n_bins))
+        for j, profile in enumerate(profiles):
+            self._edges[j, :len(profile['edges'])] = profile['edges']
+            self._expected[j, :len(profile['proportions'])] = profile['proportions']
+        self._offsets = np.arange(len(profiles)) * self.n_bins
+
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        psi_threshold: float = 0.2,
+        min_count: int = 500
+    ) -> 'DriftMonitor':
+        """
+        Crea el monitor a partir de un perfil de referencia guardado en JSON.
+
+        Args:
+            path (Path): Archivo del perfil.
+            psi_threshold (float): PSI a partir del cual una columna está desviada.
+            min_count (int): Filas observadas necesarias para marcar desviaciones.
+
+        Returns:
+            DriftMonitor: Monitor sin filas observadas.
+        """
+        return cls(json.loads(path.read_text()), psi_threshold, min_count)
+
+    def reset(self) -> None:
+        """Descarta las filas observadas."""
+        n_columns = len(self.columns)
+        with self._lock:
+            self._count = 0
+            self._mean = np.zeros(n_columns)
+            self._m2 = np.zeros(n_columns)
+            self._min = np.full(n_columns, np.inf)
+            self._max = np.full(n_columns, -np.inf)
+            self._bins = np.zeros((n_columns, self.n_bins), dtype=np.int64)
+
+    def update(self, matrix: np.ndarray, predictions: np.ndarray) -> None:
+        """
+        Añade un lote de filas y sus predicciones a las estadísticas.
+
+        Los resúmenes del lote se calculan fuera del cerrojo, que sólo se toma para
+        combinarlos con el estado acumulado.
+
+        Args:
+            matrix (np.ndarray): Matriz 2-D con las columnas de `features_prediction`.
+            predictions (np.ndarray): Predicción de cada fila.
+        """
+        values = np.column_stack((matrix, predictions)).astype(np.float64, copy=False)
+        n = len(values)
+        if not n:
+            return
+
+        mean = values.mean(axis=0)
+        m2 = ((values - mean) ** 2).sum(axis=0)
+        bins = np.zeros(len(self._offsets) * self.n_bins, dtype=np.int64)
+        for start in range(0, n, UPDATE_BLOCK_ROWS):
+            block = values[start:start + UPDATE_BLOCK_ROWS]
+            index = (block[:, :, np.newaxis] > self._edges).sum(axis=2) + self._offsets
+            bins += np.bincount(index.ravel(), minlength=len(bins))
+        low, high = values.min(axis=0), values.max(axis=0)
+
+        with self._lock:
+            total = self._count + n
+            delta = mean - self._mean
+            self._mean += delta * (n / total)
+            self._m2 += m2 + delta ** 2 * (self._count * n / total)
+            self._count = total
+            np.minimum(self._min, low, out=self._min)
+            np.maximum(self._max, high, out=self._max)
+            self._bins += bins.reshape(self._bins.shape)
+
+    def snapshot(self) -> dict:
+        """
+        Devuelve las estadísticas de cada columna frente a la referencia. El estado
+        se copia bajo el cerrojo y los cálculos se hacen después, sin bloquear
+        `update`.
+
+        Returns:
+            dict: Filas observadas, columnas desviadas y, por columna, la media, la
+                desviación típica, el mínimo, el máximo, el PSI, el desplazamiento de
+                la media en desviaciones típicas de la referencia y los cuantiles 5,
+                50 y 95 o, en las categóricas, la proporción de 'yes'.
+        """
+        with self._lock:
+            count = self._count
+            mean, m2 = self._mean.copy(), self._m2.copy()
+            low, high = self._min.copy(), self._max.copy()
+            bins = self._bins.copy()
+
+        columns = dict()
+        drifted = list()
+        for j, name in enumerate(self.columns):
+            reference = self.baseline['columns'][name]
+            stats = {'count': count}
+            if count:
+                n_edges = len(reference['edges'])
+                observed = bins[j, :n_edges + 1] / count
+                expected = self._expected[j, :n_edges + 1]
+                psi = float(np.sum(
+                    (observed - expected)
+                    * np.log((observed + PSI_EPSILON) / (expected + PSI_EPSILON))
+                ))
+                std = float(np.sqrt(m2[j] / count))
+                stats.update(
+                    mean=float(mean[j]), std=std, min=float(low[j]), max=float(high[j]),
+                    psi=psi,
+                    mean_shift=float((mean[j] - reference['mean']) / reference['std'])
+                    if reference['std'] else 0.0,
+                    drifted=count >= self.min_count and psi >= self.psi_threshold,
+                )
+                if reference['categorical']:
+                    stats['yes_rate'] = float(mean[j])
+                else:
+                    for q in (0.05, 0.5, 0.95):
+                        stats[f'p{round(q * 100):02d}'] = self._quantile(
+                            q, bins[j, :n_edges + 1], reference['edges'], low[j], high[j]
+                        )
+                if stats['drifted']:
+                    drifted.append(name)
+            columns[name] = stats
+
+        return {'count': count, 'drifted': drifted, 'columns': columns}
+
+    def export(self, path: Path) -> Path:
+        """
+        Escribe la instantánea en un archivo JSON, sustituyéndolo de forma atómica.
+
+        Args:
+            path (Path): Archivo de destino.
+
+        Returns:
+            Path: Archivo escrito.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.tmp')
+        tmp_path.write_text(json.dumps(self.snapshot(), indent=2))
+        tmp_path.replace(path)
+        return path
+
+    @staticmethod
+    def _quantile(
+        q: float,
+        counts: np.ndarray,
+        edges: list[float],
+        low: float,
+        high: float
+    ) -> float:
+        """
+        Estima un cuantil interpolando linealmente dentro del cubo que lo contiene,
+        con el mínimo y el máximo observados como límites de los cubos extremos.
+        """
+        bounds = np.concatenate(([low], np.clip(edges, low, high), [high]))
+        cumulative = np.cumsum(counts)
+        i = int(np.searchsorted(cumulative, q * cumulative[-1]))
+        before = cumulative[i - 1] if i else 0
+        fraction = (q * cumulative[-1] - before) / counts[i] if counts[i] else 0.0
+        return float(bounds[i] + (bounds[i + 1] - bounds[i]) * fraction)
@@ -0,0 +1,188 @@
+import multiprocessing
+import signal
+import time
+import numpy as np
+from concurrent.futures import Future
+from model.model_inference import ModelInferenceService
+from model.model_batching import BatchingStats
+from loguru import logger
+
+# Servicio heredado por los procesos hijos al hacer fork; sólo se asigna en el padre
+# justo antes de crear el pool
+_service: ModelInferenceService | None = None
+
+# Valores compartidos con el padre y generación del modelo por defecto vista por cada
+# proceso hijo; se asignan en `_init_worker`
+_default_model = None
+_generation = None
+_worker_generation = 0
+
+
+class InferencePool:
+    """
+    Pool pre-fork de procesos de inferencia que comparten un único modelo.
+
+    El modelo se carga una sola vez en el proceso padre y los procesos hijos lo
+    heredan al hacer fork: las páginas del modelo en pickle se comparten con
+    copy-on-write y las del bosque compilado, mapeadas en memoria, se comparten a
+    través de la caché de páginas del sistema. Las peticiones se encolan en una
+    cola común de la que cada proceso toma la siguiente al quedar libre, por lo
+    que la carga se reparte según la disponibilidad de cada uno.
+
+    Métodos:
+        start: Crea los procesos del pool.
+        stop: Espera a las peticiones en curso y detiene los procesos.
+        submit: Encola un bloque de filas y devuelve un `Future` con sus predicciones.
+        predict: Encola un bloque de filas y espera sus predicciones.
+        activate: Sustituye el modelo por defecto en todos los procesos.
+        metrics: Devuelve las estadísticas de latencia del pool.
+        worker_pids: Devuelve los PID de los procesos del pool.
+    """
+
+    def __init__(
+        self,
+        ml_svc: ModelInferenceService,
+        n_workers: int,
+        latency_window: int = 10_000
+    ) -> None:
+        """
+        Inicializa el pool sobre un servicio de inferencia con el modelo cargado.
+
+        Args:
+            ml_svc (ModelInferenceService): Servicio que heredan los procesos hijos.
+            n_workers (int): Número de procesos del pool.
+            latency_window (int): Número de latencias recientes para los percentiles.
+        """
+        self.ml_svc = ml_svc
+        self.n_workers = n_workers
+        self.stats = BatchingStats(latency_window)
+        self._context = multiprocessing.get_context('fork')
+        # Identificador y generación del modelo por defecto compartidos con los hijos
+        self._default_model = self._context.Array('c', 256)
+        self._generation = self._context.Value('i', 0)
+        self._pool = None
+
+    def start(self) -> None:
+        """Crea los procesos del pool, que heredan el modelo ya cargado."""
+        global _service
+        _service = self.ml_svc
+        self._pool = self._context.Pool(
+            self.n_workers,
+            initializer=_init_worker,
+            initargs=(self._default_model, self._generation)
+        )
+        logger.info(f'Pool de inferencia iniciado con {self.n_workers} procesos')
+
+    def stop(self) -> None:
+        """Espera a que terminen las peticiones en curso y detiene los procesos."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        logger.info('Pool de inferencia detenido')
+
+    def submit(self, rows: np.ndarray, model_id: str | None = None) -> Future:
+        """
+        Encola un bloque de filas para que lo evalúe el primer proceso libre.
+
+        Args:
+            rows (np.ndarray): Matriz 2-D con las columnas de `features_prediction`.
+            model_id (str | None): Modelo del registro, o None para el modelo por defecto.
+
+        Returns:
+            Future: Futuro que se resuelve con las predicciones del bloque.
+
+        Raises:
+            ValueError: Si las columnas no coinciden con `features_prediction`.
+        """
+        # Se valida en el padre para no enviar a los procesos peticiones inválidas
+        rows = self.ml_svc.to_matrix(rows)
+        future: Future = Future()
+        submitted = time.perf_counter()
+
+        def resolve(predictions: np.ndarray) -> None:
+            self.stats.record([time.perf_counter() - submitted], len(rows))
+            future.set_result(predictions)
+
+        self._pool.apply_async(
+            _predict_in_worker, (rows, model_id),
+            callback=resolve, error_callback=future.set_exception
+        )
+        return future
+
+    def predict(
+        self,
+        rows: np.ndarray,
+        timeout: float | None = None,
+        model_id: str | None = None
+    ) -> np.ndarray:
+        """
+        Encola un bloque de filas y espera sus predicciones.
+
+        Args:
+            rows (np.ndarray): Matriz 2-D con las columnas de `features_prediction`.
+            timeout (float | None): Tiempo máximo de espera en segundos.
+            model_id (str | None): Modelo del registro, o None para el modelo por defecto.
+
+        Returns:
+            np.ndarray: Predicciones del bloque.
+        """
+        return self.submit(rows, model_id).result(timeout=timeout)
+
+    def activate(self, model_id: str) -> str:
+        """
+        Sustituye el modelo por defecto en el padre y en todos los procesos. Cada
+        proceso carga la nueva versión antes de su siguiente petición, y las que
+        ya estaban en curso terminan con el modelo anterior.
+
+        Args:
+            model_id (str): 'nombre' (versión activa) o 'nombre@versión'.
+
+        Returns:
+            str: Identificador 'nombre@versión' del modelo activado.
+        """
+        version = self.ml_svc.activate(model_id)
+        with self._generation.get_lock():
+            self._default_model.value = version.encode('utf-8')
+            self._generation.value += 1
+        return version
+
+    def metrics(self) -> dict:
+        """
+        Devuelve las estadísticas del pool.
+
+        Returns:
+            dict: Latencias de las peticiones y número de procesos.
+        """
+        return {**self.stats.snapshot(), 'workers': self.n_workers}
+
+    def worker_pids(self) -> list[int]:
+        """Devuelve los PID de los procesos del pool."""
+        return [process.pid for process in self._pool._pool] if self._pool else list()
+
+
+def _init_worker(default_model, generation) -> None:
+    """
+    Inicializa un proceso hijo: guarda los valores compartidos del modelo por
+    defecto y deja que sea el padre quien atienda Ctrl+C.
+    """
+    global _default_model, _generation
+    _default_model, _generation = default_model, generation
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _predict_in_worker(rows: np.ndarray, model_id: str | None) -> np.ndarray:
+    """
+    Evalúa un bloque de filas en un proceso hijo, activando antes el modelo por
+    defecto si el padre lo ha cambiado desde la última petición. La generación
+    sólo se anota tras activar el modelo, de modo que si la activación falla la
+    siguiente petición lo vuelve a intentar en lugar de seguir con el anterior.
+    """
+    global _worker_generation
+    if _generation.value != _worker_generation:
+        with _generation.get_lock():
+            version = _default_model.value.decode('utf-8')
+            generation = _generation.value
+        _service.activate(version)
+        _worker_generation = generation
+    return _service.predict_batch(rows, model_id=model_id)
@@ -0,0 +1,120 @@
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Caché LRU en memoria de predicciones, con caducidad opcional.
+
+    La clave de cada entrada es la versión del modelo junto con los bytes de la
+    fila float32 ya validada, de modo que dos vectores iguales comparten entrada
+    y un cambio de modelo nunca devuelve predicciones de la versión anterior.
+    Python calcula el hash de los bytes una sola vez por consulta y la igualdad
+    exacta evita colisiones.
+
+    Métodos:
+        lookup: Rellena las predicciones en caché y devuelve las filas que faltan.
+        store: Guarda las predicciones de un bloque de filas.
+        clear: Vacía la caché.
+        stats: Devuelve los aciertos, fallos y la tasa de aciertos.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float | None = None) -> None:
+        """
+        Inicializa la caché.
+
+        Args:
+            max_entries (int): Número máximo de predicciones guardadas.
+            ttl_seconds (float | None): Vida máxima de una entrada en segundos. Si es
+                None, las entradas sólo se expulsan por LRU.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, bytes], tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, version: str, matrix: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """
+        Escribe en `out` las predicciones que ya están en la caché.
+
+        Args:
+            version (str): Versión del modelo que evalúa las filas.
+            matrix (np.ndarray): Matriz float32 contigua de características.
+            out (np.ndarray): Array de salida con una posición por fila.
+
+        Returns:
+            np.ndarray: Índices de las filas que no están en la caché.
+        """
+        now = time.monotonic()
+        missing = list()
+        with self._lock:
+            for i, row in enumerate(matrix):
+                key = (version, row.tobytes())
+                entry = self._entries.get(key)
+                if entry is not None and self.ttl_seconds is not None and entry[1] <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+
+                if entry is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    out[i] = entry[0]
+
+            self.hits += len(matrix) - len(missing)
+            self.misses += len(missing)
+        return np.array(missing, dtype=np.intp)
+
+    def store(self, version: str, matrix: np.ndarray, predictions: np.ndarray) -> None:
+        """
+        Guarda las predicciones de un bloque de filas, expulsando las entradas usadas
+        menos recientemente si se supera `max_entries`.
+
+        Args:
+            version (str): Versión del modelo que evaluó las filas.
+            matrix (np.ndarray): Matriz float32 contigua de características.
+            predictions (np.ndarray): Predicción de cada fila.
+        """
+        expires = float('inf')
+        if self.ttl_seconds is not None:
+            expires = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for row, prediction in zip(matrix, predictions.tolist()):
+                key = (version, row.tobytes())
+                self._entries[key] = (prediction, expires)
+                self._entries.move_to_end(key)
+
+            overflow = len(self._entries) - self.max_entries
+            for _ in range(max(0, overflow)):
+                self._entries.popitem(last=False)
+            self.evictions += max(0, overflow)
+
+    def clear(self) -> None:
+        """Elimina todas las entradas de la caché."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Devuelve las estadísticas de la caché.
+
+        Returns:
+            dict: Aciertos, fallos, tasa de aciertos, entradas, expulsiones y caducadas.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
@@ -0,0 +1,340 @@
+import json
+import pickle
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from model.pipeline.artifact import FlatForest
+from loguru import logger
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestRegressor
+
+# Archivos de cada versión registrada
+MODEL_FILE = 'model.pkl'
+FOREST_DIR = 'model.forest'
+METADATA_FILE = 'metadata.json'
+PROFILE_FILE = 'profile.json'
+
+# Archivo de cada modelo con la versión activa
+LATEST_FILE = 'LATEST'
+
+# Formato de los nombres de modelo y de las versiones que genera `register`. Los
+# identificadores llegan de los clientes y se unen a rutas del registro, por lo que
+# cualquier otro valor se rechaza antes de tocar el disco
+NAME_PATTERN = re.compile(r'[A-Za-z0-9_-]+')
+VERSION_PATTERN = re.compile(r'\d{8}T\d{6}(-\d+)?')
+
+
+class ModelRegistry:
+    """
+    Registro local de modelos versionados.
+
+    Cada modelo (por ejemplo, uno por ciudad) tiene un directorio con una
+    subcarpeta por versión, nombrada con la fecha de entrenamiento. Una versión
+    contiene el pickle, el bosque compilado, un `metadata.json` con el puntaje,
+    las características y el tiempo de entrenamiento y, si se indica, el perfil de
+    referencia del monitor de la inferencia. El archivo `LATEST` de cada
+    modelo apunta a su versión activa.
+
+    Los modelos se identifican como 'nombre' (versión activa) o 'nombre@versión'.
+
+    Métodos:
+        register: Registra una nueva versión de un modelo.
+        set_latest: Cambia la versión activa de un modelo.
+        names: Devuelve los modelos registrados.
+        versions: Devuelve las versiones de un modelo.
+        latest: Devuelve la versión activa de un modelo.
+        resolve: Convierte un identificador en un par (nombre, versión).
+        metadata: Devuelve los metadatos de una versión.
+        profile_path: Devuelve la ruta del perfil de referencia de una versión.
+        load: Carga una versión con el motor de inferencia indicado.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Inicializa el registro.
+
+        Args:
+            path (Path): Directorio raíz del registro.
+        """
+        self.path = path
+
+    def register(
+        self,
+        name: str,
+        model: 'RandomForestRegressor',
+        forest: FlatForest,
+        metadata: dict,
+        profile: dict | None = None
+    ) -> str:
+        """
+        Guarda una nueva versión de un modelo y la marca como activa.
+
+        Args:
+            name (str): Nombre del modelo.
+            model (RandomForestRegressor): Modelo entrenado.
+            forest (FlatForest): Bosque compilado del modelo.
+            metadata (dict): Metadatos adicionales (puntaje, tiempo de entrenamiento...).
+            profile (dict | None): Perfil de referencia del monitor de la inferencia.
+
+        Returns:
+            str: Versión registrada.
+
+        Raises:
+            ValueError: Si el nombre del modelo no es válido.
+        """
+        if not NAME_PATTERN.fullmatch(name):
+            raise ValueError(f'Nombre de modelo no válido: {name!r}')
+
+        version = datetime.now().strftime('%Y%m%dT%H%M%S')
+        suffix = 1
+        while (self.path / name / version).exists():
+            version = f'{datetime.now().strftime("%Y%m%dT%H%M%S")}-{suffix}'
+            suffix += 1
+
+        version_path = self.path / name / version
+        tmp_path = version_path.with_name(f'.{version}.tmp')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+
+        with (tmp_path / MODEL_FILE).open('wb') as file:
+            pickle.dump(model, file)
+        forest.save(tmp_path / FOREST_DIR)
+
+        metadata = {
+            'name': name,
+            'version': version,
+            'features': forest.feature_names,
+            'n_estimators': len(forest),
+            'max_depth': forest.max_depth,
+            'trained_at': datetime.now().isoformat(timespec='seconds'),
+            'size_bytes': {
+                'sklearn': (tmp_path / MODEL_FILE).stat().st_size,
+                'compiled': directory_size(tmp_path / FOREST_DIR),
+            },
+            **metadata,
+        }
+        (tmp_path / METADATA_FILE).write_text(json.dumps(metadata, indent=2))
+        if profile is not None:
+            (tmp_path / PROFILE_FILE).write_text(json.dumps(profile, indent=2))
+
+        # La versión sólo es visible cuando está completa
+        tmp_path.rename(version_path)
+        self.set_latest(name, version)
+        logger.info(f'Modelo registrado como {name}@{version}')
+        return version
+
+    def set_latest(self, name: str, version: str) -> None:
+        """
+        Cambia la versión activa de un modelo.
+
+        Args:
+            name (str): Nombre del modelo.
+            version (str): Versión a activar.
+
+        Raises:
+            FileNotFoundError: Si la versión no existe.
+        """
+        if not (self._version_path(name, version) / METADATA_FILE).exists():
+            raise FileNotFoundError(f'La versión {name}@{version} no existe')
+
+        latest_path = self.path / name / LATEST_FILE
+        tmp_path = latest_path.with_suffix('.tmp')
+        tmp_path.write_text(version)
+        tmp_path.replace(latest_path)
+
+    def names(self) -> list[str]:
+        """Devuelve los nombres de los modelos registrados."""
+        if not self.path.exists():
+            return list()
+        return sorted(
+            path.name for path in self.path.iterdir() if (path / LATEST_FILE).exists()
+        )
+
+    def versions(self, name: str) -> list[str]:
+        """Devuelve las versiones completas de un modelo, de la más antigua a la más nueva."""
+        model_path = self.path / name
+        if not NAME_PATTERN.fullmatch(name) or not model_path.exists():
+            return list()
+        return sorted(
+            path.name for path in model_path.iterdir()
+            if not path.name.startswith('.') and (path / METADATA_FILE).exists()
+        )
+
+    def latest(self, name: str) -> str:
+        """
+        Devuelve la versión activa de un modelo.
+
+        Args:
+            name (str): Nombre del modelo.
+
+        Returns:
+            str: Versión activa.
+
+        Raises:
+            FileNotFoundError: Si el modelo no está registrado.
+        """
+        if not NAME_PATTERN.fullmatch(name):
+            raise FileNotFoundError(f'El modelo {name!r} no está registrado')
+        try:
+            return (self.path / name / LATEST_FILE).read_text().strip()
+        except FileNotFoundError:
+            raise FileNotFoundError(f'El modelo {name} no está registrado') from None
+
+    def resolve(self, model_id: str) -> tuple[str, str]:
+        """
+        Convierte un identificador 'nombre' o 'nombre@versión' en un par (nombre, versión).
+
+        Args:
+            model_id (str): Identificador del modelo.
+
+        Returns:
+            tuple[str, str]: Nombre y versión del modelo.
+
+        Raises:
+            FileNotFoundError: Si el modelo o la versión no existen o el
+                identificador no tiene un formato válido.
+        """
+        name, _, version = model_id.partition('@')
+        if not version or version == 'latest':
+            version = self.latest(name)
+        if not (self._version_path(name, version) / METADATA_FILE).exists():
+            raise FileNotFoundError(f'La versión {name}@{version} no existe')
+        return name, version
+
+    def metadata(self, name: str, version: str) -> dict:
+        """Devuelve los metadatos de una versión de un modelo."""
+        return json.loads((self._version_path(name, version) / METADATA_FILE).read_text())
+
+    def profile_path(self, name: str, version: str) -> Path:
+        """Devuelve la ruta del perfil de referencia del monitor de una versión."""
+        return self._version_path(name, version) / PROFILE_FILE
+
+    def load(self, name: str, version: str, engine: str) -> tuple[Any, int]:
+        """
+        Carga una versión de un modelo.
+
+        Args:
+            name (str): Nombre del modelo.
+            version (str): Versión del modelo.
+            engine (str): Motor de inferencia: 'sklearn' o 'compiled'.
+
+        Returns:
+            tuple: El modelo cargado y su tamaño estimado en bytes.
+        """
+        version_path = self._version_path(name, version)
+        size = self.metadata(name, version)['size_bytes'][engine]
+        if engine == 'compiled':
+            return FlatForest.load(version_path / FOREST_DIR, mmap_mode='r'), size
+
+        with (version_path / MODEL_FILE).open('rb') as file:
+            return pickle.load(file), size
+
+    def _version_path(self, name: str, version: str) -> Path:
+        """
+        Devuelve el directorio de una versión tras validar el formato del nombre y de
+        la versión, de modo que un identificador no puede salir del registro.
+
+        Raises:
+            FileNotFoundError: Si el nombre o la versión no tienen un formato válido.
+        """
+        if not NAME_PATTERN.fullmatch(name) or not VERSION_PATTERN.fullmatch(version):
+            raise FileNotFoundError(f'La versión {name}@{version} no existe')
+        return self.path / name / version
+
+
+class ModelCache:
+    """
+    Caché LRU en memoria de modelos cargados, acotada por número de modelos y por
+    tamaño total.
+
+    Las predicciones en curso conservan su referencia al modelo, por lo que
+    expulsarlo de la caché o sustituirlo no interrumpe las peticiones que ya lo
+    estaban usando.
+
+    Métodos:
+        get: Devuelve un modelo de la caché, cargándolo si no está.
+        stats: Devuelve los aciertos, fallos y modelos residentes.
+    """
+
+    def __init__(self, max_models: int, max_bytes: int) -> None:
+        """
+        Inicializa la caché.
+
+        Args:
+            max_models (int): Número máximo de modelos residentes.
+            max_bytes (int): Tamaño total máximo de los modelos residentes.
+        """
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self._models: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, loader: Callable[[], tuple[Any, int]]) -> Any:
+        """
+        Devuelve el modelo asociado a una clave, cargándolo con `loader` si no está.
+
+        Args:
+            key (str): Clave del modelo ('nombre@versión').
+            loader (Callable): Función que carga el modelo y devuelve (modelo, bytes).
+
+        Returns:
+            Any: Modelo cargado.
+        """
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key][0]
+            self.misses += 1
+
+        # La carga se hace fuera del bloqueo para no detener las demás peticiones
+        model, size = loader()
+        logger.info(f'Modelo {key} cargado en la caché ({size / 1e6:0.1f} MB)')
+
+        with self._lock:
+            self._models[key] = (model, size)
+            self._models.move_to_end(key)
+            self._evict()
+        return model
+
+    def stats(self) -> dict:
+        """
+        Devuelve las estadísticas de la caché.
+
+        Returns:
+            dict: Aciertos, fallos, expulsiones, modelos residentes y bytes ocupados.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'models': list(self._models),
+                'bytes': sum(size for _, size in self._models.values()),
+            }
+
+    def _evict(self) -> None:
+        """Expulsa los modelos usados menos recientemente hasta respetar los límites."""
+        total = sum(size for _, size in self._models.values())
+        # El modelo más reciente se conserva aunque por sí solo supere el límite
+        while len(self._models) > 1 and (
+            len(self._models) > self.max_models or total > self.max_bytes
+        ):
+            key, (_, size) = self._models.popitem(last=False)
+            total -= size
+            self.evictions += 1
+            logger.info(f'Modelo {key} expulsado de la caché')
+
+
+def directory_size(path: Path) -> int:
+    """Devuelve el tamaño total en bytes de los archivos de un directorio."""
+    return sum(file.stat().st_size for file in path.rglob('*') if file.is_file())
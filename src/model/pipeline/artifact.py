@@ -0,0 +1,379 @@
+import json
+import shutil
+import numpy as np
+from pathlib import Path
+from typing import TYPE_CHECKING
+from loguru import logger
+
+# scikit-learn sólo se necesita para compilar o verificar, no para predecir
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestRegressor
+
+# Arrays que forman el artefacto plano, uno por archivo .npy
+ARRAY_FIELDS = ('feature', 'threshold', 'children_left', 'value', 'roots')
+
+# Tabla de umbrales de los bosques cuantizados, que se carga completa en memoria
+THRESHOLD_TABLE = 'threshold_table'
+
+
+class FlatForest:
+    """
+    Bosque de árboles de regresión compilado en arrays planos de nodos.
+
+    Los nodos de cada árbol se renumeran en anchura, de forma que el hijo derecho
+    de un nodo es siempre `children_left + 1`, y se concatenan en arrays contiguos
+    con índices globales y `roots` marcando el nodo raíz de cada árbol. Las hojas
+    apuntan a sí mismas con umbral infinito, de modo que todas las filas y todos
+    los árboles avanzan a la vez durante `max_depth` pasos sin comprobar qué nodos
+    son hojas. Al cargarse con `mmap_mode='r'` las predicciones leen
+    directamente del archivo, por lo que varios procesos comparten las mismas
+    páginas de solo lectura.
+
+    Atributos:
+        feature (np.ndarray): Índice de la característica evaluada en cada nodo.
+        threshold (np.ndarray): Umbral de decisión de cada nodo.
+        children_left (np.ndarray): Índice global del hijo izquierdo.
+        value (np.ndarray): Valor de predicción de cada nodo.
+        roots (np.ndarray): Índice del nodo raíz de cada árbol.
+        threshold_table (np.ndarray | None): Umbrales distintos del bosque cuantizado.
+            Si no es None, `threshold` guarda el índice de cada umbral en la tabla.
+        feature_names (list[str]): Columnas con las que se entrenó el modelo.
+        max_depth (int): Profundidad máxima de los árboles.
+    """
+
+    # Número máximo de pares (fila, árbol) evaluados a la vez en `predict`
+    block_size = 1 << 16
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        feature_names: list[str],
+        max_depth: int,
+        threshold_table: np.ndarray | None = None
+    ) -> None:
+        """Inicializa el bosque a partir de sus arrays de nodos."""
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.value = value
+        self.roots = roots
+        self.feature_names = feature_names
+        self.max_depth = max_depth
+        self.threshold_table = threshold_table
+
+    def __len__(self) -> int:
+        """Devuelve el número de árboles del bosque."""
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        """Devuelve el tamaño en bytes de los arrays del bosque."""
+        arrays = [getattr(self, field) for field in ARRAY_FIELDS]
+        if self.threshold_table is not None:
+            arrays.append(self.threshold_table)
+        return sum(array.nbytes for array in arrays)
+
+    @property
+    def quantized(self) -> bool:
+        """Indica si los umbrales del bosque están cuantizados en una tabla."""
+        return self.threshold_table is not None
+
+    @classmethod
+    def from_model(cls, model: 'RandomForestRegressor') -> 'FlatForest':
+        """
+        Convierte un `RandomForestRegressor` entrenado en arrays planos de nodos.
+
+        Args:
+            model (RandomForestRegressor): Modelo entrenado.
+
+        Returns:
+            FlatForest: Bosque equivalente en formato plano.
+        """
+        arrays = {field: list() for field in ARRAY_FIELDS}
+        offset = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            order = cls._breadth_first_order(tree.children_left, tree.children_right)
+            new_index = np.empty_like(order)
+            new_index[order] = np.arange(len(order))
+
+            # Las hojas se apuntan a sí mismas y nunca superan el umbral infinito
+            left = tree.children_left[order]
+            leaves = left == -1
+            internal_left = new_index[np.where(leaves, 0, left)]
+            left = np.where(leaves, np.arange(len(order)), internal_left)
+
+            arrays['feature'].append(np.where(leaves, 0, tree.feature[order]))
+            arrays['threshold'].append(np.where(leaves, np.inf, tree.threshold[order]))
+            arrays['children_left'].append(left + offset)
+            arrays['value'].append(tree.value.reshape(-1)[order])
+            arrays['roots'].append([offset])
+            offset += len(order)
+
+        return cls(
+            feature=np.concatenate(arrays['feature']).astype(np.intp),
+            threshold=np.concatenate(arrays['threshold']),
+            children_left=np.concatenate(arrays['children_left']).astype(np.intp),
+            value=np.concatenate(arrays['value']),
+            roots=np.concatenate(arrays['roots']).astype(np.intp),
+            feature_names=[str(name) for name in model.feature_names_in_],
+            max_depth=max(estimator.tree_.max_depth for estimator in model.estimators_)
+        )
+
+    @staticmethod
+    def _breadth_first_order(
+        children_left: np.ndarray,
+        children_right: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calcula el orden en anchura de los nodos de un árbol, en el que los dos hijos
+        de cada nodo interno quedan en posiciones consecutivas.
+
+        Args:
+            children_left (np.ndarray): Hijo izquierdo de cada nodo (-1 en hojas).
+            children_right (np.ndarray): Hijo derecho de cada nodo (-1 en hojas).
+
+        Returns:
+            np.ndarray: Índices originales de los nodos en el nuevo orden.
+        """
+        # La lista crece mientras se recorre, como una cola
+        order = [0]
+        for node in order:
+            if children_left[node] != -1:
+                order.extend((children_left[node], children_right[node]))
+        return np.array(order, dtype=np.intp)
+
+    def quantize(self, values: bool = True) -> 'FlatForest':
+        """
+        Devuelve una copia del bosque con los arrays en los tipos más pequeños que
+        admiten sus valores.
+
+        Los umbrales se sustituyen por índices enteros en la tabla de umbrales
+        distintos, lo que no cambia ninguna predicción; los índices de nodos y de
+        características pasan a enteros de 32 bits o menos. Con `values`, los
+        valores de los nodos se guardan además en float16, con un error relativo
+        de hasta 1/2048 en cada árbol.
+
+        Args:
+            values (bool): Cuantiza también los valores de los nodos a float16.
+
+        Returns:
+            FlatForest: Bosque cuantizado.
+        """
+        if self.quantized:
+            threshold_table, threshold = self.threshold_table, self.threshold
+        else:
+            threshold_table, threshold = np.unique(self.threshold, return_inverse=True)
+        value = self.value
+        if values and np.abs(value).max() <= np.finfo(np.float16).max:
+            value = value.astype(np.float16)
+
+        return FlatForest(
+            feature=self.feature.astype(np.min_scalar_type(self.feature.max())),
+            threshold=threshold.astype(np.min_scalar_type(len(threshold_table) - 1)),
+            children_left=self.children_left.astype(np.int32),
+            value=value,
+            roots=self.roots.astype(np.int32),
+            feature_names=self.feature_names,
+            max_depth=self.max_depth,
+            threshold_table=threshold_table
+        )
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Predice la media de los valores de hoja de todos los árboles.
+
+        Args:
+            X: Matriz 2-D con las columnas en el orden de `feature_names`.
+
+        Returns:
+            np.ndarray: Predicción de cada fila.
+        """
+        # Los árboles comparan en float32, igual que scikit-learn
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        prediction = np.empty(X.shape[0], dtype=np.float64)
+
+        # Se procesa por bloques de filas para acotar la memoria de la matriz de nodos
+        rows_per_block = max(1, self.block_size // len(self.roots))
+        for start in range(0, X.shape[0], rows_per_block):
+            block = X[start:start + rows_per_block]
+            prediction[start:start + len(block)] = self._predict_block(block)
+
+        return prediction
+
+    def _predict_block(self, X: np.ndarray) -> np.ndarray:
+        """
+        Recorre todos los árboles a la vez para un bloque de filas.
+
+        Args:
+            X (np.ndarray): Bloque float32 de la matriz de características.
+
+        Returns:
+            np.ndarray: Predicción de cada fila del bloque.
+        """
+        # Desplazamiento de cada fila en la matriz aplanada
+        row_offset = np.arange(X.shape[0], dtype=np.intp)[:, np.newaxis] * X.shape[1]
+        values = X.ravel()
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+
+        for _ in range(self.max_depth):
+            go_right = values[row_offset + self.feature[node]] > self._thresholds(node)
+            node = self.children_left[node] + go_right
+
+        # La media se acumula en float64 aunque los valores estén en float16
+        return self.value[node].mean(axis=1, dtype=np.float64)
+
+    def _thresholds(self, node: np.ndarray) -> np.ndarray:
+        """Devuelve el umbral de cada nodo, resolviendo la tabla si está cuantizado."""
+        threshold = self.threshold[node]
+        if self.threshold_table is not None:
+            return self.threshold_table[threshold]
+        return threshold
+
+    def prefix_errors(self, X, y) -> np.ndarray:
+        """
+        Calcula en un solo recorrido el error de todos los bosques reducidos que se
+        obtienen conservando los primeros árboles y truncándolos a una profundidad.
+
+        Un árbol truncado a profundidad `d` predice el valor del nodo en el que
+        queda cada fila tras `d` pasos, que en scikit-learn es la media del
+        objetivo de las muestras de ese nodo.
+
+        Args:
+            X: Matriz 2-D con las columnas en el orden de `feature_names`.
+            y: Valores reales del objetivo.
+
+        Returns:
+            np.ndarray: Matriz (max_depth, n_árboles) cuyo elemento [d - 1, k - 1] es
+                la suma de los errores al cuadrado de los `k` primeros árboles
+                truncados a profundidad `d`.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float64)
+        n_trees = len(self.roots)
+        counts = np.arange(1, n_trees + 1)
+        errors = np.zeros((self.max_depth, n_trees))
+
+        rows_per_block = max(1, self.block_size // n_trees)
+        for start in range(0, X.shape[0], rows_per_block):
+            block = X[start:start + rows_per_block]
+            target = y[start:start + len(block), np.newaxis]
+            row_offset = np.arange(block.shape[0], dtype=np.intp)[:, np.newaxis] * X.shape[1]
+            values = block.ravel()
+            node = np.broadcast_to(self.roots, (block.shape[0], n_trees))
+
+            for depth in range(self.max_depth):
+                go_right = values[row_offset + self.feature[node]] > self._thresholds(node)
+                node = self.children_left[node] + go_right
+                # Media acumulada de los k primeros árboles para cada k
+                prediction = np.cumsum(self.value[node], axis=1, dtype=np.float64) / counts
+                errors[depth] += ((prediction - target) ** 2).sum(axis=0)
+
+        return errors
+
+    def score(self, X, y) -> float:
+        """
+        Devuelve el coeficiente R² de las predicciones, como `RandomForestRegressor.score`.
+
+        Args:
+            X: Matriz 2-D con las columnas en el orden de `feature_names`.
+            y: Valores reales del objetivo.
+
+        Returns:
+            float: Coeficiente R².
+        """
+        y = np.asarray(y, dtype=np.float64)
+        residual = ((y - self.predict(X)) ** 2).sum()
+        total = ((y - y.mean()) ** 2).sum()
+        return float(1 - residual / total)
+
+    def save(self, path: Path) -> None:
+        """
+        Guarda el bosque como un directorio con un archivo .npy por array y un
+        `metadata.json` con la descripción del modelo.
+
+        Args:
+            path (Path): Directorio de destino. Se reemplaza si ya existe.
+        """
+        tmp_path = path.with_name(f'{path.name}.tmp')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+
+        for field in ARRAY_FIELDS:
+            np.save(tmp_path / f'{field}.npy', np.ascontiguousarray(getattr(self, field)))
+        if self.threshold_table is not None:
+            np.save(tmp_path / f'{THRESHOLD_TABLE}.npy', self.threshold_table)
+
+        metadata = {
+            'feature_names': self.feature_names,
+            'n_estimators': len(self),
+            'max_depth': self.max_depth,
+            'quantized': self.quantized,
+        }
+        (tmp_path / 'metadata.json').write_text(json.dumps(metadata, indent=2))
+
+        # Sustituye el artefacto anterior sólo cuando el nuevo está completo
+        shutil.rmtree(path, ignore_errors=True)
+        tmp_path.rename(path)
+
+    @classmethod
+    def load(cls, path: Path, mmap_mode: str | None = 'r') -> 'FlatForest':
+        """
+        Carga un bosque guardado con `save`.
+
+        Args:
+            path (Path): Directorio del artefacto.
+            mmap_mode (str | None): Modo de mapeo en memoria de `np.load`. Con 'r'
+                los arrays se leen bajo demanda y se comparten entre procesos.
+
+        Returns:
+            FlatForest: Bosque cargado.
+        """
+        metadata = json.loads((path / 'metadata.json').read_text())
+        # np.asarray devuelve una vista ndarray del mapeo, sin copiar los datos
+        arrays = {
+            field: np.asarray(np.load(path / f'{field}.npy', mmap_mode=mmap_mode))
+            for field in ARRAY_FIELDS
+        }
+        if metadata.get('quantized'):
+            arrays[THRESHOLD_TABLE] = np.load(path / f'{THRESHOLD_TABLE}.npy')
+        logger.debug(f'Artefacto plano cargado desde {path} (mmap_mode={mmap_mode})')
+        return cls(
+            **arrays,
+            feature_names=metadata['feature_names'],
+            max_depth=metadata['max_depth']
+        )
+
+    def check_parity(
+        self,
+        model: 'RandomForestRegressor',
+        X,
+        rtol: float = 1e-7,
+        atol: float = 1e-6
+    ) -> None:
+        """
+        Comprueba que las predicciones del bosque compilado coinciden con las del
+        modelo de scikit-learn del que se obtuvo.
+
+        Args:
+            model (RandomForestRegressor): Modelo de referencia.
+            X: Matriz de características con la que se comparan las predicciones.
+            rtol (float): Tolerancia relativa.
+            atol (float): Tolerancia absoluta.
+
+        Raises:
+            ValueError: Si alguna predicción difiere más de la tolerancia.
+        """
+        expected = model.predict(X)
+        actual = self.predict(X)
+        if not np.allclose(actual, expected, rtol=rtol, atol=atol):
+            max_error = float(np.max(np.abs(actual - expected)))
+            raise ValueError(
+                f'El bosque compilado difiere del modelo original (error máximo {max_error})'
+            )
+        logger.info(f'Paridad del bosque compilado verificada sobre {len(expected)} filas')
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from databases.db_model import RentApartments
+from model.pipeline.collection import (
+    build_query,
+    load_block_fingerprints,
+    load_data_block
+)
+from model.pipeline.preparation import transform_data
+from model.instrumentation import timed
+from config.db_settings import get_db_settings
+from config.features_settings import get_features_settings
+from loguru import logger
+
+# Versión del formato de la caché; cambiarla invalida las cachés existentes
+CACHE_VERSION = 1
+
+
+class PreparedDataCache:
+    """
+    Caché local y columnar de los datos ya preparados para el entrenamiento.
+
+    La tabla se divide en bloques de `block_size` valores de `rowid` y cada bloque
+    preparado se guarda como arrays de NumPy (características float32 y objetivo).
+    Un manifiesto registra la clave de configuración, la marca de agua de la base
+    de datos y la huella de cada bloque:
+
+    - Si la marca de agua (tamaño y fecha de modificación del archivo SQLite) no
+      cambió, los datos se leen de la caché sin tocar la base de datos.
+    - Si cambió, se calculan las huellas de los bloques en SQLite y sólo se
+      extraen y preparan de nuevo los bloques nuevos o modificados.
+    - Si cambia la configuración de features o el esquema de la tabla, la caché
+      se descarta y se reconstruye.
+
+    Métodos:
+        load: Devuelve las características y el objetivo, actualizando la caché.
+        clear: Elimina los archivos de la caché.
+    """
+
+    def __init__(self, path: Path, block_size: int) -> None:
+        """
+        Inicializa la caché.
+
+        Args:
+            path (Path): Directorio de la caché.
+            block_size (int): Número de `rowid` consecutivos por bloque.
+        """
+        self.path = path
+        self.block_size = block_size
+        self.manifest_path = path / 'manifest.json'
+        self.key = self._config_key()
+
+    @timed('cache.load')
+    def load(self) -> tuple[pd.DataFrame, pd.Series]:
+        """
+        Devuelve los datos preparados, actualizando antes los bloques desactualizados.
+
+        Returns:
+            tuple: Una tupla (X, y) donde X son las características y y la variable objetivo.
+        """
+        manifest = self._read_manifest()
+        watermark = self._watermark()
+
+        if manifest is not None and manifest['watermark'] == watermark:
+            logger.info('Caché de datos vigente, se omiten la base de datos y la preparación')
+        else:
+            manifest = self._refresh(manifest, watermark)
+
+        return self._read_blocks(manifest)
+
+    def clear(self) -> None:
+        """Elimina los bloques y el manifiesto de la caché."""
+        for file in self.path.glob('block_*.npz'):
+            file.unlink()
+        self.manifest_path.unlink(missing_ok=True)
+
+    def _refresh(self, manifest: dict | None, watermark: dict) -> dict:
+        """
+        Extrae y prepara los bloques nuevos o modificados y elimina los que ya no existen.
+
+        Args:
+            manifest (dict | None): Manifiesto actual de la caché, si existe.
+            watermark (dict): Marca de agua actual de la base de datos.
+
+        Returns:
+            dict: Manifiesto actualizado.
+        """
+        cached = manifest['blocks'] if manifest else dict()
+        fingerprints = load_block_fingerprints(self.block_size)
+        blocks = {
+            str(row.block): {'rows': int(row.rows), 'checksum': float(row.checksum)}
+            for row in fingerprints.itertuples()
+        }
+        if not blocks:
+            raise ValueError('La tabla de la base de datos está vacía')
+
+        stale = [block for block in blocks if cached.get(block) != blocks[block]]
+        removed = set(cached) - set(blocks)
+        logger.info(
+            f'Caché de datos: {len(blocks) - len(stale)} bloques vigentes, '
+            f'{len(stale)} por actualizar y {len(removed)} eliminados'
+        )
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        columns = manifest['columns'] if manifest else None
+        for block in stale:
+            data = transform_data(load_data_block(int(block), self.block_size))
+            columns = [col for col in data.columns if col != 'rent']
+            np.savez(
+                self._block_path(block),
+                X=data[columns].to_numpy(dtype=np.float32),
+                y=data['rent'].to_numpy(dtype=np.float64)
+            )
+        for block in removed:
+            self._block_path(block).unlink(missing_ok=True)
+
+        manifest = {
+            'key': self.key,
+            'columns': columns,
+            'watermark': watermark,
+            'blocks': blocks,
+        }
+
+        # El manifiesto se escribe al final para que una caché interrumpida no sea válida
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+        tmp_path.replace(self.manifest_path)
+        return manifest
+
+    def _read_blocks(self, manifest: dict) -> tuple[pd.DataFrame, pd.Series]:
+        """
+        Concatena los bloques de la caché en arrays preasignados.
+
+        Args:
+            manifest (dict): Manifiesto de la caché.
+
+        Returns:
+            tuple: Una tupla (X, y) donde X son las características y y la variable objetivo.
+        """
+        blocks = sorted(manifest['blocks'], key=int)
+        n_rows = sum(manifest['blocks'][block]['rows'] for block in blocks)
+        X = np.empty((n_rows, len(manifest['columns'])), dtype=np.float32, order='F')
+        y = np.empty(n_rows, dtype=np.float64)
+
+        offset = 0
+        for block in blocks:
+            with np.load(self._block_path(block)) as arrays:
+                stop = offset + len(arrays['y'])
+                X[offset:stop] = arrays['X']
+                y[offset:stop] = arrays['y']
+                offset = stop
+
+        logger.info(f'Datos preparados leídos desde la caché: {X.shape}')
+        X_frame = pd.DataFrame(X, columns=manifest['columns'], copy=False)
+        return X_frame, pd.Series(y, name='rent', copy=False)
+
+    def _read_manifest(self) -> dict | None:
+        """
+        Lee el manifiesto y lo descarta si fue creado con otra configuración.
+
+        Returns:
+            dict | None: Manifiesto vigente o None si no existe o no es válido.
+        """
+        if not self.manifest_path.exists():
+            return None
+
+        manifest = json.loads(self.manifest_path.read_text())
+        if manifest.get('key') != self.key:
+            logger.info('La configuración o el esquema cambiaron, se invalida la caché')
+            self.clear()
+            return None
+        return manifest
+
+    def _config_key(self) -> str:
+        """
+        Calcula la clave de la caché a partir de la configuración de features, el
+        esquema de la tabla, los tipos de lectura y el tamaño de bloque.
+
+        Returns:
+            str: Hash SHA-256 de la configuración.
+        """
+        features_settings = get_features_settings()
+        config = {
+            'version': CACHE_VERSION,
+            'features': {
+                'categorical_columns': features_settings.categorical_columns,
+                'exclude_columns': features_settings.exclude_columns,
+                'parse_columns': features_settings.parse_columns,
+                'features_prediction': features_settings.features_prediction,
+            },
+            'schema': [
+                (column.name, str(column.type)) for column in RentApartments.__table__.columns
+            ],
+            'dtypes': build_query()[1],
+            'block_size': self.block_size,
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _watermark() -> dict:
+        """
+        Calcula la marca de agua de la base de datos a partir del tamaño y la fecha de
+        modificación del archivo SQLite y de su registro WAL, si existe.
+
+        Returns:
+            dict: Marca de agua de la base de datos.
+        """
+        watermark = dict()
+        db_path = get_db_settings().db_path
+        for path in (db_path, db_path.with_name(f'{db_path.name}-wal')):
+            if path.exists():
+                stat = path.stat()
+                watermark[path.name] = [stat.st_size, stat.st_mtime_ns]
+        return watermark
+
+    def _block_path(self, block: str) -> Path:
+        """Devuelve la ruta del archivo de un bloque."""
+        return self.path / f'block_{int(block):08d}.npz'
@@ -1,19 +1,79 @@
+import zlib
 import pandas as pd
-from sqlalchemy import select, create_engine
+from collections.abc import Iterator
+from functools import lru_cache
+from sqlalchemy import Engine, Integer, Select, case, event, func, literal_column, select
+from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 from databases.db_model import RentApartments
-from config.db_settings import DBSettings
+from model.instrumentation import timed
+from config.db_settings import get_db_settings
+from config.features_settings import get_features_settings
 from loguru import logger
 
-# Instanciar configuraciones de la base de datos y motor de conexión
-db_settings = DBSettings()  # type: ignore
-engine = create_engine(f'sqlite:///{db_settings.db_path}')
+# Identificador interno de fila de SQLite, creciente para las filas insertadas
+ROWID = literal_column('rowid', type_=Integer)
 
 
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    """
+    Devuelve el motor de conexión a la base de datos, creándolo en el primer uso.
+
+    Returns:
+        Engine: Motor de SQLAlchemy compartido.
+    """
+    engine = create_engine(f'sqlite:///{get_db_settings().db_path}')
+    event.listen(engine, 'connect', register_functions)
+    return engine
+
+
+def register_functions(dbapi_connection, connection_record):
+    """Registra en cada conexión SQLite la función `row_crc32` usada en las huellas."""
+    dbapi_connection.create_function(
+        'row_crc32', -1, lambda *values: zlib.crc32(repr(values).encode('utf-8')),
+        deterministic=True
+    )
+
+
+def build_query() -> tuple[Select, dict[str, str]]:
+    """
+    Genera la consulta de extracción a partir de la configuración de features,
+    seleccionando sólo las columnas de `features_prediction` y el objetivo `rent`.
+
+    Las columnas categóricas se codifican en la propia consulta ('yes' a 1 y el
+    resto a 0) y se leen como int8; las características numéricas se leen como
+    float32. Las columnas de texto a parsear se extraen sin transformar.
+
+    Returns:
+        tuple: Una tupla (consulta, dtypes) con la consulta SELECT y los tipos con
+            los que se leen sus columnas.
+    """
+    features_settings = get_features_settings()
+    table = RentApartments.__table__
+    columns = list()
+    dtypes = dict()
+
+    for name in features_settings.features_prediction:
+        column = table.c[name]
+        if name in features_settings.categorical_columns:
+            columns.append(case((column == 'yes', 1), else_=0).label(name))
+            dtypes[name] = 'int8'
+        elif name in features_settings.parse_columns:
+            columns.append(column)
+        else:
+            columns.append(column)
+            dtypes[name] = 'float32'
+
+    columns.append(table.c.rent)
+    return select(*columns), dtypes
+
+
+@timed('collection.load_data_from_db')
 def load_data_from_db() -> pd.DataFrame:
     """
     Extrae datos de la tabla `RentApartments` desde la base de datos
-    y los carga en un DataFrame.
+    y los carga en un DataFrame, con las columnas y tipos de `build_query`.
 
     Returns:
         pd.DataFrame: DataFrame con los datos extraídos de la base de datos.
@@ -22,12 +82,12 @@ def load_data_from_db() -> pd.DataFrame:
         SQLAlchemyError: Si ocurre un error al conectar o consultar la base de datos.
     """
     logger.info('Extrayendo la tabla de la base de datos')
-    orm_query = select(RentApartments)
+    orm_query, dtypes = build_query()
 
     try:
         # Ejecuta la consulta y carga los datos en un DataFrame
-        with engine.connect() as connection:
-            data = pd.read_sql(orm_query, connection)
+        with get_engine().connect() as connection:
+            data = pd.read_sql(orm_query, connection, dtype=dtypes)
         logger.info('Datos cargados exitosamente desde la base de datos')
         return data
 
@@ -35,3 +95,146 @@ def load_data_from_db() -> pd.DataFrame:
         # Manejo de errores en la conexión o consulta a la base de datos
         logger.error(f'Error al cargar datos desde la base de datos: {e}')
         raise
+
+
+def load_data_chunks(chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Extrae los datos de la tabla `RentApartments` en bloques de `chunk_size` filas,
+    usando un cursor en streaming para no cargar la tabla completa en memoria.
+
+    Args:
+        chunk_size (int): Número de filas por bloque.
+
+    Yields:
+        pd.DataFrame: Bloque de filas de la tabla.
+
+    Raises:
+        SQLAlchemyError: Si ocurre un error al conectar o consultar la base de datos.
+    """
+    logger.info(f'Extrayendo la tabla de la base de datos en bloques de {chunk_size} filas')
+    orm_query, dtypes = build_query()
+
+    try:
+        # La conexión se mantiene abierta mientras se consumen los bloques
+        with get_engine().connect() as connection:
+            connection = connection.execution_options(
+                stream_results=True,
+                max_row_buffer=chunk_size
+            )
+            yield from pd.read_sql(orm_query, connection, chunksize=chunk_size, dtype=dtypes)
+        logger.info('Bloques de datos extraídos exitosamente desde la base de datos')
+
+    except SQLAlchemyError as e:
+        # Manejo de errores en la conexión o consulta a la base de datos
+        logger.error(f'Error al cargar datos desde la base de datos: {e}')
+        raise
+
+
+@timed('collection.count_rows')
+def count_rows() -> int:
+    """
+    Cuenta las filas de la tabla `RentApartments`.
+
+    Returns:
+        int: Número de filas de la tabla.
+    """
+    orm_query = select(func.count()).select_from(RentApartments)
+    with get_engine().connect() as connection:
+        return connection.execute(orm_query).scalar_one()
+
+
+@timed('collection.load_block_fingerprints')
+def load_block_fingerprints(block_size: int, keys: bool = False) -> pd.DataFrame:
+    """
+    Calcula dentro de SQLite una huella de cada bloque de `block_size` filas según su
+    `rowid`, sin transferir los datos: el número de filas y la suma de un CRC32 de
+    las columnas extraídas por `build_query`.
+
+    La suma no depende del orden de las filas. Con `keys` el CRC32 de cada fila
+    incluye también su `rowid` y su dirección, de modo que la huella cambia al
+    modificar una dirección, al intercambiar valores entre filas o al sustituir una
+    fila por otra con las mismas características.
+
+    Args:
+        block_size (int): Número de `rowid` consecutivos por bloque.
+        keys (bool): Si es True, incluye `rowid` y `address` en el CRC32 de cada fila.
+
+    Returns:
+        pd.DataFrame: Una fila por bloque con las columnas `block`, `rows` y `checksum`.
+    """
+    table = RentApartments.__table__
+    source_columns = [
+        table.c[name] for name in get_features_settings().features_prediction + ['rent']
+    ]
+    if keys:
+        source_columns += [ROWID, table.c.address]
+    block = (ROWID // block_size).label('block')
+    orm_query = select(
+        block,
+        func.count().label('rows'),
+        func.total(func.row_crc32(*source_columns)).label('checksum')
+    ).group_by(block).order_by(block)
+
+    with get_engine().connect() as connection:
+        return pd.read_sql(orm_query, connection)
+
+
+@timed('collection.load_data_block')
+def load_data_block(block: int, block_size: int, keys: bool = False) -> pd.DataFrame:
+    """
+    Extrae las filas de un bloque de `rowid` con las columnas y tipos de `build_query`.
+
+    Args:
+        block (int): Índice del bloque.
+        block_size (int): Número de `rowid` consecutivos por bloque.
+        keys (bool): Si es True, añade las columnas `rowid` y `address`.
+
+    Returns:
+        pd.DataFrame: Filas del bloque ordenadas por `rowid`.
+    """
+    orm_query, dtypes = build_query()
+    if keys:
+        orm_query = orm_query.add_columns(
+            ROWID.label('rowid'), RentApartments.__table__.c.address
+        )
+    orm_query = orm_query.where(
+        ROWID >= block * block_size,
+        ROWID < (block + 1) * block_size
+    ).order_by(ROWID)
+
+    with get_engine().connect() as connection:
+        return pd.read_sql(orm_query, connection, dtype=dtypes)
+
+
+@timed('collection.max_rowid')
+def max_rowid() -> int:
+    """
+    Devuelve el mayor `rowid` de la tabla `RentApartments`, que marca hasta qué
+    fila llegan los datos de una construcción.
+
+    Returns:
+        int: Mayor `rowid`, o 0 si la tabla está vacía.
+    """
+    orm_query = select(func.max(ROWID)).select_from(RentApartments)
+    with get_engine().connect() as connection:
+        return connection.execute(orm_query).scalar_one() or 0
+
+
+@timed('collection.load_data_range')
+def load_data_range(after: int, until: int) -> pd.DataFrame:
+    """
+    Extrae las filas insertadas entre dos construcciones, con las columnas y tipos
+    de `build_query`.
+
+    Args:
+        after (int): Mayor `rowid` de la construcción anterior (excluido).
+        until (int): Mayor `rowid` a extraer (incluido).
+
+    Returns:
+        pd.DataFrame: Filas con `after < rowid <= until` ordenadas por `rowid`.
+    """
+    orm_query, dtypes = build_query()
+    orm_query = orm_query.where(ROWID > after, ROWID <= until).order_by(ROWID)
+
+    with get_engine().connect() as connection:
+        return pd.read_sql(orm_query, connection, dtype=dtypes)
@@ -0,0 +1,279 @@
+import hashlib
+import json
+import numpy as np
+from collections.abc import Sequence
+from pathlib import Path
+from loguru import logger
+
+# Archivos del índice: la matriz float32 sin cabecera, que crece por el final, las
+# claves y las huellas de los bloques, sustituidas juntas de forma atómica, y la
+# descripción de las columnas
+FEATURES_FILE = 'features.f32'
+KEYS_FILE = 'keys.npz'
+METADATA_FILE = 'metadata.json'
+
+# Arrays de `KEYS_FILE`: por dirección, su hash, su fila en la matriz y su `rowid`
+# en la tabla; por bloque de `rowid`, su número de filas y su suma de CRC32
+KEY_FIELDS = ('hashes', 'offsets', 'rowids', 'block_ids', 'block_rows', 'block_checksums')
+
+
+class FeatureIndex:
+    """
+    Índice de las características preparadas de cada anuncio por su dirección.
+
+    Las filas de `features_prediction` se guardan en una matriz float32 mapeada en
+    memoria, y las direcciones, como hashes de 64 bits ordenados con la fila que
+    les corresponde, de modo que un lote de direcciones se resuelve con una
+    búsqueda binaria vectorizada y sus filas se extraen con un único `take`, sin
+    consultar la base de datos ni repetir la preparación.
+
+    El índice se actualiza por bloques de `rowid`, con las huellas de
+    `load_block_fingerprints` calculadas también sobre el `rowid` y la dirección:
+    sólo se vuelven a leer los bloques cuyas filas han cambiado. Una dirección que
+    ya tenía fila la sobrescribe en su sitio y las nuevas se añaden al final de la
+    matriz; las claves se sustituyen al terminar en una sola operación atómica. Con
+    direcciones repetidas en la tabla prevalece la fila de mayor `rowid`.
+
+    Atributos:
+        path (Path): Directorio del índice.
+        feature_names (list[str]): Columnas de la matriz.
+        block_size (int): Número de `rowid` consecutivos por bloque.
+        features (np.ndarray): Matriz de características mapeada en memoria.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        feature_names: list[str],
+        block_size: int,
+        keys: dict[str, np.ndarray],
+        mmap_mode: str = 'r'
+    ) -> None:
+        """Inicializa el índice a partir de sus claves, mapeando la matriz."""
+        self.path = path
+        self.feature_names = feature_names
+        self.block_size = block_size
+        self.mmap_mode = mmap_mode
+        for field in KEY_FIELDS:
+            setattr(self, field, keys[field])
+        self.features = self._map()
+
+    def __len__(self) -> int:
+        """Devuelve el número de direcciones del índice."""
+        return len(self.hashes)
+
+    @classmethod
+    def create(cls, path: Path, feature_names: list[str], block_size: int) -> 'FeatureIndex':
+        """
+        Crea un índice vacío, abierto para escritura.
+
+        Args:
+            path (Path): Directorio del índice, que no debe existir.
+            feature_names (list[str]): Columnas de la matriz.
+            block_size (int): Número de `rowid` consecutivos por bloque.
+
+        Returns:
+            FeatureIndex: Índice sin direcciones.
+        """
+        path.mkdir(parents=True)
+        (path / FEATURES_FILE).touch()
+        metadata = {'feature_names': feature_names, 'block_size': block_size}
+        (path / METADATA_FILE).write_text(json.dumps(metadata, indent=2))
+
+        empty = np.empty(0, dtype=np.int64)
+        keys = {field: empty for field in KEY_FIELDS}
+        keys.update(
+            hashes=np.empty(0, dtype=np.uint64),
+            block_checksums=np.empty(0, dtype=np.float64)
+        )
+        index = cls(path, feature_names, block_size, keys, mmap_mode='r+')
+        index.save_keys()
+        return index
+
+    @classmethod
+    def load(cls, path: Path, mmap_mode: str = 'r') -> 'FeatureIndex':
+        """
+        Carga un índice guardado.
+
+        Args:
+            path (Path): Directorio del índice.
+            mmap_mode (str): 'r' para consultar o 'r+' para actualizar.
+
+        Returns:
+            FeatureIndex: Índice cargado.
+        """
+        metadata = json.loads((path / METADATA_FILE).read_text())
+        with np.load(path / KEYS_FILE) as data:
+            keys = {field: data[field] for field in KEY_FIELDS}
+        return cls(path, metadata['feature_names'], metadata['block_size'], keys, mmap_mode)
+
+    @staticmethod
+    def hash_addresses(addresses: Sequence[str]) -> np.ndarray:
+        """Devuelve el hash BLAKE2b de 64 bits de cada dirección."""
+        digests = b''.join(
+            hashlib.blake2b(str(address).encode('utf-8'), digest_size=8).digest()
+            for address in addresses
+        )
+        return np.frombuffer(digests, dtype='<u8').astype(np.uint64)
+
+    def lookup(self, addresses: Sequence[str]) -> np.ndarray:
+        """
+        Devuelve la fila de la matriz de cada dirección.
+
+        Args:
+            addresses (Sequence[str]): Direcciones a buscar.
+
+        Returns:
+            np.ndarray: Fila de cada dirección, o -1 si no está en el índice.
+        """
+        hashes = self.hash_addresses(addresses)
+        if not len(self.hashes):
+            return np.full(len(hashes), -1, dtype=np.int64)
+        position = np.minimum(np.searchsorted(self.hashes, hashes), len(self.hashes) - 1)
+        return np.where(self.hashes[position] == hashes, self.offsets[position], -1)
+
+    def take(self, addresses: Sequence[str]) -> np.ndarray:
+        """
+        Extrae las características de un lote de direcciones.
+
+        Args:
+            addresses (Sequence[str]): Direcciones de los anuncios.
+
+        Returns:
+            np.ndarray: Matriz float32 con una fila por dirección.
+
+        Raises:
+            KeyError: Si alguna dirección no está en el índice.
+        """
+        offsets = self.lookup(addresses)
+        missing = offsets < 0
+        if missing.any():
+            unknown = [address for address, flag in zip(addresses, missing) if flag]
+            raise KeyError(f'Direcciones sin características en el índice: {unknown[:10]}')
+        return np.asarray(self.features).take(offsets, axis=0)
+
+    def changed_blocks(
+        self,
+        block_ids: np.ndarray,
+        block_rows: np.ndarray,
+        block_checksums: np.ndarray
+    ) -> np.ndarray:
+        """
+        Compara las huellas actuales de la tabla con las del índice.
+
+        Args:
+            block_ids (np.ndarray): Índice de cada bloque de la tabla.
+            block_rows (np.ndarray): Número de filas de cada bloque.
+            block_checksums (np.ndarray): Suma de CRC32 de cada bloque.
+
+        Returns:
+            np.ndarray: Bloques nuevos, modificados o eliminados.
+        """
+        stored = dict(zip(
+            self.block_ids.tolist(),
+            zip(self.block_rows.tolist(), self.block_checksums.tolist())
+        ))
+        current = zip(block_ids.tolist(), block_rows.tolist(), block_checksums.tolist())
+        changed = {block for block, rows, checksum in current
+                   if stored.get(block) != (rows, checksum)}
+        changed.update(set(stored) - set(block_ids.tolist()))
+        return np.array(sorted(changed), dtype=np.int64)
+
+    def replace_blocks(
+        self,
+        blocks: np.ndarray,
+        addresses: Sequence[str],
+        rowids: np.ndarray,
+        matrix: np.ndarray
+    ) -> None:
+        """
+        Sustituye las direcciones de unos bloques por sus filas actuales. Las claves
+        sólo se guardan en disco con `save_keys`.
+
+        Args:
+            blocks (np.ndarray): Bloques cuyas direcciones se descartan.
+            addresses (Sequence[str]): Direcciones actuales de esos bloques.
+            rowids (np.ndarray): `rowid` de cada dirección.
+            matrix (np.ndarray): Características preparadas de cada dirección.
+        """
+        # Las direcciones de los bloques sustituidos liberan su fila
+        dropped = np.isin(self.rowids // self.block_size, blocks)
+        freed_hashes, freed_offsets = self.hashes[dropped], self.offsets[dropped]
+        kept = ~dropped
+
+        # Una entrada por dirección, la de mayor rowid, conservando el orden por hash
+        new_hashes = self.hash_addresses(addresses)
+        hashes = np.concatenate((self.hashes[kept], new_hashes))
+        all_rowids = np.concatenate((self.rowids[kept], np.asarray(rowids, dtype=np.int64)))
+        offsets = np.concatenate((self.offsets[kept], np.full(len(new_hashes), -1)))
+        source = np.concatenate((np.full(kept.sum(), -1), np.arange(len(new_hashes))))
+        order = np.lexsort((all_rowids, hashes))
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = hashes[order[1:]] != hashes[order[:-1]]
+        winners, losers = order[last], order[~last]
+
+        # Las entradas conservadas que pierden frente a una fila nueva también la liberan
+        replaced = losers[offsets[losers] >= 0]
+        pool_hashes = np.concatenate((freed_hashes, hashes[replaced]))
+        pool_offsets = np.concatenate((freed_offsets, offsets[replaced]))
+        pool_order = np.argsort(pool_hashes)
+        pool_hashes, pool_offsets = pool_hashes[pool_order], pool_offsets[pool_order]
+
+        # Cada fila nueva reutiliza la fila liberada de su dirección o va al final
+        offsets = offsets[winners]
+        pending = np.flatnonzero(source[winners] >= 0)
+        rows = np.ascontiguousarray(matrix[source[winners][pending]], dtype=np.float32)
+        reuse = np.zeros(len(pending), dtype=bool)
+        assigned = np.empty(len(pending), dtype=np.int64)
+        if len(pool_hashes):
+            position = np.minimum(
+                np.searchsorted(pool_hashes, hashes[winners][pending]), len(pool_hashes) - 1
+            )
+            reuse = pool_hashes[position] == hashes[winners][pending]
+            assigned[reuse] = pool_offsets[position[reuse]]
+        n_rows = len(self.features)
+        assigned[~reuse] = n_rows + np.arange((~reuse).sum())
+        offsets[pending] = assigned
+
+        if reuse.any():
+            self.features[assigned[reuse]] = rows[reuse]
+            self.features.flush()
+        if (~reuse).any():
+            with (self.path / FEATURES_FILE).open('ab') as file:
+                file.write(rows[~reuse].tobytes())
+            self.features = self._map()
+
+        self.hashes = hashes[winners]
+        self.offsets = offsets
+        self.rowids = all_rowids[winners]
+        logger.debug(f'Índice de características: {int(reuse.sum())} filas sobrescritas, '
+                     f'{int((~reuse).sum())} añadidas')
+
+    def set_blocks(
+        self,
+        block_ids: np.ndarray,
+        block_rows: np.ndarray,
+        block_checksums: np.ndarray
+    ) -> None:
+        """Guarda las huellas de los bloques con las que se construyó el índice."""
+        self.block_ids = np.asarray(block_ids, dtype=np.int64)
+        self.block_rows = np.asarray(block_rows, dtype=np.int64)
+        self.block_checksums = np.asarray(block_checksums, dtype=np.float64)
+
+    def save_keys(self) -> None:
+        """Sustituye de forma atómica las claves y las huellas guardadas en disco."""
+        tmp_path = self.path / f'{KEYS_FILE}.tmp'
+        with tmp_path.open('wb') as file:
+            np.savez(file, **{field: getattr(self, field) for field in KEY_FIELDS})
+        tmp_path.replace(self.path / KEYS_FILE)
+
+    def _map(self) -> np.ndarray:
+        """Mapea en memoria la matriz de características con su tamaño actual."""
+        n_features = len(self.feature_names)
+        n_rows = (self.path / FEATURES_FILE).stat().st_size // (4 * n_features)
+        if not n_rows:
+            return np.empty((0, n_features), dtype=np.float32)
+        return np.memmap(
+            self.path / FEATURES_FILE, dtype=np.float32, mode=self.mmap_mode,
+            shape=(n_rows, n_features)
+        )
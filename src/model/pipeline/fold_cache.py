@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from pathlib import Path
+from sklearn.ensemble import RandomForestRegressor
+from loguru import logger
+
+# Versión del formato de la caché; cambiarla invalida las entradas existentes
+FOLD_CACHE_VERSION = 1
+
+
+class FoldCache:
+    """
+    Caché persistente y direccionada por contenido de los ajustes de la validación
+    cruzada.
+
+    Cada entrada corresponde a un par (candidato, fold) y se identifica con el hash
+    de los hiperparámetros, la semilla, la versión de scikit-learn y la huella de
+    los datos del fold, de modo que un cambio en los datos, en la partición o en la
+    librería invalida sus entradas sin necesidad de borrarlas. Una entrada consta de
+    un archivo JSON con el puntaje y los tiempos del ajuste y de un archivo joblib
+    con el estimador entrenado, que permite continuar con `warm_start` un bosque ya
+    entrenado con menos árboles.
+
+    El tamaño total se acota con una política LRU: cada lectura actualiza la fecha
+    de modificación de la entrada y `evict` elimina las menos usadas recientemente.
+
+    Métodos:
+        data_fingerprint: Calcula la huella de un conjunto de datos.
+        fold_fingerprint: Calcula la huella de un fold.
+        key: Calcula la clave de una entrada.
+        get_score: Devuelve el puntaje y los tiempos de una entrada.
+        get_estimator: Devuelve el estimador entrenado de una entrada.
+        put: Guarda una entrada.
+        evict: Elimina entradas hasta respetar el tamaño máximo.
+    """
+
+    def __init__(self, path: Path, max_bytes: int) -> None:
+        """
+        Inicializa la caché.
+
+        Args:
+            path (Path): Directorio de la caché.
+            max_bytes (int): Tamaño máximo en disco, en bytes.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def data_fingerprint(X: pd.DataFrame, y: pd.Series) -> str:
+        """
+        Calcula la huella de las características y el objetivo, incluyendo el orden de
+        las filas, los nombres y los tipos de las columnas.
+
+        Args:
+            X (pd.DataFrame): Características.
+            y (pd.Series): Variable objetivo.
+
+        Returns:
+            str: Hash SHA-256 de los datos.
+        """
+        digest = hashlib.sha256()
+        schema = [(str(col), str(dtype)) for col, dtype in X.dtypes.items()]
+        digest.update(json.dumps(schema).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+        digest.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def fold_fingerprint(data_fingerprint: str, train: np.ndarray, test: np.ndarray) -> str:
+        """
+        Calcula la huella de un fold a partir de la huella de los datos y sus índices.
+
+        Args:
+            data_fingerprint (str): Huella de los datos completos.
+            train (np.ndarray): Índices de entrenamiento del fold.
+            test (np.ndarray): Índices de validación del fold.
+
+        Returns:
+            str: Hash SHA-256 del fold.
+        """
+        digest = hashlib.sha256(data_fingerprint.encode('utf-8'))
+        digest.update(np.asarray(train, dtype=np.int64).tobytes())
+        digest.update(b'|')
+        digest.update(np.asarray(test, dtype=np.int64).tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(fold_fingerprint: str, params: dict, n_estimators: int, random_state: int) -> str:
+        """
+        Calcula la clave de la entrada de un candidato en un fold.
+
+        Args:
+            fold_fingerprint (str): Huella del fold.
+            params (dict): Hiperparámetros distintos de `n_estimators`.
+            n_estimators (int): Número de árboles.
+            random_state (int): Semilla del bosque.
+
+        Returns:
+            str: Hash SHA-256 de la entrada.
+        """
+        content = {
+            'version': FOLD_CACHE_VERSION,
+            'fold': fold_fingerprint,
+            'params': {**params, 'n_estimators': n_estimators},
+            'random_state': random_state,
+            'sklearn': sklearn.__version__,
+        }
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get_score(self, key: str) -> dict | None:
+        """
+        Devuelve el puntaje y los tiempos de una entrada y la marca como usada.
+
+        Args:
+            key (str): Clave de la entrada.
+
+        Returns:
+            dict | None: Puntaje y tiempos del ajuste, o None si no está en la caché.
+        """
+        score_path = self._score_path(key)
+        try:
+            entry = json.loads(score_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        self._touch(key)
+        return entry
+
+    def get_estimator(self, key: str) -> RandomForestRegressor | None:
+        """
+        Devuelve el estimador entrenado de una entrada. Una entrada que no se puede
+        cargar (truncada, corrupta o escrita por otra versión de las librerías) se
+        elimina y se trata como ausente.
+
+        Args:
+            key (str): Clave de la entrada.
+
+        Returns:
+            RandomForestRegressor | None: Estimador, o None si no está en la caché.
+        """
+        try:
+            return joblib.load(self._estimator_path(key))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f'Caché de folds: entrada {key[:12]} ilegible '
+                           f'({type(e).__name__}), se elimina')
+            self._score_path(key).unlink(missing_ok=True)
+            self._estimator_path(key).unlink(missing_ok=True)
+            return None
+
+    def put(
+        self,
+        key: str,
+        score: float,
+        wall_time: float,
+        cpu_time: float,
+        estimator: RandomForestRegressor
+    ) -> None:
+        """
+        Guarda una entrada. El estimador se escribe antes que el puntaje, que actúa
+        como marca de entrada completa; ambos se escriben de forma atómica.
+
+        Args:
+            key (str): Clave de la entrada.
+            score (float): Puntaje R² del fold.
+            wall_time (float): Tiempo real del ajuste, en segundos.
+            cpu_time (float): Tiempo de CPU del ajuste, en segundos.
+            estimator (RandomForestRegressor): Estimador entrenado.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        # El sufijo con el PID evita colisiones entre procesos del pool
+        suffix = f'.{os.getpid()}.tmp'
+
+        estimator_path = self._estimator_path(key)
+        tmp_path = estimator_path.with_name(estimator_path.name + suffix)
+        joblib.dump(estimator, tmp_path)
+        tmp_path.replace(estimator_path)
+
+        entry = {'score': score, 'wall_time': wall_time, 'cpu_time': cpu_time}
+        score_path = self._score_path(key)
+        tmp_path = score_path.with_name(score_path.name + suffix)
+        tmp_path.write_text(json.dumps(entry))
+        tmp_path.replace(score_path)
+
+    def evict(self) -> int:
+        """
+        Elimina las entradas usadas menos recientemente hasta que el tamaño de la
+        caché no supera `max_bytes`.
+
+        Returns:
+            int: Número de entradas eliminadas.
+        """
+        if not self.path.exists():
+            return 0
+
+        entries = dict()
+        for file in self.path.iterdir():
+            if file.suffix not in ('.json', '.joblib'):
+                continue
+            stat = file.stat()
+            size, last_used = entries.get(file.stem, (0, 0))
+            entries[file.stem] = (size + stat.st_size, max(last_used, stat.st_mtime_ns))
+
+        total = sum(size for size, _ in entries.values())
+        removed = 0
+        for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            self._score_path(key).unlink(missing_ok=True)
+            self._estimator_path(key).unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            logger.info(f'Caché de folds: {removed} entradas eliminadas por tamaño')
+        return removed
+
+    def _touch(self, key: str) -> None:
+        """Actualiza la fecha de uso de los archivos de una entrada."""
+        for path in (self._score_path(key), self._estimator_path(key)):
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+
+    def _score_path(self, key: str) -> Path:
+        """Devuelve la ruta del archivo de puntaje de una entrada."""
+        return self.path / f'{key}.json'
+
+    def _estimator_path(self, key: str) -> Path:
+        """Devuelve la ruta del archivo del estimador de una entrada."""
+        return self.path / f'{key}.joblib'
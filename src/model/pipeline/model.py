@@ -1,14 +1,33 @@
+import copy
+import json
+import numpy as np
 import pandas as pd
 import pickle
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
 from pathlib import Path
-from model.pipeline.preparation import prepare_data
-from sklearn.model_selection import train_test_split, GridSearchCV
+from model.pipeline.collection import (
+    load_block_fingerprints, load_data_block, load_data_range, max_rowid
+)
+from model.pipeline.preparation import prepare_data, prepare_data_arrays, transform_data
+from model.pipeline.artifact import FlatForest
+from model.pipeline.feature_index import FeatureIndex
+from model.pipeline.cache import PreparedDataCache
+from model.pipeline.fold_cache import FoldCache
+from model.pipeline.search import HyperparameterSearch
+from model.model_registry import ModelRegistry, directory_size
+from model.model_monitor import build_profile
+from model.instrumentation import stage, timed, timer
+from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor
+from sklearn.tree._tree import TREE_LEAF, TREE_UNDEFINED, Tree
 from loguru import logger
-from config.model_settings import ModelSettings
-
-# Instancia de configuraciones para el modelo
-model_settings = ModelSettings()  # type: ignore
+from config.model_settings import get_model_settings
+from config.db_settings import get_db_settings
+from config.features_settings import get_features_settings
 
 
 def build_model():
@@ -17,74 +36,315 @@ def build_model():
     utilizando validación cruzada para la búsqueda de hiperparámetros.
     """
     logger.info('Empezamos la construcción de la pipeline')
+    db_settings = get_db_settings()
+    model_settings = get_model_settings()
+
+    # Las filas posteriores a esta quedan para la siguiente actualización incremental
+    last_rowid = max_rowid()
 
     # Preparación de datos y separación en características y objetivo
-    data = prepare_data()
-    X, y = split_features_target(data)
+    with stage('build.load_data'):
+        if db_settings.data_cache_path:
+            cache = PreparedDataCache(
+                db_settings.data_cache_path, db_settings.cache_block_size
+            )
+            X, y = cache.load()
+        elif db_settings.read_chunk_size:
+            X, y = load_features_target(db_settings.read_chunk_size)
+        else:
+            X, y = split_features_target(prepare_data())
 
     # División de los datos en conjuntos de entrenamiento y prueba
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
+    # La semilla fija la partición para que la caché de folds sea reutilizable
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=model_settings.random_state
+    )
+    del X, y  # Los conjuntos de la partición son copias: se libera la matriz completa
+
+    # La compresión se elige sobre una partición de validación del entrenamiento
+    compress = model_settings.compression_max_r2_loss is not None
+    if compress:
+        X_train, X_val, y_train, y_val = train_test_split(
+            X_train, y_train, test_size=model_settings.compression_validation_size,
+            random_state=model_settings.random_state
+        )
     logger.info('División en conjuntos de entrenamiento y prueba completada')
 
     # Entrenamiento del modelo con hiperparámetros óptimos
-    model = train_model(X_train, y_train)
+    start = time.perf_counter()
+    with stage('build.train'):
+        model = train_model(X_train, y_train)
+    training_time = time.perf_counter() - start
 
     # Evaluación del modelo
-    score = evaluate_model(model, X_test, y_test)
+    with stage('build.evaluate'):
+        score = evaluate_model(model, X_test, y_test)
     logger.info(f'Evaluación del modelo completada, score: {score:0.2f}')
+    params = {key: model.get_params()[key] for key in model_settings.search_space}
+
+    # Compresión del modelo dentro de la pérdida de R² admitida
+    metadata = dict()
+    quantize_values = None
+    if compress:
+        with stage('build.compress'):
+            model, compression = compress_model(model, X_val, y_val)
+            compressed_score = evaluate_model(model, X_test, y_test)
+        logger.info(f'Evaluación del modelo comprimido, score: {compressed_score:0.2f}')
+        compression['score']['test'] = {'before': score, 'after': compressed_score}
+        score = compressed_score
+        quantize_values = compression['quantized_values']
+        metadata['compression'] = compression
+
+    # Guardado del modelo entrenado y registro de la nueva versión
+    with stage('build.save'):
+        forest = save_model(model, X_test, quantize_values)
+        profile = save_profile(model, X_test)
+        if model_settings.feature_index_enabled:
+            update_feature_index(rebuild=True)
+        register_model(model, forest, profile, {
+            'score': score,
+            'reference_score': score,
+            'last_rowid': last_rowid,
+            'training_time': training_time,
+            'n_train_rows': len(X_train),
+            'params': params,
+            **metadata,
+        })
+
+
+@timed('model.update_model')
+def update_model():
+    """
+    Actualiza el modelo registrado con las filas insertadas desde su última
+    construcción, sin repetir la búsqueda de hiperparámetros.
+
+    El bosque de la versión activa se amplía con `extend_model` usando sólo las
+    filas nuevas, de las que se reserva el 20 %, y al menos
+    `incremental_min_test_rows`, para evaluar. El modelo ampliado y el anterior se
+    evalúan sobre las mismas filas reservadas: si el R² baja más de
+    `incremental_max_score_loss`, o no hay una versión de la que partir, se
+    reconstruye el modelo con `build_model`. Las filas modificadas sin cambiar de
+    `rowid` sólo se incorporan al bosque en la siguiente construcción completa, pero
+    sí al índice de características, que se actualiza por bloques.
+    """
+    model_settings = get_model_settings()
+    registry = ModelRegistry(model_settings.registry_path)
+    name = model_settings.registry_name
+
+    try:
+        version = registry.latest(name)
+    except FileNotFoundError:
+        logger.info(f'No hay versiones de {name} registradas, se construye desde cero')
+        return build_model()
+    metadata = registry.metadata(name, version)
+    if 'last_rowid' not in metadata:
+        logger.info(f'{name}@{version} no indica hasta qué fila se entrenó, '
+                    'se construye desde cero')
+        return build_model()
+
+    # Filas insertadas desde la versión activa
+    with stage('update.load_data'):
+        last_rowid = max_rowid()
+        data = load_data_range(metadata['last_rowid'], last_rowid)
+
+    # Las filas reservadas deben bastar para que el R² distinga ambos modelos
+    n_test = max(round(len(data) * 0.2), model_settings.incremental_min_test_rows)
+    if len(data) - n_test < model_settings.incremental_min_rows:
+        logger.info(
+            f'{len(data)} filas nuevas desde {name}@{version}, menos de '
+            f'{model_settings.incremental_min_rows} para entrenar más '
+            f'{n_test} reservadas para evaluar: el modelo no se actualiza'
+        )
+        return
+    X, y = split_features_target(transform_data(data))
+    del data
+
+    model, _ = registry.load(name, version, 'sklearn')
+    if list(model.feature_names_in_) != list(X.columns):
+        logger.info(f'{name}@{version} usa otras características, se construye desde cero')
+        return build_model()
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=n_test, random_state=model_settings.random_state
+    )
+    reference = metadata.get('reference_score', metadata['score'])
+    previous_score = evaluate_model(model, X_test, y_test)
+
+    start = time.perf_counter()
+    with stage('update.train'):
+        n_estimators = len(model.estimators_)
+        model = extend_model(model, X_train, y_train)
+    training_time = time.perf_counter() - start
+
+    with stage('update.evaluate'):
+        score = evaluate_model(model, X_test, y_test)
+    logger.info(
+        f'Actualización con {len(X)} filas nuevas: R² {previous_score:0.4f} -> {score:0.4f} '
+        f'sobre {len(X_test)} filas reservadas (referencia {reference:0.4f})'
+    )
+
+    if score < previous_score - model_settings.incremental_max_score_loss:
+        logger.warning(
+            f'El R² de la actualización ({score:0.4f}) baja del modelo anterior '
+            f'({previous_score:0.4f}) más de {model_settings.incremental_max_score_loss} '
+            'sobre las mismas filas, se reconstruye el modelo desde cero'
+        )
+        return build_model()
+
+    with stage('update.save'):
+        forest = save_model(model, X_test)
+        profile = save_profile(model, X_test)
+        if model_settings.feature_index_enabled:
+            update_feature_index()
+        register_model(model, forest, profile, {
+            'score': score,
+            'reference_score': reference,
+            'last_rowid': last_rowid,
+            'training_time': training_time,
+            'n_train_rows': metadata['n_train_rows'] + len(X_train),
+            'params': metadata['params'],
+            'incremental': {
+                'base_version': version,
+                'new_rows': len(X),
+                'trees_before': n_estimators,
+                'score_before': previous_score,
+            },
+        })
+
+
+@timed('model.extend_model')
+def extend_model(
+    model: RandomForestRegressor,
+    X_train: pd.DataFrame,
+    y_train: pd.Series
+) -> RandomForestRegressor:
+    """
+    Añade al bosque `incremental_n_estimators` árboles entrenados con `warm_start`
+    sobre los datos dados, conservando los existentes. Si el bosque supera
+    `incremental_max_estimators` se descartan los árboles más antiguos.
+
+    Args:
+        model (RandomForestRegressor): Modelo entrenado, que se modifica.
+        X_train (pd.DataFrame): Características de las filas nuevas.
+        y_train (pd.Series): Variable objetivo de las filas nuevas.
+
+    Returns:
+        RandomForestRegressor: El modelo ampliado.
+    """
+    model_settings = get_model_settings()
+    n_estimators = len(model.estimators_) + model_settings.incremental_n_estimators
+    model.set_params(warm_start=True, n_estimators=n_estimators)
+    model.fit(X_train, y_train)
+    model.set_params(warm_start=False)
 
-    # Guardado del modelo entrenado
-    save_model(model)
+    max_estimators = model_settings.incremental_max_estimators
+    if len(model.estimators_) > max_estimators:
+        model.estimators_ = model.estimators_[-max_estimators:]
+        model.set_params(n_estimators=max_estimators)
+    logger.info(f'Bosque ampliado a {len(model.estimators_)} árboles')
+    return model
 
 
 def split_features_target(data: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
     """
     Separa los datos en características (X) y variable objetivo (y).
 
+    Las características se copian una sola vez, columna a columna, en una matriz
+    float32 ordenada por columnas (Fortran), el tipo y el orden con los que
+    trabajan los árboles. El DataFrame devuelto es una vista de esa matriz, de modo
+    que la partición, la búsqueda y el ajuste la reciben sin conversiones.
+
     Args:
         data (pd.DataFrame): DataFrame con datos preprocesados.
 
     Returns:
         tuple: Una tupla (X, y) donde X son las características y y la variable objetivo.
     """
-    X = data.loc[:, data.columns != 'rent']
-    y = data.loc[:, data.columns == 'rent'].squeeze()
+    columns = [col for col in data.columns if col != 'rent']
+    values = np.empty((len(data), len(columns)), dtype=np.float32, order='F')
+    for i, col in enumerate(columns):
+        values[:, i] = data[col].to_numpy()
+
+    X = pd.DataFrame(values, columns=columns, copy=False)
+    y = pd.Series(data['rent'].to_numpy(dtype=np.float64), name='rent', copy=False)
     logger.info('Separación de características y objetivo completada')
     return X, y
 
 
+def load_features_target(chunk_size: int) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Prepara los datos por bloques y los devuelve como características (X) y variable
+    objetivo (y) respaldadas por arrays tipados, sin copiar la tabla completa.
+
+    Args:
+        chunk_size (int): Número de filas leídas por bloque.
+
+    Returns:
+        tuple: Una tupla (X, y) donde X son las características y y la variable objetivo.
+    """
+    X_values, y_values, columns = prepare_data_arrays(chunk_size)
+    X = pd.DataFrame(X_values, columns=columns, copy=False)
+    y = pd.Series(y_values, name='rent', copy=False)
+    logger.info(f'Características cargadas por bloques: {X_values.shape}')
+    return X, y
+
+
+@timed('model.train_model')
 def train_model(
     X_train: pd.DataFrame,
     y_train: pd.Series
 ) -> RandomForestRegressor:
     """
-    Entrena un modelo de Random Forest utilizando GridSearchCV para optimizar
-    los hiperparámetros con validación cruzada.
+    Entrena un modelo de Random Forest buscando los hiperparámetros óptimos con
+    validación cruzada. El motor, el espacio de búsqueda y el paralelismo se toman
+    de la configuración, y el tiempo y la utilización de CPU de cada candidato se
+    guardan en un informe junto al modelo.
 
     Args:
         X_train (pd.DataFrame): Conjunto de características de entrenamiento.
         y_train (pd.Series): Variable objetivo de entrenamiento.
 
     Returns:
-        RandomForestRegressor: El mejor modelo entrenado según la búsqueda.
+        RandomForestRegressor: El mejor modelo reentrenado con todos los datos.
     """
-    grid_space = {
-        'n_estimators': [100, 200, 300],
-        'max_depth': [3, 6, 9, 12]
-    }
-    logger.debug(f'Parámetros de búsqueda: {grid_space}')
+    model_settings = get_model_settings()
+    logger.debug(f'Parámetros de búsqueda: {model_settings.search_space}')
 
-    model = GridSearchCV(
-        RandomForestRegressor(random_state=123),
-        param_grid=grid_space,
-        cv=5,
-        scoring='r2'
+    cache = None
+    if model_settings.fold_cache_path:
+        cache = FoldCache(model_settings.fold_cache_path, model_settings.fold_cache_max_bytes)
+
+    search = HyperparameterSearch(
+        engine=model_settings.search_engine,
+        search_space=model_settings.search_space,
+        cv=model_settings.search_cv,
+        n_jobs=model_settings.search_n_jobs,
+        random_state=model_settings.random_state,
+        halving_factor=model_settings.search_halving_factor,
+        cache=cache
     )
-    model.fit(X_train, y_train)
+    best_params = search.fit(X_train, y_train)
+    logger.info(f'Mejores hiperparámetros: {best_params}')
+
+    # Reentrenamiento del mejor candidato con todos los datos de entrenamiento
+    start = time.perf_counter()
+    model = RandomForestRegressor(random_state=model_settings.random_state, **best_params)
+    with timer('model.refit'):
+        model.fit(X_train, y_train)
+    refit_time = time.perf_counter() - start
+
+    report = search.report()
+    report.update(best_params=best_params, refit_time=refit_time)
+    report_path = model_settings.search_report_path
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2))
+    logger.info(f'Informe de la búsqueda guardado en: {report_path}')
+
     logger.info('Entrenamiento del modelo completado')
-    return model.best_estimator_
+    return model
 
 
+@timed('model.evaluate_model')
 def evaluate_model(
     model: RandomForestRegressor,
     X_test: pd.DataFrame,
@@ -105,13 +365,227 @@ def evaluate_model(
     return score  # type: ignore
 
 
-def save_model(model: RandomForestRegressor) -> None:
+@timed('model.compress_model')
+def compress_model(
+    model: RandomForestRegressor,
+    X_val: pd.DataFrame,
+    y_val: pd.Series
+) -> tuple[RandomForestRegressor, dict]:
+    """
+    Reduce el modelo entrenado sin que su R² baje más de `compression_max_r2_loss`.
+
+    Entre todos los bosques formados por los primeros `k` árboles truncados a
+    profundidad `d`, que `FlatForest.prefix_errors` evalúa en un solo recorrido, se
+    elige el de menos nodos dentro de la pérdida admitida. Con `compression_quantize`
+    se comprueba después con `evaluate_model` si el bosque compilado con los valores
+    en float16 sigue dentro de la pérdida. Las pérdidas se miden sobre un conjunto de
+    validación distinto del de prueba, con el que después se informa el puntaje.
+
+    Args:
+        model (RandomForestRegressor): Modelo entrenado.
+        X_val (pd.DataFrame): Características de validación.
+        y_val (pd.Series): Variable objetivo de validación.
+
+    Returns:
+        tuple: El modelo comprimido y un informe con los árboles, la profundidad, el
+            puntaje, y el tamaño, el tiempo de carga y la latencia de predicción de
+            cada motor antes y después de la compresión.
+    """
+    model_settings = get_model_settings()
+    score = evaluate_model(model, X_val, y_val)
+    min_score = score - model_settings.compression_max_r2_loss
+    before = profile_model(model, X_val)
+
+    # R² de cada combinación de profundidad (filas) y número de árboles (columnas)
+    forest = FlatForest.from_model(model)
+    y = y_val.to_numpy(dtype=np.float64)
+    r2 = 1 - forest.prefix_errors(X_val, y) / ((y - y.mean()) ** 2).sum()
+
+    # Nodos de cada combinación: los de profundidad hasta d de los k primeros árboles
+    nodes = np.empty(r2.shape, dtype=np.int64)
+    for k, estimator in enumerate(model.estimators_):
+        depths = estimator.tree_.compute_node_depths() - 1  # La raíz tiene profundidad 0
+        nodes[:, k] = np.cumsum(np.bincount(depths, minlength=forest.max_depth + 1))[1:]
+    nodes = np.cumsum(nodes, axis=1)
+
+    # El modelo completo es siempre válido, aunque el redondeo lo deje por debajo
+    feasible = r2 >= min_score
+    feasible[-1, -1] = True
+    candidates = np.flatnonzero(feasible)
+    best = candidates[np.lexsort((-r2.flat[candidates], nodes.flat[candidates]))[0]]
+    depth_index, tree_index = np.unravel_index(best, r2.shape)
+    max_depth, n_estimators = int(depth_index) + 1, int(tree_index) + 1
+
+    compressed = copy.copy(model)
+    compressed.estimators_ = [
+        truncate_tree(estimator, max_depth) for estimator in model.estimators_[:n_estimators]
+    ]
+    compressed.set_params(n_estimators=n_estimators, max_depth=max_depth)
+    compressed_score = evaluate_model(compressed, X_val, y_val)
+
+    # Los umbrales se cuantizan sin pérdida; los valores, sólo si caben en la pérdida
+    quantize_values = model_settings.compression_quantize
+    compiled_score = compressed_score
+    if quantize_values:
+        compiled = FlatForest.from_model(compressed).quantize(values=True)
+        compiled_score = evaluate_model(compiled, X_val, y_val)
+        if compiled_score < min_score:
+            logger.info(f'Los valores en float16 dejan el R² en {compiled_score:.4f}, '
+                        'se conservan en float64')
+            quantize_values = False
+            compiled_score = compressed_score
+    after = profile_model(compressed, X_val, quantize_values)
+
+    logger.info(
+        f'Modelo comprimido: {n_estimators} de {len(model.estimators_)} árboles, '
+        f'profundidad {max_depth} de {forest.max_depth}, '
+        f'{nodes[-1, -1]} -> {nodes[depth_index, tree_index]} nodos, '
+        f'R² de validación {score:.4f} -> {compressed_score:.4f}'
+    )
+    report = {
+        'max_r2_loss': model_settings.compression_max_r2_loss,
+        'n_estimators': {'before': len(model.estimators_), 'after': n_estimators},
+        'max_depth': {'before': forest.max_depth, 'after': max_depth},
+        'n_nodes': {
+            'before': int(nodes[-1, -1]),
+            'after': int(nodes[depth_index, tree_index]),
+        },
+        'quantized_values': quantize_values,
+        'score': {'before': score, 'after': compressed_score, 'compiled': compiled_score},
+        'before': before,
+        'after': after,
+    }
+    return compressed, report
+
+
+def truncate_tree(estimator: DecisionTreeRegressor, max_depth: int) -> DecisionTreeRegressor:
+    """
+    Devuelve una copia de un árbol de scikit-learn en la que los nodos de profundidad
+    `max_depth` pasan a ser hojas y los más profundos se eliminan. Los nodos internos
+    ya guardan la media del objetivo de sus muestras, que es la predicción de la
+    nueva hoja.
+
+    Args:
+        estimator (DecisionTreeRegressor): Árbol entrenado.
+        max_depth (int): Profundidad máxima del árbol truncado.
+
+    Returns:
+        DecisionTreeRegressor: Árbol truncado, o el mismo árbol si no supera
+            `max_depth`.
+    """
+    tree = estimator.tree_
+    if tree.max_depth <= max_depth:
+        return estimator
+
+    state = tree.__getstate__()
+    depths = tree.compute_node_depths() - 1
+    keep = np.flatnonzero(depths <= max_depth)  # Preorden: los padres preceden a los hijos
+    new_index = np.full(tree.node_count, TREE_LEAF, dtype=np.intp)
+    new_index[keep] = np.arange(len(keep))
+
+    # Los hijos eliminados quedan como TREE_LEAF, la marca de hoja de scikit-learn
+    nodes = state['nodes'][keep]
+    for field in ('left_child', 'right_child'):
+        children = nodes[field]
+        nodes[field] = np.where(children == TREE_LEAF, TREE_LEAF, new_index[children])
+    cut = depths[keep] == max_depth
+    nodes['feature'][cut] = TREE_UNDEFINED
+    nodes['threshold'][cut] = TREE_UNDEFINED
+
+    truncated = Tree(tree.n_features, tree.n_classes, tree.n_outputs)
+    truncated.__setstate__({
+        'max_depth': max_depth,
+        'node_count': len(keep),
+        'nodes': nodes,
+        'values': state['values'][keep],
+    })
+    estimator = copy.copy(estimator)
+    estimator.tree_ = truncated
+    estimator.max_depth = max_depth
+    return estimator
+
+
+def profile_model(
+    model: RandomForestRegressor,
+    X: pd.DataFrame,
+    quantize_values: bool | None = None
+) -> dict:
+    """
+    Mide el tamaño, el tiempo de carga y la latencia de predicción del pickle y del
+    bosque compilado de un modelo.
+
+    Args:
+        model (RandomForestRegressor): Modelo a medir.
+        X (pd.DataFrame): Características con las que se mide la predicción.
+        quantize_values (bool | None): Cuantización del bosque compilado, como en
+            `save_model`.
+
+    Returns:
+        dict: Para cada motor ('sklearn' y 'compiled'), el tamaño en bytes, los
+            segundos de carga y los milisegundos de la predicción de una fila y
+            de todo `X`.
+    """
+    data = pickle.dumps(model)
+    forest = FlatForest.from_model(model)
+    if quantize_values is not None:
+        forest = forest.quantize(values=quantize_values)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        forest_path = Path(tmp_dir) / 'forest'
+        forest.save(forest_path)
+        forest_size = directory_size(forest_path)
+        # Sin mapeo en memoria, para medir la lectura completa de los arrays
+        forest_load_s = median_seconds(lambda: FlatForest.load(forest_path, mmap_mode=None))
+
+    row = X.iloc[:1]
+    return {
+        'sklearn': {
+            'size_bytes': len(data),
+            'load_s': median_seconds(lambda: pickle.loads(data), repeat=3),
+            'predict_row_ms': median_seconds(lambda: model.predict(row)) * 1000,
+            'predict_batch_ms': median_seconds(lambda: model.predict(X), repeat=3) * 1000,
+        },
+        'compiled': {
+            'size_bytes': forest_size,
+            'load_s': forest_load_s,
+            'predict_row_ms': median_seconds(lambda: forest.predict(row)) * 1000,
+            'predict_batch_ms': median_seconds(lambda: forest.predict(X), repeat=3) * 1000,
+        },
+    }
+
+
+def median_seconds(func: Callable, repeat: int = 20) -> float:
+    """Devuelve la mediana en segundos de `repeat` llamadas a `func`."""
+    timings = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+@timed('model.save_model')
+def save_model(
+    model: RandomForestRegressor,
+    X_reference: pd.DataFrame | None = None,
+    quantize_values: bool | None = None
+) -> FlatForest:
     """
     Guarda el modelo entrenado en la ubicación especificada en las configuraciones.
+    Además del pickle se escribe el bosque compilado en arrays planos, que la
+    inferencia puede mapear en memoria.
 
     Args:
         model (RandomForestRegressor): Modelo entrenado a guardar.
+        X_reference (pd.DataFrame | None): Datos con los que se verifica que el
+            bosque compilado predice lo mismo que el modelo antes de guardarlo.
+        quantize_values (bool | None): Si no es None, el bosque compilado se guarda
+            cuantizado (`FlatForest.quantize`), y con True también sus valores.
+
+    Returns:
+        FlatForest: Bosque compilado guardado junto al modelo.
     """
+    model_settings = get_model_settings()
     model_dir = Path(model_settings.model_dir)
     model_dir.mkdir(parents=True, exist_ok=True)
 
@@ -120,3 +594,141 @@ def save_model(model: RandomForestRegressor) -> None:
         pickle.dump(model, file)
 
     logger.info(f'Modelo guardado en el directorio: {model_path}')
+
+    forest = FlatForest.from_model(model)
+    if X_reference is not None:
+        forest.check_parity(model, X_reference)
+    if quantize_values is not None:
+        forest = forest.quantize(values=quantize_values)
+
+    forest_path = model_settings.forest_path
+    forest.save(forest_path)
+    logger.info(f'Bosque compilado guardado en: {forest_path}')
+    return forest
+
+
+@timed('model.save_profile')
+def save_profile(model: RandomForestRegressor, X_reference: pd.DataFrame) -> dict:
+    """
+    Guarda junto al modelo el perfil de referencia de las características y de las
+    predicciones con el que el monitor de la inferencia detecta desviaciones. El
+    mismo perfil se guarda también en la versión registrada del modelo.
+
+    Args:
+        model (RandomForestRegressor): Modelo entrenado.
+        X_reference (pd.DataFrame): Datos de referencia, no vistos en el entrenamiento.
+
+    Returns:
+        dict: Perfil guardado.
+    """
+    model_settings = get_model_settings()
+    profile = build_profile(
+        X_reference.to_numpy(),
+        model.predict(X_reference),
+        list(X_reference.columns),
+        get_features_settings().categorical_columns,
+        model_settings.monitor_bins
+    )
+    profile_path = model_settings.monitor_profile_path
+    profile_path.write_text(json.dumps(profile, indent=2))
+    logger.info(f'Perfil de referencia del monitor guardado en: {profile_path}')
+    return profile
+
+
+@timed('model.update_feature_index')
+def update_feature_index(rebuild: bool = False) -> FeatureIndex:
+    """
+    Actualiza el índice de las características preparadas de cada anuncio por su
+    dirección, con el que la inferencia predice por dirección.
+
+    Las huellas de los bloques de `rowid` de la tabla, que incluyen el `rowid` y la
+    dirección de cada fila, se comparan con las del índice y sólo se extraen y
+    preparan con `transform_data` los bloques nuevos o modificados. Con `rebuild` el
+    índice se construye en un directorio temporal que sustituye al anterior al
+    terminar, descartando las filas sin uso que dejan las actualizaciones.
+
+    Args:
+        rebuild (bool): Si es True, construye el índice desde cero.
+
+    Returns:
+        FeatureIndex: Índice actualizado.
+    """
+    model_settings = get_model_settings()
+    index_path = model_settings.feature_index_path
+    block_size = model_settings.feature_index_block_size
+    columns = get_features_settings().features_prediction
+
+    if rebuild or not index_path.exists():
+        target = index_path.with_name(f'{index_path.name}.tmp')
+        shutil.rmtree(target, ignore_errors=True)
+        index = FeatureIndex.create(target, columns, block_size)
+    else:
+        target = index_path
+        index = FeatureIndex.load(index_path, mmap_mode='r+')
+        if index.feature_names != columns or index.block_size != block_size:
+            logger.info('El índice de características usa otra configuración, '
+                        'se construye desde cero')
+            return update_feature_index(rebuild=True)
+
+    fingerprints = load_block_fingerprints(block_size, keys=True)
+    block_ids = fingerprints['block'].to_numpy(dtype=np.int64)
+    block_rows = fingerprints['rows'].to_numpy(dtype=np.int64)
+    block_checksums = fingerprints['checksum'].to_numpy(dtype=np.float64)
+    changed = index.changed_blocks(block_ids, block_rows, block_checksums)
+    logger.info(f'Índice de características: {len(block_ids)} bloques, '
+                f'{len(changed)} nuevos, modificados o eliminados')
+
+    addresses = list()
+    rowids = list()
+    matrices = list()
+    for block in np.intersect1d(changed, block_ids).tolist():
+        data = load_data_block(block, block_size, keys=True)
+        addresses.extend(data.pop('address').tolist())
+        rowids.append(data.pop('rowid').to_numpy(dtype=np.int64))
+        matrices.append(transform_data(data)[columns].to_numpy(dtype=np.float32))
+
+    if len(changed):
+        index.replace_blocks(
+            changed,
+            addresses,
+            np.concatenate(rowids) if rowids else np.empty(0, dtype=np.int64),
+            np.concatenate(matrices) if matrices
+            else np.empty((0, len(columns)), dtype=np.float32)
+        )
+    index.set_blocks(block_ids, block_rows, block_checksums)
+    index.save_keys()
+
+    if target != index_path:
+        shutil.rmtree(index_path, ignore_errors=True)
+        target.rename(index_path)
+        index = FeatureIndex.load(index_path)
+    logger.info(f'Índice de características con {len(index)} direcciones guardado en: '
+                f'{index_path}')
+    return index
+
+
+@timed('model.register_model')
+def register_model(
+    model: RandomForestRegressor,
+    forest: FlatForest,
+    profile: dict,
+    metadata: dict
+) -> str:
+    """
+    Registra el modelo entrenado como una nueva versión activa en el registro de
+    modelos, con el nombre configurado en `registry_name`.
+
+    Args:
+        model (RandomForestRegressor): Modelo entrenado.
+        forest (FlatForest): Bosque compilado del modelo.
+        profile (dict): Perfil de referencia del monitor de la inferencia.
+        metadata (dict): Puntaje, tiempo de entrenamiento y demás metadatos.
+
+    Returns:
+        str: Versión registrada.
+    """
+    model_settings = get_model_settings()
+    registry = ModelRegistry(model_settings.registry_path)
+    return registry.register(
+        model_settings.registry_name, model, forest, metadata, profile
+    )
@@ -1,13 +1,18 @@
+import numpy as np
 import pandas as pd
 import re
-from model.pipeline.collection import load_data_from_db
+from collections.abc import Iterator
+from model.pipeline.collection import load_data_from_db, load_data_chunks, count_rows
+from model.instrumentation import timed
 from loguru import logger
-from config.features_settings import FeaturesSettings
+from config.features_settings import get_features_settings
 
-# Instancia de configuraciones para características
-features_settings = FeaturesSettings()
 
+# Patrón que extrae los metros cuadrados de textos como 'Present (47 m²)'
+AREA_PATTERN = re.compile(r'(\d+)\s*m²')
 
+
+@timed('preparation.prepare_data')
 def prepare_data() -> pd.DataFrame:
     """
     Realiza la preparación de datos, incluyendo carga, codificación y exclusión de columnas.
@@ -27,52 +32,136 @@ def prepare_data() -> pd.DataFrame:
         logger.error(f'Error al cargar los datos desde la base de datos: {e}')
         raise  # Lanza de nuevo la excepción después de registrarla
 
+    data = transform_data(data)
+    logger.info('Pipeline de preprocesamiento completada')
+    return data
+
+
+def prepare_data_chunks(chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Realiza la preparación de datos bloque a bloque, de modo que la memoria usada
+    depende del tamaño del bloque y no del de la tabla.
+
+    Args:
+        chunk_size (int): Número de filas leídas por bloque.
+
+    Yields:
+        pd.DataFrame: Bloque de datos preprocesados.
+    """
+    logger.info('Iniciando la preparación de datos por bloques')
+    for chunk in load_data_chunks(chunk_size):
+        yield transform_data(chunk)
+    logger.info('Pipeline de preprocesamiento por bloques completada')
+
+
+@timed('preparation.prepare_data_arrays')
+def prepare_data_arrays(chunk_size: int) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """
+    Prepara la tabla por bloques y concatena el resultado en arrays tipados
+    preasignados, sin mantener en memoria la tabla original completa. La matriz se
+    ordena por columnas (Fortran), el orden en que los árboles recorren cada
+    característica.
+
+    Args:
+        chunk_size (int): Número de filas leídas por bloque.
+
+    Returns:
+        tuple: Una tupla (X, y, columns) con la matriz float32 de características,
+            el vector float64 del objetivo y los nombres de las columnas de X.
+    """
+    n_rows = count_rows()
+    X = y = columns = None
+    offset = 0
+
+    for chunk in prepare_data_chunks(chunk_size):
+        if X is None:
+            columns = [col for col in chunk.columns if col != 'rent']
+            X = np.empty((n_rows, len(columns)), dtype=np.float32, order='F')
+            y = np.empty(n_rows, dtype=np.float64)
+
+        stop = offset + len(chunk)
+        if stop > n_rows:
+            raise ValueError('La tabla de la base de datos cambió durante la lectura')
+        X[offset:stop] = chunk[columns].to_numpy(dtype=np.float32)
+        y[offset:stop] = chunk['rent'].to_numpy(dtype=np.float64)
+        offset = stop
+
+    if X is None:
+        raise ValueError('La tabla de la base de datos está vacía')
+
+    # La tabla pudo perder filas entre el conteo y la lectura
+    return X[:offset], y[:offset], columns  # type: ignore
+
+
+@timed('preparation.transform_data')
+def transform_data(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica la codificación, el parseo y la exclusión de columnas a un bloque de datos.
+
+    Args:
+        data (pd.DataFrame): Datos extraídos de la base de datos.
+
+    Returns:
+        pd.DataFrame: Datos preprocesados.
+    """
     # Codificar columnas categóricas y extraer valores de columnas específicas
     data = encode_cat_cols(data)
     data = parse_col(data)
 
     # Excluir columnas según configuración
-    exclude_columns = features_settings.exclude_columns
+    exclude_columns = get_features_settings().exclude_columns
     logger.info(f'Excluyendo las columnas: {exclude_columns}')
-    data = data[[col for col in data.columns if col not in exclude_columns]]
-    logger.info('Pipeline de preprocesamiento completada')
-    return data
+    return data[[col for col in data.columns if col not in exclude_columns]]
 
 
+@timed('preparation.encode_cat_cols')
 def encode_cat_cols(data: pd.DataFrame) -> pd.DataFrame:
     """
-    Codifica las columnas categóricas, cambiando 'yes' a 1 y 'no' a 0.
+    Codifica las columnas categóricas, cambiando 'yes' a 1 y cualquier otro valor a 0.
+    Las columnas que ya llegan codificadas desde la consulta se dejan como están.
 
     Args:
         data (pd.DataFrame): DataFrame con los datos a codificar.
 
     Returns:
-        pd.DataFrame: DataFrame con columnas categóricas codificadas.
+        pd.DataFrame: DataFrame con columnas categóricas codificadas como enteros
+            de 8 bits.
     """
-    categorical_columns = features_settings.categorical_columns
+    categorical_columns = get_features_settings().categorical_columns
     logger.info(f'Codificando variables categóricas: {categorical_columns}')
-    data[categorical_columns] = data[categorical_columns].map(
-        lambda x: 1 if x == 'yes' else 0
-    )
+    for column in categorical_columns:
+        if pd.api.types.is_numeric_dtype(data[column]):
+            continue
+        # Comparación de NumPy sobre el array de la columna, sin pasar por el DataFrame
+        is_yes = data[column].to_numpy() == 'yes'
+        data[column] = pd.array(is_yes.astype(np.int8), dtype='Int8')
     return data
 
 
+@timed('preparation.parse_col')
 def parse_col(data: pd.DataFrame) -> pd.DataFrame:
     """
     Extrae el valor de metros cuadrados de las columnas especificadas.
 
+    Cada columna se factoriza y el patrón sólo se evalúa sobre sus valores únicos;
+    los valores sin metros cuadrados, incluidos los nulos, se convierten en 0.
+
     Args:
         data (pd.DataFrame): DataFrame con datos a parsear.
 
     Returns:
-        pd.DataFrame: DataFrame con valores de área extraídos.
+        pd.DataFrame: DataFrame con valores de área extraídos como enteros anulables.
     """
-    parse_columns = features_settings.parse_columns
+    parse_columns = get_features_settings().parse_columns
     logger.info(f'Parseando las columnas: {parse_columns}')
 
-    # Extraer el valor de área en metros cuadrados
-    data[parse_columns] = data[parse_columns].apply(
-        lambda x: int(re.search(r'(\d+)\s*m²', str(x)).group(1))  # type: ignore
-        if re.search(r'(\d+)\s*m²', str(x)) else 0
-    )
+    for column in parse_columns:
+        codes, uniques = pd.factorize(data[column])
+        areas = pd.Series(uniques, dtype=object).astype(str).str.extract(
+            AREA_PATTERN, expand=False
+        )
+        areas = pd.to_numeric(areas).fillna(0).to_numpy(dtype=np.int64)
+
+        # Los nulos reciben el código -1, que apunta al 0 añadido al final
+        data[column] = pd.array(np.append(areas, 0)[codes], dtype='Int64')
     return data
@@ -0,0 +1,259 @@
+import sqlite3
+import time
+import pandas as pd
+from contextlib import closing
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from sqlalchemy import (
+    Column, Connection, Engine, Integer, MetaData, Table, create_engine, event, exists,
+    func, select
+)
+from sqlalchemy.dialects.sqlite import insert
+from databases.db_model import Base, RentApartments, RentPredictions
+from model.pipeline.collection import ROWID, build_query, register_functions
+from model.pipeline.preparation import transform_data
+from model.instrumentation import timed, timer
+from config.db_settings import get_db_settings
+from loguru import logger
+
+if TYPE_CHECKING:
+    from model.model_inference import ModelInferenceService
+
+# Tabla temporal con el mayor `rowid` de cada dirección, calculada una vez por ejecución
+LATEST_ROWIDS = Table(
+    'scoring_latest_rowids', MetaData(),
+    Column('row_id', Integer, primary_key=True),
+    prefixes=['TEMPORARY']
+)
+
+
+@lru_cache(maxsize=1)
+def get_scoring_engine() -> Engine:
+    """
+    Devuelve el motor de la puntuación por lotes, creándolo en el primer uso.
+
+    Las conexiones se reutilizan entre bloques desde el pool del motor, de modo que
+    las pragmas de `set_pragmas` se aplican una sola vez por conexión.
+
+    Returns:
+        Engine: Motor de SQLAlchemy compartido por la lectura y la escritura.
+    """
+    engine = create_engine(f'sqlite:///{get_db_settings().db_path}')
+    event.listen(engine, 'connect', register_functions)
+    event.listen(engine, 'connect', set_pragmas)
+    return engine
+
+
+def set_pragmas(dbapi_connection, connection_record):
+    """Aplica a cada conexión SQLite el modo de diario y de sincronización configurados."""
+    db_settings = get_db_settings()
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f'PRAGMA journal_mode={db_settings.sqlite_journal_mode}')
+    cursor.execute(f'PRAGMA synchronous={db_settings.sqlite_synchronous}')
+    cursor.close()
+
+
+def restore_journal_mode() -> None:
+    """
+    Cierra las conexiones del motor de la puntuación y devuelve la base de datos al
+    modo de diario por defecto de SQLite, 'DELETE'. El modo WAL se guarda en el
+    archivo y, sin restaurarlo, la base de datos queda con sus archivos `-wal` y
+    `-shm` para cualquier otro proceso que la abra.
+    """
+    get_scoring_engine().dispose()
+    with closing(sqlite3.connect(get_db_settings().db_path)) as connection:
+        connection.execute('PRAGMA journal_mode=DELETE')
+
+
+@timed('scoring.load_latest_rowids')
+def load_latest_rowids(connection: Connection) -> int:
+    """
+    Crea en la conexión la tabla temporal `LATEST_ROWIDS` con el mayor `rowid` de
+    cada dirección. Se agrupa la tabla una sola vez por ejecución y cada bloque la
+    consulta por su clave primaria.
+
+    Args:
+        connection (Connection): Conexión con la que se leen los bloques.
+
+    Returns:
+        int: Número de direcciones distintas.
+    """
+    table = RentApartments.__table__
+    LATEST_ROWIDS.drop(connection, checkfirst=True)
+    LATEST_ROWIDS.create(connection)
+    connection.execute(
+        insert(LATEST_ROWIDS).from_select(
+            ['row_id'], select(func.max(ROWID)).select_from(table).group_by(table.c.address)
+        )
+    )
+    connection.commit()
+    return connection.execute(select(func.count()).select_from(LATEST_ROWIDS)).scalar_one()
+
+
+@timed('scoring.load_chunk')
+def load_scoring_chunk(
+    connection: Connection,
+    last_rowid: int,
+    version: str,
+    chunk_size: int
+) -> pd.DataFrame:
+    """
+    Extrae el siguiente bloque de filas por puntuar, con las columnas y tipos de
+    `build_query` más `rowid` y `address`.
+
+    Las filas se recorren en orden de `rowid` a partir de `last_rowid` y se omiten
+    las que ya tienen una predicción de `version`, de modo que una ejecución
+    interrumpida continúa donde se quedó. Con direcciones repetidas sólo se extrae la
+    fila de mayor `rowid`, la misma que conserva el índice de características, según
+    la tabla temporal de `load_latest_rowids`.
+
+    Args:
+        connection (Connection): Conexión en la que se creó `LATEST_ROWIDS`.
+        last_rowid (int): Último `rowid` del bloque anterior.
+        version (str): Versión del modelo con la que se puntúa.
+        chunk_size (int): Número máximo de filas del bloque.
+
+    Returns:
+        pd.DataFrame: Bloque de filas ordenadas por `rowid`, vacío al terminar.
+    """
+    table = RentApartments.__table__
+    predictions = RentPredictions.__table__
+    orm_query, dtypes = build_query()
+    scored = exists().where(
+        predictions.c.address == table.c.address,
+        predictions.c.model_version == version
+    )
+    orm_query = (
+        orm_query.add_columns(ROWID.label('rowid'), table.c.address)
+        .where(ROWID > last_rowid, ROWID.in_(select(LATEST_ROWIDS.c.row_id)), ~scored)
+        .order_by(ROWID)
+        .limit(chunk_size)
+    )
+    return pd.read_sql(orm_query, connection, dtype=dtypes)
+
+
+@timed('scoring.write_predictions')
+def write_predictions(connection: Connection, records: list[dict]) -> None:
+    """
+    Escribe un bloque de predicciones con una única sentencia `executemany`,
+    sustituyendo la predicción anterior de cada dirección.
+
+    Args:
+        connection (Connection): Conexión con la transacción del bloque.
+        records (list[dict]): Una fila por predicción con las columnas de
+            `RentPredictions`.
+    """
+    statement = insert(RentPredictions.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=['address'],
+        set_={
+            'prediction': statement.excluded.prediction,
+            'model_version': statement.excluded.model_version,
+            'scored_at': statement.excluded.scored_at,
+        }
+    )
+    connection.execute(statement, records)
+
+
+def score_table(ml_svc: 'ModelInferenceService', chunk_size: int | None = None) -> dict:
+    """
+    Puntúa la tabla `RentApartments` por bloques con el modelo por defecto y escribe
+    las predicciones en `RentPredictions`.
+
+    Cada bloque se prepara con `transform_data`, igual que en `prepare_data`, se
+    evalúa con `predict_batch` y se escribe en su propia transacción: si el trabajo
+    se interrumpe, los bloques ya confirmados no se vuelven a puntuar. Las predicciones
+    se guardan por dirección: de las direcciones repetidas en la tabla sólo se
+    puntúa la fila de mayor `rowid`, que `load_latest_rowids` calcula una sola vez
+    al empezar.
+
+    Args:
+        ml_svc (ModelInferenceService): Servicio con el modelo por defecto cargado.
+        chunk_size (int | None): Filas por bloque. Por defecto, `scoring_chunk_size`.
+
+    Returns:
+        dict: Predicciones escritas en esta ejecución, predicciones de la misma
+            versión ya escritas al empezar, filas omitidas por tener su dirección
+            repetida en otra de mayor `rowid`, segundos transcurridos y
+            predicciones por segundo.
+
+    Raises:
+        RuntimeError: Si el modelo no está cargado.
+    """
+    version = ml_svc.model_version
+    if version is None:
+        raise RuntimeError('El modelo no está cargado. No se puede puntuar la tabla.')
+
+    db_settings = get_db_settings()
+    chunk_size = chunk_size or db_settings.scoring_chunk_size
+    engine = get_scoring_engine()
+    Base.metadata.create_all(engine, tables=[RentPredictions.__table__])
+
+    table = RentApartments.__table__
+    predictions = RentPredictions.__table__
+    start = time.perf_counter()
+    last_rowid = 0
+    rows = 0
+
+    # Los bloques se leen con una sola conexión, la que guarda la tabla temporal
+    reader = engine.connect()
+    try:
+        resumed = reader.execute(
+            select(func.count()).where(predictions.c.model_version == version)
+        ).scalar_one()
+        total = reader.execute(select(func.count()).select_from(table)).scalar_one()
+        duplicates = total - load_latest_rowids(reader)
+        if duplicates:
+            logger.info(f'{duplicates} filas repiten la dirección de otra posterior '
+                        'y no se puntúan')
+        if resumed:
+            logger.info(
+                f'Reanudando la puntuación: {resumed} predicciones ya escritas con {version}'
+            )
+
+        scored_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        logger.info(f'Puntuando la tabla en bloques de {chunk_size} filas con {version}')
+        while True:
+            chunk = load_scoring_chunk(reader, last_rowid, version, chunk_size)
+            if chunk.empty:
+                break
+            last_rowid = int(chunk['rowid'].iat[-1])
+            addresses = chunk.pop('address').tolist()
+            chunk = chunk.drop(columns='rowid')
+
+            with timer('scoring.predict'):
+                values = ml_svc.predict_batch(transform_data(chunk)).tolist()
+
+            records = [
+                {'address': address, 'prediction': value,
+                 'model_version': version, 'scored_at': scored_at}
+                for address, value in zip(addresses, values)
+            ]
+            with engine.begin() as connection:
+                write_predictions(connection, records)
+
+            rows += len(records)
+            elapsed = time.perf_counter() - start
+            logger.info(f'Bloque hasta rowid {last_rowid} escrito: {rows} predicciones '
+                        f'({rows / elapsed:.0f} filas/s)')
+    finally:
+        # La conexión vuelve al pool: la tabla temporal no debe sobrevivirle
+        reader.rollback()
+        LATEST_ROWIDS.drop(reader, checkfirst=True)
+        reader.commit()
+        reader.close()
+        # WAL queda guardado en el archivo: se restaura el modo por defecto al terminar
+        if db_settings.sqlite_journal_mode.upper() == 'WAL':
+            restore_journal_mode()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        'rows': rows,
+        'resumed': resumed,
+        'duplicates': duplicates,
+        'seconds': round(elapsed, 3),
+        'rows_per_s': round(rows / elapsed, 1) if elapsed else 0.0,
+    }
+    logger.info(f'Puntuación completada: {summary}')
+    return summary
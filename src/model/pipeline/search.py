@@ -0,0 +1,355 @@
+import math
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold, ParameterGrid
+from model.pipeline.fold_cache import FoldCache
+from model.instrumentation import timed
+from loguru import logger
+
+
+@dataclass
+class CandidateResult:
+    """
+    Resultado de la validación cruzada de un candidato de la búsqueda.
+
+    Atributos:
+        params (dict): Hiperparámetros del candidato.
+        scores (list[float]): Puntaje R² de cada fold.
+        wall_time (float): Tiempo real acumulado de sus ajustes, en segundos.
+        cpu_time (float): Tiempo de CPU acumulado de sus ajustes, en segundos.
+        cached_folds (int): Folds cuyo resultado se leyó de la caché.
+    """
+    params: dict
+    scores: list[float] = field(default_factory=list)
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    cached_folds: int = 0
+
+    @property
+    def mean_score(self) -> float:
+        """Devuelve el puntaje R² medio de los folds."""
+        return float(np.mean(self.scores))
+
+    @property
+    def cpu_utilization(self) -> float:
+        """Devuelve la fracción de CPU usada durante sus ajustes."""
+        return self.cpu_time / self.wall_time if self.wall_time else 0.0
+
+    def to_dict(self) -> dict:
+        """Devuelve el resultado como diccionario serializable."""
+        return {
+            'params': self.params,
+            'mean_score': self.mean_score,
+            'scores': self.scores,
+            'wall_time': self.wall_time,
+            'cpu_time': self.cpu_time,
+            'cpu_utilization': self.cpu_utilization,
+            'cached_folds': self.cached_folds,
+        }
+
+
+def fit_and_score(
+    X: pd.DataFrame,
+    y: pd.Series,
+    train: np.ndarray,
+    test: np.ndarray,
+    params: dict,
+    n_estimators_chain: list[int],
+    random_state: int,
+    cache: FoldCache | None = None,
+    fold_fingerprint: str | None = None
+) -> list[tuple[int, float, float, float, bool]]:
+    """
+    Ajusta un bosque sobre un fold y lo evalúa para cada número de árboles de la cadena,
+    reutilizando con `warm_start` los árboles ya entrenados en el paso anterior.
+
+    Con caché, los pasos ya evaluados en ejecuciones anteriores no se entrenan, y el
+    primer paso que falta continúa el mayor bosque de la cadena que esté en caché.
+
+    Args:
+        X (pd.DataFrame): Características de entrenamiento.
+        y (pd.Series): Variable objetivo de entrenamiento.
+        train (np.ndarray): Índices de entrenamiento del fold.
+        test (np.ndarray): Índices de validación del fold.
+        params (dict): Hiperparámetros distintos de `n_estimators`.
+        n_estimators_chain (list[int]): Números de árboles crecientes a evaluar.
+        random_state (int): Semilla del bosque.
+        cache (FoldCache | None): Caché de resultados por fold.
+        fold_fingerprint (str | None): Huella del fold, necesaria si hay caché.
+
+    Returns:
+        list: Una tupla (n_estimators, score, wall_time, cpu_time, cached) por paso de
+            la cadena, donde `cached` indica si el resultado se leyó de la caché.
+    """
+    keys = [
+        cache.key(fold_fingerprint, params, n_estimators, random_state) if cache else None
+        for n_estimators in n_estimators_chain
+    ]
+    entries = [cache.get_score(key) if cache else None for key in keys]
+    if all(entries):
+        return [
+            (n_estimators, entry['score'], 0.0, 0.0, True)
+            for n_estimators, entry in zip(n_estimators_chain, entries)
+        ]
+
+    # Se continúa desde el mayor bosque en caché anterior al primer paso que falta
+    model = None
+    first_missing = entries.index(None)
+    for key in reversed(keys[:first_missing]):
+        model = cache.get_estimator(key) if cache else None
+        if model is not None:
+            break
+    if model is None:
+        model = RandomForestRegressor(random_state=random_state, warm_start=True, **params)
+
+    X_train, y_train = X.iloc[train], y.iloc[train]
+    X_test, y_test = X.iloc[test], y.iloc[test]
+
+    results = list()
+    for n_estimators, key, entry in zip(n_estimators_chain, keys, entries):
+        if entry is not None:
+            results.append((n_estimators, entry['score'], 0.0, 0.0, True))
+            continue
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        model.set_params(n_estimators=n_estimators)
+        model.fit(X_train, y_train)
+        score = model.score(X_test, y_test)
+        wall_time = time.perf_counter() - wall_start
+        cpu_time = time.process_time() - cpu_start
+        results.append((n_estimators, score, wall_time, cpu_time, False))
+
+        if cache:
+            cache.put(key, score, wall_time, cpu_time, model)
+    return results
+
+
+class HyperparameterSearch:
+    """
+    Búsqueda de hiperparámetros con validación cruzada para `RandomForestRegressor`.
+
+    Las tareas (candidato, fold) se reparten en un pool de procesos. Los motores
+    disponibles son:
+
+    - 'grid': evalúa por separado cada combinación del espacio de búsqueda.
+    - 'warm_start': para cada combinación del resto de hiperparámetros ajusta un
+      único bosque por fold y lo amplía con `warm_start` a lo largo de la lista
+      creciente de `n_estimators`, reutilizando los árboles ya entrenados.
+    - 'halving': successive halving usando `n_estimators` como recurso; en cada
+      ronda sólo la mejor fracción `1 / factor` de candidatos pasa a evaluarse con
+      el siguiente número de árboles.
+
+    Métodos:
+        fit: Ejecuta la búsqueda y devuelve los mejores hiperparámetros.
+    """
+
+    def __init__(
+        self,
+        engine: str,
+        search_space: dict[str, list],
+        cv: int,
+        n_jobs: int,
+        random_state: int,
+        halving_factor: int = 3,
+        cache: FoldCache | None = None
+    ) -> None:
+        """
+        Inicializa la búsqueda.
+
+        Args:
+            engine (str): Motor de búsqueda: 'grid', 'warm_start' o 'halving'.
+            search_space (dict[str, list]): Valores de cada hiperparámetro.
+            cv (int): Número de folds de la validación cruzada.
+            n_jobs (int): Número de procesos del pool (-1 para todos los núcleos).
+            random_state (int): Semilla de los bosques.
+            halving_factor (int): Fracción inversa de candidatos que sobrevive a cada
+                ronda del motor 'halving'.
+            cache (FoldCache | None): Caché persistente de resultados por fold. Si es
+                None, todos los ajustes se entrenan.
+        """
+        self.engine = engine
+        self.search_space = search_space
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.halving_factor = halving_factor
+        self.cache = cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.results: list[CandidateResult] = list()
+        self.wall_time = 0.0
+
+    @timed('search.fit')
+    def fit(self, X: pd.DataFrame, y: pd.Series) -> dict:
+        """
+        Ejecuta la búsqueda de hiperparámetros.
+
+        Args:
+            X (pd.DataFrame): Características de entrenamiento.
+            y (pd.Series): Variable objetivo de entrenamiento.
+
+        Returns:
+            dict: Hiperparámetros del mejor candidato.
+
+        Raises:
+            ValueError: Si el motor de búsqueda no existe.
+        """
+        space = dict(self.search_space)
+        n_estimators = sorted(space.pop('n_estimators', [100]))
+        groups = list(ParameterGrid(space)) if space else [dict()]
+        data_fingerprint = FoldCache.data_fingerprint(X, y) if self.cache else None
+        folds = [
+            (train, test, self.cache.fold_fingerprint(data_fingerprint, train, test)
+             if self.cache else None)
+            for train, test in KFold(n_splits=self.cv).split(X)
+        ]
+        logger.info(
+            f'Búsqueda {self.engine}: {len(groups) * len(n_estimators)} candidatos, '
+            f'{self.cv} folds, {effective_n_jobs(self.n_jobs)} procesos'
+        )
+
+        start = time.perf_counter()
+        with Parallel(n_jobs=self.n_jobs) as parallel:
+            if self.engine == 'grid':
+                tasks = [(params, [n]) for params in groups for n in n_estimators]
+                best = self._run(parallel, X, y, folds, tasks)
+            elif self.engine == 'warm_start':
+                tasks = [(params, n_estimators) for params in groups]
+                best = self._run(parallel, X, y, folds, tasks)
+            elif self.engine == 'halving':
+                best = self._run_halving(parallel, X, y, folds, groups, n_estimators)
+            else:
+                raise ValueError(f'Motor de búsqueda desconocido: {self.engine}')
+        self.wall_time = time.perf_counter() - start
+
+        if self.cache:
+            logger.info(
+                f'Caché de folds: {self.cache_hits} aciertos, {self.cache_misses} fallos'
+            )
+            self.cache.evict()
+
+        for result in self.results:
+            logger.info(
+                f'Candidato {result.params}: r2={result.mean_score:0.4f}, '
+                f'tiempo={result.wall_time:0.2f}s, CPU={result.cpu_utilization:0.0%}, '
+                f'folds en caché={result.cached_folds}'
+            )
+        logger.info(
+            f'Búsqueda completada en {self.wall_time:0.2f}s, utilización de CPU '
+            f'del pool: {self.cpu_utilization:0.0%}'
+        )
+        return best.params
+
+    @property
+    def cpu_utilization(self) -> float:
+        """Devuelve la fracción de CPU del pool usada durante toda la búsqueda."""
+        capacity = self.wall_time * effective_n_jobs(self.n_jobs)
+        return sum(result.cpu_time for result in self.results) / capacity if capacity else 0.0
+
+    def report(self) -> dict:
+        """
+        Devuelve un resumen serializable de la búsqueda.
+
+        Returns:
+            dict: Motor, tiempos globales y resultado de cada candidato.
+        """
+        return {
+            'engine': self.engine,
+            'wall_time': self.wall_time,
+            'cpu_utilization': self.cpu_utilization,
+            'n_jobs': effective_n_jobs(self.n_jobs),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'candidates': [result.to_dict() for result in self.results],
+        }
+
+    def _run(
+        self,
+        parallel: Parallel,
+        X: pd.DataFrame,
+        y: pd.Series,
+        folds: list,
+        tasks: list[tuple[dict, list[int]]]
+    ) -> CandidateResult:
+        """
+        Evalúa en paralelo cada tarea (hiperparámetros, cadena de árboles) en cada fold.
+
+        Args:
+            parallel (Parallel): Pool de procesos.
+            X (pd.DataFrame): Características de entrenamiento.
+            y (pd.Series): Variable objetivo de entrenamiento.
+            folds (list): Índices (train, test) y huella de cada fold.
+            tasks (list): Hiperparámetros y cadena de `n_estimators` de cada tarea.
+
+        Returns:
+            CandidateResult: Mejor candidato evaluado en esta llamada.
+        """
+        outputs = parallel(
+            delayed(fit_and_score)(
+                X, y, train, test, params, chain, self.random_state, self.cache, fingerprint
+            )
+            for params, chain in tasks
+            for train, test, fingerprint in folds
+        )
+
+        candidates: dict[str, CandidateResult] = dict()
+        task_folds = ((params, fold) for params, _ in tasks for fold in folds)
+        for (params, _), steps in zip(task_folds, outputs):
+            for n_estimators, score, wall_time, cpu_time, cached in steps:
+                candidate_params = {**params, 'n_estimators': n_estimators}
+                result = candidates.setdefault(
+                    repr(sorted(candidate_params.items())), CandidateResult(candidate_params)
+                )
+                result.scores.append(score)
+                result.wall_time += wall_time
+                result.cpu_time += cpu_time
+                result.cached_folds += cached
+                if cached:
+                    self.cache_hits += 1
+                else:
+                    self.cache_misses += 1
+
+        self.results.extend(candidates.values())
+        return max(candidates.values(), key=lambda result: result.mean_score)
+
+    def _run_halving(
+        self,
+        parallel: Parallel,
+        X: pd.DataFrame,
+        y: pd.Series,
+        folds: list,
+        groups: list[dict],
+        n_estimators: list[int]
+    ) -> CandidateResult:
+        """
+        Ejecuta successive halving usando la lista creciente de `n_estimators` como
+        presupuesto de cada ronda.
+
+        Returns:
+            CandidateResult: Mejor candidato de la última ronda, evaluado con el mayor
+                número de árboles.
+        """
+        survivors, budgets = groups, list(n_estimators)
+        while True:
+            budget = budgets.pop(0)
+            tasks = [(params, [budget]) for params in survivors]
+            best = self._run(parallel, X, y, folds, tasks)
+            if not budgets:
+                break
+
+            round_results = self.results[-len(survivors):]
+            ranked = sorted(round_results, key=lambda result: result.mean_score, reverse=True)
+            keep = max(1, math.ceil(len(survivors) / self.halving_factor))
+            survivors = [
+                {key: value for key, value in result.params.items() if key != 'n_estimators'}
+                for result in ranked[:keep]
+            ]
+            # Un único superviviente ya no compite: se evalúa con el presupuesto completo
+            if len(survivors) == 1:
+                budgets = budgets[-1:]
+            logger.info(f'Ronda con {budget} árboles: continúan {len(survivors)} candidatos')
+        return best
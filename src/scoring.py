@@ -0,0 +1,24 @@
+from model.model_inference import ModelInferenceService
+from model.instrumentation import configure_metrics, dump_metrics
+from config.logger_settings import configure_logging
+from loguru import logger
+
+
+@logger.catch
+def main():
+    configure_logging()
+    logger.info('Ejecutando la aplicación')
+    configure_metrics()
+    ml_svc = ModelInferenceService()
+    ml_svc.load_model()
+
+    # La pipeline importa pandas y SQLAlchemy: se carga sólo para puntuar la tabla
+    from model.pipeline.scoring import score_table
+
+    summary = score_table(ml_svc)
+    logger.info(f'Predicciones escritas: {summary["rows"]} ({summary["rows_per_s"]:.0f}/s)')
+    dump_metrics()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+import json
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from model.model_inference import ModelInferenceService
+from model.model_batching import MicroBatcher
+from model.model_pool import InferencePool
+from model.instrumentation import collector, configure_metrics, is_enabled
+from config.server_settings import get_server_settings
+from config.logger_settings import configure_logging
+from loguru import logger
+
+
+class InferenceRequestHandler(BaseHTTPRequestHandler):
+    """
+    Manejador HTTP de las peticiones de inferencia.
+
+    Rutas:
+        POST /predict: Recibe `{"features": [...]}` para una fila o
+            `{"instances": [[...], ...]}` para varias filas, o
+            `{"addresses": [...]}` para predecir por dirección con el índice de
+            características, y opcionalmente `"model": "nombre@versión"` para usar
+            un modelo del registro. Si el micro-lote no responde en
+            `request_timeout` segundos, devuelve 503.
+        POST /models/activate: Sustituye el modelo por defecto por
+            `{"model": "nombre@versión"}` sin interrumpir las peticiones en curso.
+        GET /models: Devuelve los modelos registrados y la caché de modelos.
+        GET /metrics: Devuelve las estadísticas de latencia y tamaño de lote y, si
+            están activadas, de la caché de predicciones y de la instrumentación.
+        GET /metrics/prometheus: Devuelve la instrumentación en el formato de texto
+            de Prometheus.
+        GET /monitor: Devuelve las estadísticas de las características y de las
+            predicciones frente al perfil de referencia y las columnas desviadas.
+            Con `WORKERS` mayor que 1 cada proceso mantiene su propio monitor y
+            la ruta no está disponible.
+        GET /health: Comprueba que el servidor está disponible.
+    """
+
+    server: 'InferenceServer'
+
+    def do_GET(self):
+        """Atiende las rutas de consulta del servidor."""
+        if self.path == '/health':
+            self._send_json(HTTPStatus.OK, {'status': 'ok'})
+        elif self.path == '/metrics':
+            metrics = self.server.batcher.metrics()
+            if is_enabled():
+                metrics['instrumentation'] = collector.snapshot()
+            self._send_json(HTTPStatus.OK, metrics)
+        elif self.path == '/metrics/prometheus':
+            self._send_text(HTTPStatus.OK, collector.to_prometheus())
+        elif self.path == '/models':
+            self._send_json(HTTPStatus.OK, self._models())
+        elif self.path == '/monitor':
+            monitor = self.server.batcher.ml_svc.monitor
+            if isinstance(self.server.batcher, InferencePool):
+                self._send_json(HTTPStatus.NOT_FOUND,
+                                {'error': 'El monitor no está disponible con varios procesos'})
+            elif monitor is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {'error': 'El monitor no está activado'})
+            else:
+                self._send_json(HTTPStatus.OK, monitor.snapshot())
+        else:
+            self._send_not_found()
+
+    def do_POST(self):
+        """Atiende las peticiones de predicción individuales y por lotes."""
+        if self.path not in ('/predict', '/models/activate'):
+            self._send_not_found()
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length))
+            if not isinstance(payload, dict):
+                raise ValueError('El cuerpo de la petición debe ser un objeto JSON')
+            model_id = payload.get('model')
+            batcher = self.server.batcher
+            timeout = get_server_settings().request_timeout
+            if self.path == '/models/activate':
+                if not model_id:
+                    raise ValueError('La petición debe incluir "model"')
+                body = {'model': batcher.activate(model_id)}
+            elif 'features' in payload:
+                prediction = batcher.predict(
+                    [payload['features']], timeout=timeout, model_id=model_id
+                )
+                body = {'prediction': float(prediction[0])}
+            elif 'instances' in payload:
+                predictions = batcher.predict(
+                    payload['instances'], timeout=timeout, model_id=model_id
+                )
+                body = {'predictions': predictions.tolist()}
+            elif 'addresses' in payload:
+                # Las filas del índice se evalúan en el mismo micro-lote que el resto
+                rows = batcher.ml_svc.feature_index().take(payload['addresses'])
+                predictions = batcher.predict(rows, timeout=timeout, model_id=model_id)
+                body = {'predictions': predictions.tolist()}
+            else:
+                raise ValueError(
+                    'La petición debe incluir "features", "instances" o "addresses"'
+                )
+        except TimeoutError:
+            logger.warning(f'Petición de predicción sin respuesta en {timeout} s')
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE,
+                            {'error': f'La predicción no terminó en {timeout} s'})
+            return
+        except FileNotFoundError as e:
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': str(e)})
+            return
+        except KeyError as e:
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': e.args[0]})
+            return
+        except (ValueError, TypeError) as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+            return
+        except Exception as e:
+            logger.error(f'Error al atender la petición de predicción: {e}')
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)})
+            return
+
+        self._send_json(HTTPStatus.OK, body)
+
+    def _models(self) -> dict:
+        """Describe los modelos registrados y el estado de la caché de modelos."""
+        ml_svc = self.server.batcher.ml_svc
+        registry = ml_svc.registry
+        models = {
+            name: {'latest': registry.latest(name), 'versions': registry.versions(name)}
+            for name in registry.names()
+        }
+        return {'models': models, 'cache': ml_svc.models.stats()}
+
+    def _send_not_found(self):
+        """Responde con un error 404 para rutas desconocidas."""
+        self._send_json(HTTPStatus.NOT_FOUND, {'error': f'Ruta no encontrada: {self.path}'})
+
+    def log_message(self, format, *args):
+        """Redirige el log de acceso de `http.server` a loguru."""
+        logger.debug(f'{self.address_string()} - {format % args}')
+
+    def _send_json(self, status: HTTPStatus, body: dict):
+        """
+        Envía una respuesta JSON.
+
+        Args:
+            status (HTTPStatus): Código de estado de la respuesta.
+            body (dict): Contenido de la respuesta.
+        """
+        content = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_text(self, status: HTTPStatus, body: str):
+        """
+        Envía una respuesta de texto en el formato de exposición de Prometheus.
+
+        Args:
+            status (HTTPStatus): Código de estado de la respuesta.
+            body (str): Contenido de la respuesta.
+        """
+        content = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class InferenceServer(ThreadingHTTPServer):
+    """
+    Servidor HTTP residente que comparte un único modelo cargado entre todas las
+    peticiones y las agrupa en micro-lotes.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        batcher: MicroBatcher | InferencePool
+    ) -> None:
+        """
+        Inicializa el servidor.
+
+        Args:
+            address (tuple[str, int]): Dirección y puerto de escucha.
+            batcher (MicroBatcher | InferencePool): Agrupador de peticiones en el
+                propio proceso o pool de procesos, ambos con el modelo cargado.
+        """
+        super().__init__(address, InferenceRequestHandler)
+        self.batcher = batcher
+
+
+@logger.catch
+def main():
+    configure_logging()
+    logger.info('Ejecutando la aplicación')
+    configure_metrics()
+    ml_svc = ModelInferenceService()
+    ml_svc.load_model()
+
+    server_settings = get_server_settings()
+    if server_settings.workers > 1:
+        # Los procesos se crean antes que los hilos del servidor para heredar
+        # únicamente el modelo ya cargado
+        batcher = InferencePool(
+            ml_svc,
+            n_workers=server_settings.workers,
+            latency_window=server_settings.latency_window
+        )
+    else:
+        batcher = MicroBatcher(
+            ml_svc,
+            max_batch_size=server_settings.max_batch_size,
+            max_wait_ms=server_settings.max_wait_ms,
+            latency_window=server_settings.latency_window
+        )
+    batcher.start()
+
+    address = (server_settings.server_host, server_settings.server_port)
+    with InferenceServer(address, batcher) as server:
+        logger.info(f'Servidor de inferencia escuchando en http://{address[0]}:{address[1]}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info('Deteniendo el servidor de inferencia')
+        finally:
+            batcher.stop()
+
+
+if __name__ == '__main__':
+    main()